@@ -0,0 +1,66 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    Compares the per-message Python overhead of Publisher.publish and PublishProfile.publish
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+
+Only the work done before a message reaches the channel is measured: ``_publish_body`` is
+replaced with a no-op so no broker is needed. Run it with ``python benchmarks/publish_profile.py``.
+"""
+
+import timeit
+from unittest.mock import patch
+
+from pyrmq import Publisher
+
+NUMBER = 50_000
+REPEAT = 20
+DATA = {"event": "audit", "id": 1}
+PROPERTIES = {"headers": {"x-origin": "benchmark"}}
+
+
+def main():
+    publisher = Publisher(
+        exchange_name="exchange_name",
+        queue_name="queue_name",
+        routing_key="",
+    )
+    profile = publisher.profile(message_properties=PROPERTIES)
+
+    cases = {
+        "Publisher.publish": (
+            lambda: publisher.publish(DATA, message_properties=PROPERTIES),
+            lambda: profile.publish(DATA),
+        ),
+        "Publisher.publish with a message_id": (
+            lambda: publisher.publish(
+                DATA, message_properties={**PROPERTIES, "message_id": "message-id"}
+            ),
+            lambda: profile.publish(DATA, message_id="message-id"),
+        ),
+    }
+
+    with patch.object(Publisher, "_publish_body", lambda *args, **kwargs: None):
+        for name, (publish, profile_publish) in cases.items():
+            # Alternate both paths so a noisy machine skews them alike.
+            timings = [
+                [
+                    timeit.timeit(case, number=NUMBER)
+                    for case in (publish, profile_publish)
+                ]
+                for _ in range(REPEAT)
+            ]
+            before, after = (
+                min(timing) / NUMBER * 1_000_000 for timing in zip(*timings)
+            )
+            print(
+                f"{name:<40} {before:5.2f} µs/message, "
+                f"with a profile {after:5.2f} µs/message ({1 - after / before:.0%} less)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,10 @@
 
 from importlib.metadata import version
 
+from pyrmq.async_consumer import AsyncConsumer
+from pyrmq.async_publisher import AsyncPublisher
 from pyrmq.consumer import Consumer
+from pyrmq.consumer_group import ConsumerGroup
 from pyrmq.publisher import Publisher
 
 try:
@@ -18,6 +21,9 @@ except Exception:  # pragma: no cover
     __version__ = "unknown"
 
 __all__ = [
+    AsyncConsumer.__name__,
+    AsyncPublisher.__name__,
     Consumer.__name__,
+    ConsumerGroup.__name__,
     Publisher.__name__,
 ]
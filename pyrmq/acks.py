@@ -0,0 +1,98 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ AckCoalescer class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import logging
+from typing import Dict, Optional
+
+from pika.adapters.blocking_connection import BlockingChannel
+
+logger = logging.getLogger("pyrmq")
+
+
+class AckCoalescer(object):
+    """
+    Acks the messages consumed on one channel with cumulative acks (``multiple=True``)
+    instead of one ack each.
+
+    Messages may be settled in any order. A flush only acks up to the lowest delivery tag
+    below which every message was settled, so a message still being consumed is never acked.
+    Nacks are sent right away. Not thread-safe; only use it on the channel's I/O thread.
+    """
+
+    def __init__(self, channel: BlockingChannel, max_pending: int, timeout: float):
+        """
+        :param channel: The channel the messages were delivered on. Its delivery tags start at ``1``.
+        :param max_pending: Flush once this many acks wait to be sent.
+        :param timeout: Seconds an ack waits to be sent at most, as long as the messages before it are settled.
+        """
+        self.channel = channel
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.settled_up_to = 0
+        self.pending = 0
+        self.__settled: Dict[int, bool] = {}
+        self.__timer: Optional[int] = None
+
+    def ack(self, delivery_tag: int) -> None:
+        """
+        Ack a message with the next flush.
+        """
+        self.__settled[delivery_tag] = True
+        self.pending += 1
+
+        if self.pending >= self.max_pending:
+            self.flush()
+
+        elif self.__timer is None:
+            self.__timer = self.channel.connection.call_later(
+                self.timeout, self.__on_timeout
+            )
+
+    def nack(self, delivery_tag: int) -> None:
+        """
+        Nack a message right away.
+        """
+        self.channel.basic_nack(delivery_tag=delivery_tag)
+        self.__settled[delivery_tag] = False
+
+    def flush(self) -> None:
+        """
+        Ack every message up to the lowest delivery tag below which every message was settled.
+        """
+        if self.__timer is not None:
+            self.channel.connection.remove_timeout(self.__timer)
+            self.__timer = None
+
+        delivery_tag = None
+
+        while self.settled_up_to + 1 in self.__settled:
+            self.settled_up_to += 1
+
+            if self.__settled.pop(self.settled_up_to):
+                delivery_tag = self.settled_up_to
+                self.pending -= 1
+
+        if delivery_tag is not None:
+            # Nacked messages are settled already, so a cumulative ack only covers the acked ones.
+            self.channel.basic_ack(delivery_tag=delivery_tag, multiple=True)
+
+        if self.pending:
+            logger.debug(
+                f"Holding back {self.pending} acks until message {self.settled_up_to + 1} is settled"
+            )
+            self.__timer = self.channel.connection.call_later(
+                self.timeout, self.__on_timeout
+            )
+
+    def __on_timeout(self) -> None:
+        self.__timer = None
+
+        if self.channel.is_open:
+            self.flush()
@@ -0,0 +1,176 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ AdaptivePrefetch class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import time
+from threading import Lock
+from typing import Optional
+
+
+class AdaptivePrefetch(object):
+    """
+    Tunes a consumer's prefetch count with additive increase and multiplicative decrease (AIMD).
+
+    It measures how long callbacks take (``service_time``), how long delivered messages wait for a callback
+    (``wait_time``), and how long the broker takes to deliver the next message once an ack frees up the last
+    unacked slot (``round_trip``). Every ``interval`` seconds, the prefetch count is cut by ``backoff`` if messages
+    waited longer than a callback takes, i.e. they were hoarded, or else raised by ``step`` if a callback was left
+    without a message while waiting for such a round trip.
+    """
+
+    def __init__(
+        self,
+        prefetch: int,
+        min_prefetch: int = 1,
+        max_prefetch: int = 100,
+        interval: float = 1,
+        step: int = 1,
+        backoff: float = 0.5,
+    ):
+        """
+        :param prefetch: The prefetch count to start with.
+        :param min_prefetch: Lowest prefetch count. Default: ``1``
+        :param max_prefetch: Highest prefetch count. Default: ``100``
+        :param interval: Seconds between adjustments. Default: ``1``
+        :param step: How much to raise the prefetch count by. Default: ``1``
+        :param backoff: What to multiply the prefetch count with to cut it. Default: ``0.5``
+        """
+        if not 1 <= min_prefetch <= max_prefetch:
+            raise ValueError(
+                f"Prefetch limits need 1 <= min_prefetch <= max_prefetch, got {min_prefetch!r} and {max_prefetch!r}."
+            )
+
+        self.min_prefetch = min_prefetch
+        self.max_prefetch = max_prefetch
+        self.interval = interval
+        self.step = step
+        self.backoff = backoff
+        self.prefetch = min(max(prefetch, min_prefetch), max_prefetch)
+        self.service_time = None
+        self.wait_time = None
+        self.round_trip = None
+
+        self.__lock = Lock()
+        self.__unacked = 0
+        self.__waiting = 0
+        self.__slots_full_at = None
+        self.__reset_window(time.monotonic())
+
+    def __reset_window(self, now: float) -> None:
+        self.__window_started_at = now
+        self.__service_times = []
+        self.__wait_times = []
+        self.__round_trips = []
+        self.__starved = 0
+
+    def reset(self) -> None:
+        """
+        Forget the messages in flight, e.g. after their channel closed.
+        """
+        with self.__lock:
+            self.__unacked = 0
+            self.__waiting = 0
+            self.__slots_full_at = None
+
+    def delivered(self) -> Optional[int]:
+        """
+        Record that a message was delivered.
+        :return: The new prefetch count if it changed, otherwise ``None``.
+        """
+        now = time.monotonic()
+
+        with self.__lock:
+            self.__unacked += 1
+            self.__waiting += 1
+
+            if self.__slots_full_at is not None:
+                self.__round_trips.append(now - self.__slots_full_at)
+                self.__slots_full_at = None
+
+            return self.__adjust(now)
+
+    def started(self, delivered_at: float) -> float:
+        """
+        Record that a callback started consuming a message.
+        :param delivered_at: ``time.monotonic()`` when the message was delivered.
+        :return: ``time.monotonic()`` now, to pass to ``finished()``.
+        """
+        now = time.monotonic()
+
+        with self.__lock:
+            self.__waiting = max(0, self.__waiting - 1)
+            self.__wait_times.append(now - delivered_at)
+
+        return now
+
+    def finished(self, started_at: float) -> None:
+        """
+        Record that a callback finished consuming a message.
+        :param started_at: What ``started()`` returned.
+        """
+        service_time = time.monotonic() - started_at
+
+        with self.__lock:
+            self.__service_times.append(service_time)
+
+    def settled(self) -> Optional[int]:
+        """
+        Record that a message was acked or nacked.
+        :return: The new prefetch count if it changed, otherwise ``None``.
+        """
+        now = time.monotonic()
+
+        with self.__lock:
+            if self.__unacked >= self.prefetch:
+                # The broker only delivers the next message once it gets this ack.
+                self.__slots_full_at = now
+
+                if not self.__waiting:
+                    self.__starved += 1
+
+            self.__unacked = max(0, self.__unacked - 1)
+
+            return self.__adjust(now)
+
+    def __adjust(self, now: float) -> Optional[int]:
+        """
+        Adjust the prefetch count once every ``interval``.
+        """
+        if now - self.__window_started_at < self.interval:
+            return None
+
+        if self.__service_times:
+            self.service_time = sum(self.__service_times) / len(self.__service_times)
+
+        if self.__wait_times:
+            self.wait_time = sum(self.__wait_times) / len(self.__wait_times)
+
+        if self.__round_trips:
+            self.round_trip = sum(self.__round_trips) / len(self.__round_trips)
+
+        prefetch = self.prefetch
+
+        if (
+            self.__wait_times
+            and self.__service_times
+            and self.wait_time > self.service_time
+        ):
+            prefetch = max(self.min_prefetch, int(prefetch * self.backoff))
+
+        elif self.__starved:
+            prefetch = min(self.max_prefetch, prefetch + self.step)
+
+        self.__reset_window(now)
+
+        if prefetch == self.prefetch:
+            return None
+
+        self.prefetch = prefetch
+
+        return prefetch
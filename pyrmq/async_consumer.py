@@ -0,0 +1,588 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ AsyncConsumer class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from contextlib import suppress
+from typing import Any, Callable, Optional
+
+from pika import ConnectionParameters, PlainCredentials
+from pika.adapters.asyncio_connection import AsyncioConnection
+from pika.channel import Channel
+from pika.exceptions import AMQPConnectionError
+
+from pyrmq.async_publisher import AsyncPublisher
+from pyrmq.cluster import CONNECT_ERRORS, ROUND_ROBIN, Cluster
+from pyrmq.compression import decompress
+from pyrmq.consumer import (
+    CONNECT_ERROR,
+    CONNECTION_ERRORS,
+    CONSUME_ERROR,
+    retry_message_properties,
+)
+from pyrmq.serializers import get_serializer, negotiate_serializer
+
+logger = logging.getLogger("pyrmq")
+
+
+class AsyncConsumer(object):
+    """
+    This class uses pika's ``AsyncioConnection`` for consuming messages in asyncio applications.
+    It takes the same arguments as :class:`~pyrmq.Consumer`, declares the same queues and bindings,
+    and calls ``async def`` callbacks, up to ``max_concurrency`` of them at once, on one connection.
+    Reconnects wait with ``asyncio.sleep`` instead of blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        exchange_name: str,
+        queue_name: str,
+        routing_key: str,
+        callback: Callable,
+        exchange_type: Optional[str] = "direct",
+        **kwargs,
+    ):
+        """
+        :param exchange_name: Your exchange name.
+        :param queue_name: Your queue name.
+        :param routing_key: Your queue name.
+        :param callback: Your ``async def`` callback that should handle a consumed message
+        :keyword host: Your RabbitMQ host. Default: ``"localhost"``
+        :keyword port: Your RabbitMQ port. Default: ``5672``
+        :keyword username: Your RabbitMQ username. Default: ``"guest"``
+        :keyword password: Your RabbitMQ password. Default: ``"guest"``
+        :keyword hosts: RabbitMQ nodes of a cluster as ``"host"`` or ``"host:port"`` strings, used instead of ``host``.
+            Every connect tries them in the order of ``host_strategy``, one attempt each. Default: ``None``
+        :keyword host_strategy: ``"round_robin"``, ``"random"``, or ``"health"`` to prefer the nodes with the lowest
+            recent connect latency and fewest recent failures. Default: ``"round_robin"``
+        :keyword host_quarantine: Seconds a node that failed to connect is only tried after every other node. Default: ``10``
+        :keyword connection_attempts: How many times should PyRMQ try? Default: ``3``
+        :keyword is_dlk_retry_enabled: Flag to enable DLK-based retry logic of consumed messages. Default: ``False``
+        :keyword retry_delay: Seconds between connection retries. Default: ``5``
+        :keyword retry_interval: Seconds between consumption retries. Default: ``900``
+        :keyword retry_queue_suffix: The suffix that will be appended to the ``queue_name`` to act as the name of the retry_queue. Default: ``retry``
+        :keyword max_retries: Number of maximum retries for DLK retry logic. Default: ``20``
+        :keyword error_callback: Callback function to be called when connection_attempts is reached or consuming fails.
+        :keyword infinite_retry: Tells PyRMQ to keep on retrying to connect while firing error_callback, if any. Default: ``False``
+        :keyword exchange_args: Your exchange arguments. Default: ``None``
+        :keyword queue_args: Your queue arguments. Default: ``None``
+        :keyword bound_exchange: The exchange this consumer needs to bind to. This is an object that has two keys, ``name`` and ``type``. Default: ``None``
+        :keyword auto_ack: Flag whether to ack or nack the consumed message regardless of its outcome. Default: ``True``
+        :keyword max_concurrency: How many callbacks may run at once. Default: ``1``
+        :keyword prefetch_count: How many messages should the consumer retrieve at a time for consumption. Default: ``max_concurrency``
+        :keyword heart_beat: Heartbeat seconds to wait for consumer process. Default: ``None``
+        :keyword serializer: Name of a registered serializer or a ``Serializer`` instance. Decodes messages whose
+            ``content_type`` no registered serializer handles, e.g. messages from older publishers. Default: ``"json"``
+        :keyword compression: Name of a registered codec or a ``Codec`` instance that messages published to the
+            retry queue are compressed with. Default: ``None``
+        :keyword compression_threshold: Minimum body size in bytes to compress. Default: ``1024``
+        """
+
+        self.exchange_name = exchange_name
+        self.queue_name = queue_name
+        self.routing_key = routing_key
+        self.exchange_type = exchange_type
+        self.message_received_callback = callback
+        self.host = kwargs.get("host") or os.getenv("RABBITMQ_HOST") or "localhost"
+        self.port = kwargs.get("port") or os.getenv("RABBITMQ_PORT") or 5672
+        self.username = kwargs.get("username", "guest")
+        self.password = kwargs.get("password", "guest")
+        self.hosts = kwargs.get("hosts")
+        self.host_strategy = kwargs.get("host_strategy", ROUND_ROBIN)
+        self.host_quarantine = kwargs.get("host_quarantine", 10)
+        self.connection_attempts = kwargs.get("connection_attempts", 3)
+        self.retry_delay = kwargs.get("retry_delay", 5)
+        self.retry_interval = kwargs.get("retry_interval", 5)
+        self.is_dlk_retry_enabled = kwargs.get("is_dlk_retry_enabled", False)
+        self.retry_queue_suffix = kwargs.get("retry_queue_suffix", "retry")
+        self.max_retries = kwargs.get("max_retries", 20)
+        self.error_callback = kwargs.get("error_callback")
+        self.infinite_retry = kwargs.get("infinite_retry", False)
+        self.exchange_args = kwargs.get("exchange_args")
+        self.queue_args = kwargs.get("queue_args", {})
+        self.bound_exchange = kwargs.get("bound_exchange")
+        self.auto_ack = kwargs.get("auto_ack", True)
+        self.max_concurrency = kwargs.get("max_concurrency", 1)
+        self.prefetch_count = kwargs.get("prefetch_count", self.max_concurrency)
+        self.heart_beat = kwargs.get("heart_beat", None)
+        self.serializer = get_serializer(kwargs.get("serializer", "json"))
+        self.compression = kwargs.get("compression")
+        self.compression_threshold = kwargs.get("compression_threshold", 1024)
+
+        self.connection_parameters = ConnectionParameters(
+            host=self.host,
+            port=self.port,
+            credentials=PlainCredentials(self.username, self.password),
+            connection_attempts=self.connection_attempts,
+            retry_delay=self.retry_delay,
+            heartbeat=self.heart_beat,
+        )
+        self.cluster = None
+
+        if self.hosts:
+            self.cluster = Cluster(
+                self.hosts,
+                self.connection_parameters,
+                strategy=self.host_strategy,
+                quarantine=self.host_quarantine,
+            )
+
+        if "x-queue-type" not in self.queue_args:
+            self.queue_args["x-queue-type"] = "quorum"
+
+        self.retry_queue_name = f"{self.queue_name}.{self.retry_queue_suffix}"
+        self.retry_publisher = None
+
+        if self.is_dlk_retry_enabled:
+            self.retry_publisher = AsyncPublisher(
+                exchange_name=self.retry_queue_name,
+                queue_name=self.retry_queue_name,
+                routing_key=self.retry_queue_name,
+                exchange_type=self.exchange_type,
+                username=self.username,
+                password=self.password,
+                port=self.port,
+                host=self.host,
+                hosts=self.hosts,
+                host_strategy=self.host_strategy,
+                host_quarantine=self.host_quarantine,
+                exchange_args=self.exchange_args,
+                queue_args={
+                    "x-dead-letter-exchange": self.exchange_name,
+                    "x-dead-letter-routing-key": self.routing_key,
+                },
+                serializer=self.serializer,
+                compression=self.compression,
+                compression_threshold=self.compression_threshold,
+            )
+
+        self.connection = None
+        self.channel = None
+        self.task = None
+
+        self.__waiters = set()
+        self.__tasks = set()
+        self.__closing = False
+        self.__consumer_tag = None
+        self.__connect_lock = asyncio.Lock()
+        self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def __run_error_callback(
+        self, message: str, error: Exception, error_type: str
+    ) -> None:
+        """
+        Log error message
+        :param message: Message to be logged in error_callback
+        :param error: Error encountered in consuming the message
+        :param error_type: Type of error (CONNECT_ERROR or CONSUME_ERROR)
+        """
+        if self.error_callback:
+            try:
+                self.error_callback(message, error=error, error_type=error_type)
+
+            except Exception as exception:
+                logger.exception(exception)
+
+        else:
+            logger.exception(error)
+
+    def __send_reconnection_error_message(self, error, retry_count: int) -> None:
+        """
+        Send error message to your preferred location.
+        :param error: Error that prevented the AsyncConsumer from connecting.
+        :param retry_count: Amount retries the AsyncConsumer tried before sending an error message.
+        """
+        message = (
+            f"Service tried to reconnect to queue **{retry_count}** times "
+            f"but still failed."
+            f"\n{repr(error)}"
+        )
+        self.__run_error_callback(message, error, CONNECT_ERROR)
+
+    def __send_consume_error_message(
+        self, error: Exception, retry_count: int = 1
+    ) -> None:
+        """
+        Send error message to your preferred location.
+        :param error: Error that prevented the AsyncConsumer from processing the message.
+        :param retry_count: Amount retries the AsyncConsumer tried before sending an error message.
+        """
+        message = (
+            f"Service tried to consume message **{retry_count}** times "
+            f"but still failed."
+            f"\n{repr(error)}"
+        )
+        self.__run_error_callback(message, error, CONSUME_ERROR)
+
+    def __create_waiter(self) -> asyncio.Future:
+        """
+        Create a future for a reply from the broker. It fails if the connection or channel closes first.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.__waiters.add(future)
+        future.add_done_callback(self.__waiters.discard)
+
+        return future
+
+    @staticmethod
+    def __resolve(future: asyncio.Future, result: Any) -> None:
+        """
+        Resolve a waiter unless it already failed.
+        """
+        if not future.done():
+            future.set_result(result)
+
+    def __fail(self, reason: Any) -> None:
+        """
+        Fail every waiter and forget the channel after the connection or channel closed.
+        """
+        if not isinstance(reason, BaseException):
+            reason = AMQPConnectionError(reason)
+
+        self.channel = None
+
+        for future in list(self.__waiters):
+            if not future.done():
+                future.set_exception(reason)
+
+    def __on_connection_closed(self, connection: AsyncioConnection, reason) -> None:
+        """
+        Called by pika when the connection closes or cannot be opened.
+        """
+        if connection is self.connection:
+            self.connection = None
+            self.__fail(reason)
+
+    def __on_channel_closed(self, channel: Channel, reason) -> None:
+        """
+        Called by pika when the channel closes.
+        """
+        if self.channel in (None, channel):
+            self.__fail(reason)
+
+    def __is_connected(self) -> bool:
+        """
+        Check whether the connection and channel can still be used.
+        """
+        return bool(self.channel and self.channel.is_open and self.connection.is_open)
+
+    async def __call(self, method: Callable, **kwargs) -> Any:
+        """
+        Call a method of pika's ``Channel`` and wait for the broker's reply.
+        """
+        reply = self.__create_waiter()
+        method(callback=lambda frame: self.__resolve(reply, frame), **kwargs)
+
+        return await reply
+
+    async def __open_connection(self, parameters: ConnectionParameters) -> None:
+        """
+        Create pika's ``AsyncioConnection`` from the given connection parameters and wait for it to open.
+        """
+        connection_opened = self.__create_waiter()
+        self.connection = AsyncioConnection(
+            parameters,
+            on_open_callback=lambda connection: self.__resolve(
+                connection_opened, connection
+            ),
+            on_open_error_callback=self.__on_connection_closed,
+            on_close_callback=self.__on_connection_closed,
+            custom_ioloop=asyncio.get_running_loop(),
+        )
+        await connection_opened
+
+    async def __connect_cluster(self) -> None:
+        """
+        Open an ``AsyncioConnection`` to the first node of the cluster that accepts it.
+        :raises: The error of the last node if none of them could be connected to.
+        """
+        error = None
+
+        for node in self.cluster.ordered():
+            started_at = time.monotonic()
+
+            try:
+                await self.__open_connection(self.cluster.parameters_for(node))
+
+            except CONNECT_ERRORS as node_error:
+                logger.warning(
+                    f"Could not connect to RabbitMQ node {node[0]}:{node[1]}: {node_error!r}"
+                )
+                self.cluster.record_failure(node)
+                error = node_error
+                continue
+
+            self.cluster.record_success(node, time.monotonic() - started_at)
+
+            return
+
+        raise error
+
+    async def __open_channel(self) -> None:
+        """
+        Create pika's ``AsyncioConnection``, open a channel and declare the queues and their bindings.
+        """
+        if self.connection and self.connection.is_open:
+            self.connection.close()
+
+        if self.cluster:
+            await self.__connect_cluster()
+
+        else:
+            await self.__open_connection(self.connection_parameters)
+
+        channel_opened = self.__create_waiter()
+        self.connection.channel(
+            on_open_callback=lambda channel: self.__resolve(channel_opened, channel)
+        )
+        channel = await channel_opened
+        channel.add_on_close_callback(self.__on_channel_closed)
+
+        await self.__call(channel.basic_qos, prefetch_count=self.prefetch_count)
+        await self.declare_queue(channel)
+
+        self.channel = channel
+
+    async def declare_queue(self, channel: Channel) -> None:
+        """
+        Declare and bind a channel to a queue, and to the retry queue with DLK retry enabled.
+        """
+        await self.__call(
+            channel.exchange_declare,
+            exchange=self.exchange_name,
+            durable=True,
+            exchange_type=self.exchange_type,
+            arguments=self.exchange_args,
+        )
+        await self.__call(
+            channel.queue_declare,
+            queue=self.queue_name,
+            arguments=self.queue_args,
+            durable=True,
+        )
+        await self.__call(
+            channel.queue_bind,
+            queue=self.queue_name,
+            exchange=self.exchange_name,
+            routing_key=self.routing_key,
+            arguments=self.queue_args,
+        )
+
+        if self.bound_exchange:
+            await self.__call(
+                channel.exchange_declare,
+                exchange=self.bound_exchange["name"],
+                durable=True,
+                exchange_type=self.bound_exchange["type"],
+            )
+            await self.__call(
+                channel.exchange_bind,
+                destination=self.exchange_name,
+                source=self.bound_exchange["name"],
+                routing_key=self.routing_key,
+                arguments=self.exchange_args,
+            )
+
+        if self.is_dlk_retry_enabled:
+            await self.__call(
+                channel.exchange_declare,
+                exchange=self.retry_queue_name,
+                durable=True,
+                exchange_type=self.exchange_type,
+                arguments=self.exchange_args,
+            )
+            await self.__call(
+                channel.queue_declare,
+                queue=self.retry_queue_name,
+                arguments=self.retry_publisher.queue_args,
+                durable=True,
+            )
+            await self.__call(
+                channel.queue_bind,
+                queue=self.retry_queue_name,
+                exchange=self.retry_queue_name,
+                routing_key=self.retry_queue_name,
+                arguments=self.queue_args,
+            )
+
+    async def connect(self, retry_count=1) -> Channel:
+        """
+        Return the channel, opening pika's ``AsyncioConnection`` and declaring the queues first if there is none.
+        :param retry_count: Amount retries the AsyncConsumer tried before sending an error message.
+        """
+        async with self.__connect_lock:
+            while not self.__is_connected():
+                try:
+                    await self.__open_channel()
+
+                except CONNECTION_ERRORS as error:
+                    if not (retry_count % self.connection_attempts):
+                        self.__send_reconnection_error_message(
+                            error, self.connection_attempts * retry_count
+                        )
+
+                        if not self.infinite_retry:
+                            raise error
+
+                    await asyncio.sleep(self.retry_delay)
+
+                    retry_count += 1
+
+        return self.channel
+
+    async def start(self) -> None:
+        """
+        Connect, then consume in an ``asyncio.Task`` kept in ``task``.
+        """
+        self.__closing = False
+        await self.connect()
+
+        self.task = asyncio.create_task(self.consume())
+
+    async def consume(self) -> None:
+        """
+        Wrap pika's ``basic_consume()`` and consume until ``close()`` is called.
+        A lost connection is opened again like ``connect()`` opens it.
+        """
+        while not self.__closing:
+            channel = await self.connect()
+            channel_closed = self.__create_waiter()
+            self.__consumer_tag = channel.basic_consume(
+                self.queue_name, self.__on_message
+            )
+
+            try:
+                await channel_closed
+
+            except CONNECTION_ERRORS as error:
+                if not self.__closing:
+                    logger.warning(f"Lost connection while consuming: {error!r}")
+
+    async def close(self) -> None:
+        """
+        Stop consuming, wait for the callbacks that are running to finish, and close the connection.
+        """
+        self.__closing = True
+        channel = self.channel
+
+        if channel and channel.is_open and self.__consumer_tag:
+            with suppress(*CONNECTION_ERRORS):
+                await self.__call(
+                    channel.basic_cancel, consumer_tag=self.__consumer_tag
+                )
+
+        if self.__tasks:
+            await asyncio.gather(*self.__tasks, return_exceptions=True)
+
+        connection = self.connection
+
+        if connection and connection.is_open:
+            # Closing fails every waiter, this one included, once pika reports the connection closed.
+            connection_closed = self.__create_waiter()
+            connection.close()
+
+            with suppress(*CONNECTION_ERRORS):
+                await connection_closed
+
+        if self.task:
+            with suppress(*CONNECTION_ERRORS):
+                await self.task
+
+        if self.retry_publisher:
+            await self.retry_publisher.close()
+
+    def __on_message(self, channel: Channel, method, properties, data: bytes) -> None:
+        """
+        Called by pika for every delivery. Consumes the message in a task of its own.
+        """
+        task = asyncio.ensure_future(
+            self._consume_message(channel, method, properties, data)
+        )
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def _publish_to_retry_queue(
+        self, data: Any, properties, retry_reason: Exception
+    ) -> None:
+        """
+        Publish message to retry queue with the appropriate metadata in the headers.
+        """
+        attempt, message_properties = retry_message_properties(
+            properties, retry_reason, self.retry_interval, self.max_retries
+        )
+        self.__send_consume_error_message(retry_reason, attempt)
+
+        if attempt > self.max_retries:
+            return
+
+        await self.retry_publisher.publish(data, message_properties=message_properties)
+
+    async def __run_callback(self, channel: Channel, method, properties, data: bytes):
+        """
+        Decode a consumed message and call the callback, awaiting it if it is a coroutine.
+        Publishes the message to the retry queue or reports the error if the callback fails.
+        :return: What the callback returned.
+        """
+        serializer = negotiate_serializer(properties.content_type, self.serializer)
+        data = serializer.loads(decompress(data, properties.content_encoding))
+
+        try:
+            logger.debug("Received message from queue")
+
+            auto_ack = self.message_received_callback(
+                data, channel=channel, method=method, properties=properties
+            )
+
+            if inspect.isawaitable(auto_ack):
+                auto_ack = await auto_ack
+
+            return auto_ack
+
+        except Exception as error:
+            if self.is_dlk_retry_enabled:
+                await self._publish_to_retry_queue(data, properties, error)
+
+            else:
+                self.__send_consume_error_message(error)
+
+        return None
+
+    async def _consume_message(
+        self, channel: Channel, method, properties, data: bytes
+    ) -> None:
+        """
+        Wrap the user-provided callback, gracefully handle its errors, and
+        call pika's ``basic_ack`` once it completes. At most ``max_concurrency`` run at once.
+        :param channel: pika's Channel this message was received.
+        :param method: pika's basic Return
+        :param properties: pika's BasicProperties
+        :param data: Data received in bytes.
+        """
+        async with self.__semaphore:
+            try:
+                auto_ack = await self.__run_callback(channel, method, properties, data)
+
+            except Exception as error:
+                # E.g. a body that cannot be decoded, or the retry queue cannot be published to.
+                self.__send_consume_error_message(error)
+                auto_ack = False
+
+        # A channel that was closed meanwhile redelivers its unacked messages anyway.
+        if not channel.is_open:
+            return
+
+        if auto_ack or (auto_ack is None and self.auto_ack):
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+
+        else:
+            channel.basic_nack(delivery_tag=method.delivery_tag)
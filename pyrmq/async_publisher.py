@@ -0,0 +1,399 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ AsyncPublisher class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import suppress
+from typing import Any, Optional
+
+from pika import BasicProperties, ConnectionParameters, PlainCredentials
+from pika.adapters.asyncio_connection import AsyncioConnection
+from pika.channel import Channel
+from pika.exceptions import AMQPConnectionError, NackError, UnroutableError
+from pika.spec import PERSISTENT_DELIVERY_MODE
+
+from pyrmq.cluster import CONNECT_ERRORS, ROUND_ROBIN, Cluster
+from pyrmq.compression import compress, get_codec
+from pyrmq.confirms import NACKED, UNROUTABLE, ConfirmTracker
+from pyrmq.publisher import CONNECT_ERROR, CONNECTION_ERRORS
+from pyrmq.serializers import get_serializer, negotiate_serializer
+
+logger = logging.getLogger("pyrmq")
+
+
+class AsyncPublisher(object):
+    """
+    This class uses pika's ``AsyncioConnection`` for publishing messages to RabbitMQ from asyncio applications.
+    It takes the same arguments as :class:`~pyrmq.Publisher`. Every concurrent ``publish`` shares one
+    long-lived connection and channel, and retries wait with ``asyncio.sleep`` instead of blocking the event loop.
+
+    Important Note:
+    Like :class:`~pyrmq.Publisher`, this class does not declare or bind queues. It only verifies that exchanges exist.
+    """
+
+    def __init__(
+        self,
+        exchange_name: str,
+        queue_name: Optional[str] = "",
+        routing_key: Optional[str] = "",
+        exchange_type: Optional[str] = "direct",
+        **kwargs,
+    ):
+        """
+        :param exchange_name: The exchange name to publish to (must already exist).
+        :param queue_name: The queue name (used only for routing key if routing_key is empty).
+        :param routing_key: The routing key for message delivery. If blank, queue_name is used.
+        :param exchange_type: Exchange type to verify. Default: ``"direct"``
+        :keyword host: Your RabbitMQ host. Checks env var ``RABBITMQ_HOST``. Default: ``"localhost"``
+        :keyword port: Your RabbitMQ port. Checks env var ``RABBITMQ_PORT``. Default: ``5672``
+        :keyword username: Your RabbitMQ username. Default: ``"guest"``
+        :keyword password: Your RabbitMQ password. Default: ``"guest"``
+        :keyword hosts: RabbitMQ nodes of a cluster as ``"host"`` or ``"host:port"`` strings, used instead of ``host``.
+            Every connect tries them in the order of ``host_strategy``, one attempt each. Default: ``None``
+        :keyword host_strategy: ``"round_robin"``, ``"random"``, or ``"health"`` to prefer the nodes with the lowest
+            recent connect latency and fewest recent failures. Default: ``"round_robin"``
+        :keyword host_quarantine: Seconds a node that failed to connect is only tried after every other node. Default: ``10``
+        :keyword connection_attempts: How many times should PyRMQ try?. Default: ``3``
+        :keyword retry_delay: Seconds between connection retries. Default: ``5``
+        :keyword error_callback: Callback function to be called when connection_attempts is reached.
+        :keyword infinite_retry: Tells PyRMQ to keep on retrying to publish while firing error_callback, if any. Default: ``False``
+        :keyword exchange_args: Exchange arguments for verification. Default: ``None``
+        :keyword queue_args: Queue arguments for message properties. Default: ``{}``
+        :keyword serializer: Name of a registered serializer or a ``Serializer`` instance. Default: ``"json"``
+        :keyword compression: Name of a registered codec or a ``Codec`` instance. Default: ``None``
+        :keyword compression_threshold: Minimum body size in bytes to compress. Default: ``1024``
+        """
+
+        self.exchange_name = exchange_name
+        self.queue_name = queue_name
+        self.routing_key = routing_key
+        self.exchange_type = exchange_type
+        self.host = kwargs.get("host") or os.getenv("RABBITMQ_HOST") or "localhost"
+        self.port = kwargs.get("port") or os.getenv("RABBITMQ_PORT") or 5672
+        self.username = kwargs.get("username", "guest")
+        self.password = kwargs.get("password", "guest")
+        self.hosts = kwargs.get("hosts")
+        self.host_strategy = kwargs.get("host_strategy", ROUND_ROBIN)
+        self.host_quarantine = kwargs.get("host_quarantine", 10)
+        self.connection_attempts = kwargs.get("connection_attempts", 3)
+        self.retry_delay = kwargs.get("retry_delay", 5)
+        self.error_callback = kwargs.get("error_callback")
+        self.infinite_retry = kwargs.get("infinite_retry", False)
+        self.exchange_args = kwargs.get("exchange_args")
+        self.queue_args = kwargs.get("queue_args", {})
+        self.serializer = get_serializer(kwargs.get("serializer", "json"))
+        self.compression = get_codec(kwargs.get("compression"))
+        self.compression_threshold = kwargs.get("compression_threshold", 1024)
+
+        self.connection_parameters = ConnectionParameters(
+            host=self.host,
+            port=self.port,
+            credentials=PlainCredentials(self.username, self.password),
+            connection_attempts=self.connection_attempts,
+            retry_delay=self.retry_delay,
+        )
+        self.cluster = None
+
+        if self.hosts:
+            self.cluster = Cluster(
+                self.hosts,
+                self.connection_parameters,
+                strategy=self.host_strategy,
+                quarantine=self.host_quarantine,
+            )
+
+        if "x-queue-type" not in self.queue_args:
+            self.queue_args["x-queue-type"] = "quorum"
+
+        self.connection = None
+        self.channel = None
+
+        self.__tracker = None
+        self.__waiters = set()
+        self.__connect_lock = asyncio.Lock()
+
+    def __send_reconnection_error_message(self, error, retry_count) -> None:
+        """
+        Send error message to your preferred location.
+        :param error: Error that prevented the AsyncPublisher from sending the message.
+        :param retry_count: Amount retries the AsyncPublisher tried before sending an error message.
+        """
+        message = (
+            f"Service tried to reconnect to queue **{retry_count}** times "
+            f"but still failed."
+            f"\n{repr(error)}"
+        )
+
+        if self.error_callback:
+            try:
+                self.error_callback(message, error=error, error_type=CONNECT_ERROR)
+
+            except Exception as exception:
+                logger.exception(exception)
+
+        else:
+            logger.exception(error)
+
+    def __create_waiter(self) -> asyncio.Future:
+        """
+        Create a future for a reply from the broker. It fails if the connection or channel closes first.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.__waiters.add(future)
+        future.add_done_callback(self.__waiters.discard)
+
+        return future
+
+    @staticmethod
+    def __resolve(future: asyncio.Future, result: Any) -> None:
+        """
+        Resolve a waiter unless it already failed.
+        """
+        if not future.done():
+            future.set_result(result)
+
+    def __fail(self, reason: Any) -> None:
+        """
+        Fail every waiter and forget the channel after the connection or channel closed.
+        """
+        if not isinstance(reason, BaseException):
+            reason = AMQPConnectionError(reason)
+
+        self.channel = None
+        self.__tracker = None
+
+        for future in list(self.__waiters):
+            if not future.done():
+                future.set_exception(reason)
+
+    def __on_connection_closed(self, connection: AsyncioConnection, reason) -> None:
+        """
+        Called by pika when the connection closes or cannot be opened.
+        """
+        if connection is self.connection:
+            self.connection = None
+            self.__fail(reason)
+
+    def __on_channel_closed(self, channel: Channel, reason) -> None:
+        """
+        Called by pika when the channel closes, e.g. when the broker rejects the exchange.
+        """
+        if self.channel in (None, channel):
+            self.__fail(reason)
+
+    def __is_connected(self) -> bool:
+        """
+        Check whether the long-lived connection and channel can still be used.
+        """
+        return bool(self.channel and self.channel.is_open and self.connection.is_open)
+
+    async def __open_connection(self, parameters: ConnectionParameters) -> None:
+        """
+        Create pika's ``AsyncioConnection`` from the given connection parameters and wait for it to open.
+        """
+        connection_opened = self.__create_waiter()
+        self.connection = AsyncioConnection(
+            parameters,
+            on_open_callback=lambda connection: self.__resolve(
+                connection_opened, connection
+            ),
+            on_open_error_callback=self.__on_connection_closed,
+            on_close_callback=self.__on_connection_closed,
+            custom_ioloop=asyncio.get_running_loop(),
+        )
+        await connection_opened
+
+    async def __connect_cluster(self) -> None:
+        """
+        Open an ``AsyncioConnection`` to the first node of the cluster that accepts it.
+        :raises: The error of the last node if none of them could be connected to.
+        """
+        error = None
+
+        for node in self.cluster.ordered():
+            started_at = time.monotonic()
+
+            try:
+                await self.__open_connection(self.cluster.parameters_for(node))
+
+            except CONNECT_ERRORS as node_error:
+                logger.warning(
+                    f"Could not connect to RabbitMQ node {node[0]}:{node[1]}: {node_error!r}"
+                )
+                self.cluster.record_failure(node)
+                error = node_error
+                continue
+
+            self.cluster.record_success(node, time.monotonic() - started_at)
+
+            return
+
+        raise error
+
+    async def __open_channel(self) -> None:
+        """
+        Create pika's ``AsyncioConnection``, open a channel in confirm mode and verify the exchange exists.
+        :raises: ChannelClosedByBroker if the exchange doesn't exist
+        """
+        if self.connection and self.connection.is_open:
+            self.connection.close()
+
+        if self.cluster:
+            await self.__connect_cluster()
+
+        else:
+            await self.__open_connection(self.connection_parameters)
+
+        channel_opened = self.__create_waiter()
+        self.connection.channel(
+            on_open_callback=lambda channel: self.__resolve(channel_opened, channel)
+        )
+        channel = await channel_opened
+        channel.add_on_close_callback(self.__on_channel_closed)
+
+        tracker = ConfirmTracker(on_resolve=self.__resolve)
+        confirm_selected = self.__create_waiter()
+        tracker.attach(
+            channel, callback=lambda frame: self.__resolve(confirm_selected, frame)
+        )
+        await confirm_selected
+
+        exchange_verified = self.__create_waiter()
+        channel.exchange_declare(
+            exchange=self.exchange_name,
+            durable=True,
+            exchange_type=self.exchange_type,
+            arguments=self.exchange_args,
+            passive=True,  # Only check if exchange exists, don't create it
+            callback=lambda frame: self.__resolve(exchange_verified, frame),
+        )
+        await exchange_verified
+
+        self.__tracker = tracker
+        self.channel = channel
+
+    async def connect(self, retry_count=1) -> Channel:
+        """
+        Return the long-lived channel, opening pika's ``AsyncioConnection`` first if there is none.
+        Concurrent callers wait for the same connection attempt.
+        :param retry_count: Amount retries the AsyncPublisher tried before sending an error message.
+        :raises: ChannelClosedByBroker if the exchange doesn't exist
+        """
+        async with self.__connect_lock:
+            while not self.__is_connected():
+                try:
+                    await self.__open_channel()
+
+                except CONNECTION_ERRORS as error:
+                    if not (retry_count % self.connection_attempts):
+                        self.__send_reconnection_error_message(
+                            error, self.connection_attempts * retry_count
+                        )
+
+                        if not self.infinite_retry:
+                            raise error
+
+                    await asyncio.sleep(self.retry_delay)
+
+                    retry_count += 1
+
+        return self.channel
+
+    async def close(self) -> None:
+        """
+        Close the connection to RabbitMQ. The next publish opens a new one.
+        """
+        connection = self.connection
+
+        if connection and connection.is_open:
+            # Closing fails every waiter, this one included, once pika reports the connection closed.
+            connection_closed = self.__create_waiter()
+            connection.close()
+
+            with suppress(*CONNECTION_ERRORS):
+                await connection_closed
+
+    async def publish(
+        self,
+        data: dict,
+        message_properties: Optional[dict] = None,
+        is_priority: bool = False,
+        attempt: int = 0,
+        retry_count: int = 1,
+    ) -> None:
+        """
+        Publish data to RabbitMQ and wait for the broker to confirm it without blocking the event loop.
+        :param data: Data to be published.
+        :param message_properties: Message properties. Default: ``{"delivery_mode": 2}``.
+            For classic queues with the ``x-max-priority`` argument, use ``{"priority": N}``.
+        :param is_priority: For quorum queues, marks the message as high priority when True.
+        :param attempt: Number of attempts made.
+        :param retry_count: Amount retries the AsyncPublisher tried before sending an error message.
+        """
+        message_properties = dict(message_properties or {})
+
+        # Handle priorities for quorum queues
+        if is_priority:
+            message_properties["priority"] = 5
+
+        properties = BasicProperties(
+            **{"delivery_mode": PERSISTENT_DELIVERY_MODE, **message_properties}
+        )
+        serializer = negotiate_serializer(properties.content_type, self.serializer)
+        properties.content_type = properties.content_type or serializer.content_type
+        routing_key = self.routing_key or self.queue_name
+        body, properties = compress(
+            serializer.dumps(data),
+            properties,
+            self.compression,
+            self.compression_threshold,
+        )
+        channel = await self.connect()
+
+        try:
+            confirmed = self.__create_waiter()
+            self.__tracker.track(confirmed, routing_key, body)
+            channel.basic_publish(
+                exchange=self.exchange_name,
+                routing_key=routing_key,
+                body=body,
+                properties=properties,
+                mandatory=True,
+            )
+            result = await confirmed
+
+            if result == UNROUTABLE:
+                logger.warning(
+                    f"Message could not be routed to any queue. Exchange: {self.exchange_name}, "
+                    f"Routing key: {routing_key}"
+                )
+                raise UnroutableError([])
+
+            if result == NACKED:
+                raise NackError([])
+
+        except CONNECTION_ERRORS as error:
+            if not (retry_count % self.connection_attempts):
+                self.__send_reconnection_error_message(error, retry_count)
+
+                if not self.infinite_retry:
+                    raise error
+
+            await asyncio.sleep(self.retry_delay)
+
+            await self.publish(
+                data,
+                message_properties=message_properties,
+                is_priority=is_priority,
+                attempt=attempt,
+                retry_count=(retry_count + 1),
+            )
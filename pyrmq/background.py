@@ -0,0 +1,431 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ PublishQueue class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from queue import Full
+from threading import Condition, Event, Thread
+from typing import Callable, List, Optional, Tuple
+
+from pika import BasicProperties
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.exceptions import AMQPError, ChannelClosedByBroker, ChannelWrongStateError
+
+from pyrmq.confirms import NACKED, UNROUTABLE, ConfirmTracker
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+RAISE = "raise"
+REJECTED = "rejected"
+
+logger = logging.getLogger("pyrmq")
+
+Message = Tuple[str, str, bytes, BasicProperties]
+
+
+class PublishQueue(object):
+    """
+    A bounded in-memory queue of messages published by a background thread.
+
+    ``put`` returns as soon as the message is queued. The background thread owns its own connection
+    and publishes the queued messages in batches, flushing a batch once it holds ``batch_size`` messages
+    or ``linger`` seconds after its first message was queued, whichever comes first. All confirms of
+    a batch are awaited together. Messages lost to a connection failure or nacked by the broker are
+    published again; messages the broker could not route are logged and dropped.
+
+    When the broker closes the channel, e.g. because an exchange does not exist, the unconfirmed messages
+    of the batch are published again one by one. Messages the broker closes the channel on by themselves
+    are logged, counted in ``failed`` and dropped instead of being retried forever. With ``verify_exchange``,
+    so are messages whose exchange does not exist, without being published.
+
+    Should ``close`` time out while the broker is unreachable, the background thread stops retrying at its next
+    connection failure, and the messages it could not publish are logged and counted in ``failed``.
+    """
+
+    def __init__(
+        self,
+        open_channel: Callable[[], BlockingChannel],
+        max_size: int = 10000,
+        batch_size: int = 100,
+        linger: float = 0.005,
+        full_policy: str = BLOCK,
+        retry_delay: float = 5,
+        verify_exchange: Optional[Callable[[BlockingChannel, str], None]] = None,
+    ):
+        """
+        :param open_channel: Callable that opens a new connection and returns a channel that is not in confirm mode yet.
+        :param max_size: Maximum number of queued messages. Default: ``10000``
+        :param batch_size: Maximum number of messages per batch. Default: ``100``
+        :param linger: Seconds a batch waits for more messages before it is published. Default: ``0.005``
+        :param full_policy: What ``put`` does when the queue is full: ``"block"`` until there is room,
+            ``"drop_oldest"`` queued message, or ``"raise"`` ``queue.Full``. Default: ``"block"``
+        :param retry_delay: Seconds to wait before publishing a batch again after the connection failed. Default: ``5``
+        :param verify_exchange: Called on the background thread with its channel and a message's exchange before
+            the message is published. It raises ``ChannelClosedByBroker`` if the exchange does not exist,
+            without closing the channel. Default: ``None``
+        """
+        if full_policy not in (BLOCK, DROP_OLDEST, RAISE):
+            raise ValueError(
+                f"Unknown full_policy {full_policy!r}. Choose from {[BLOCK, DROP_OLDEST, RAISE]}."
+            )
+
+        self.open_channel = open_channel
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.linger = linger
+        self.full_policy = full_policy
+        self.retry_delay = retry_delay
+        self.verify_exchange = verify_exchange
+        self.dropped = 0
+        self.failed = 0
+
+        self.__queue = deque()
+        self.__unfinished = 0
+        self.__condition = Condition()
+        self.__closing = Event()
+        self.__abandoned = Event()
+        self.__thread = None
+        self.__channel = None
+        self.__tracker = None
+        self.__closed_reason = None
+        self.__results = {}
+
+    def __len__(self) -> int:
+        """
+        Number of queued messages that are not picked up by a batch yet.
+        """
+        return len(self.__queue)
+
+    def put(
+        self,
+        exchange: str,
+        routing_key: str,
+        body: bytes,
+        properties: BasicProperties,
+    ) -> None:
+        """
+        Queue a message for the background thread. Only blocks when the queue is full and ``full_policy`` is ``"block"``.
+        :param exchange: Exchange to publish to.
+        :param routing_key: Routing key to publish with.
+        :param body: Serialized message.
+        :param properties: Message properties.
+        :raises: queue.Full if the queue is full and ``full_policy`` is ``"raise"``
+        """
+        with self.__condition:
+            if len(self.__queue) >= self.max_size:
+                if self.full_policy == RAISE:
+                    raise Full(f"{self.max_size} messages are already queued.")
+
+                if self.full_policy == DROP_OLDEST:
+                    self.__queue.popleft()
+                    self.__unfinished -= 1
+                    self.dropped += 1
+
+                else:
+                    self.__condition.wait_for(lambda: len(self.__queue) < self.max_size)
+
+            self.__queue.append((exchange, routing_key, body, properties))
+            self.__unfinished += 1
+
+            # The background thread only needs to wake up to start a batch or to flush a full one.
+            if len(self.__queue) in (1, self.batch_size):
+                self.__condition.notify_all()
+
+            if not (self.__thread and self.__thread.is_alive()):
+                self.__abandoned.clear()
+                self.__thread = Thread(target=self.__run, daemon=True)
+                self.__thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued message was published and confirmed.
+        :param timeout: Seconds to wait. Waits indefinitely when ``None``.
+        :return: Whether every message was confirmed before the timeout.
+        """
+        with self.__condition:
+            self.__condition.notify_all()
+
+            return self.__condition.wait_for(
+                lambda: not self.__unfinished, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Publish the queued messages, then stop the background thread and close its connection.
+        :param timeout: Seconds to wait for the background thread to finish. Waits indefinitely when ``None``.
+            If it is still retrying to connect by then, it gives up on the messages it could not publish.
+        """
+        thread = self.__thread
+        self.__closing.set()
+
+        with self.__condition:
+            self.__condition.notify_all()
+
+        if thread:
+            thread.join(timeout)
+
+            if thread.is_alive():
+                self.__abandoned.set()
+
+        self.__closing.clear()
+
+    def __next_batch(self) -> List[Message]:
+        """
+        Wait for a batch to fill up or linger long enough. Returns nothing once closing with an empty queue.
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__queue or self.__closing.is_set())
+            deadline = time.monotonic() + self.linger
+
+            while len(self.__queue) < self.batch_size and not self.__closing.is_set():
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0 or not self.__condition.wait(remaining):
+                    break
+
+            batch = [
+                self.__queue.popleft()
+                for _ in range(min(self.batch_size, len(self.__queue)))
+            ]
+            # Make room for producers blocked on a full queue.
+            self.__condition.notify_all()
+
+            return batch
+
+    def __done(self, count: int) -> None:
+        """
+        Mark messages as confirmed for ``flush``.
+        """
+        with self.__condition:
+            self.__unfinished -= count
+            self.__condition.notify_all()
+
+    def __connect(self) -> None:
+        """
+        Open the background thread's channel and put it in confirm mode.
+        """
+        channel = self.open_channel()
+
+        def on_resolve(index: int, result: str) -> None:
+            self.__results[index] = result
+
+            if not self.__tracker.pending:
+                # Wake up process_data_events() as soon as the last confirm is in.
+                channel.connection.add_callback_threadsafe(lambda: None)
+
+        def on_close(impl, reason: Exception) -> None:
+            self.__closed_reason = reason
+
+        self.__closed_reason = None
+        self.__tracker = ConfirmTracker(on_resolve=on_resolve)
+        self.__tracker.attach(channel)
+        channel._impl.add_on_close_callback(on_close)
+        self.__channel = channel
+
+    def __disconnect(self) -> None:
+        """
+        Close the background thread's connection, ignoring errors from connections that are already gone.
+        """
+        channel = self.__channel
+        self.__channel = None
+
+        if channel and channel.connection.is_open:
+            with suppress(AMQPError, OSError):
+                channel.connection.close()
+
+    def __publish(self, batch: List[Message]) -> List[Message]:
+        """
+        Publish a batch on a connected channel and wait for all of its confirms.
+        :return: The messages that were nacked and need to be published again.
+        :raises: ChannelClosedByBroker if the broker closed the channel before every message was confirmed.
+        """
+        self.__results.clear()
+
+        for index, (exchange, routing_key, body, properties) in enumerate(batch):
+            if self.verify_exchange:
+                try:
+                    self.verify_exchange(self.__channel, exchange)
+
+                except ChannelClosedByBroker as error:
+                    self.__results[index] = REJECTED
+                    self.__drop(exchange, routing_key, error)
+                    continue
+
+            self.__tracker.track(index, routing_key, body)
+            self.__channel.basic_publish(
+                exchange=exchange,
+                routing_key=routing_key,
+                body=body,
+                properties=properties,
+                mandatory=True,
+            )
+
+        while self.__tracker.pending:
+            if not self.__channel.is_open:
+                if isinstance(self.__closed_reason, ChannelClosedByBroker):
+                    raise self.__closed_reason
+
+                raise ChannelWrongStateError(
+                    "Channel closed before every message was confirmed."
+                )
+
+            self.__channel.connection.process_data_events(time_limit=1)
+
+        results = [self.__results[index] for index in range(len(batch))]
+        unroutable_count = results.count(UNROUTABLE)
+
+        if unroutable_count:
+            logger.warning(
+                f"{unroutable_count} message(s) could not be routed to any queue."
+            )
+
+        return [message for message, result in zip(batch, results) if result == NACKED]
+
+    def __unresolved(self, batch: List[Message]) -> List[Message]:
+        """
+        The messages of the last published batch that were neither confirmed nor reported unroutable.
+        """
+        return [
+            message
+            for index, message in enumerate(batch)
+            if self.__results.get(index, NACKED) == NACKED
+        ]
+
+    def __publish_all(self, batch: List[Message]) -> None:
+        """
+        Publish a batch until every message is confirmed, unroutable or rejected by the broker.
+        Connection failures, including failing to open the channel, are retried after ``retry_delay`` seconds.
+        """
+        batches = [batch]
+
+        while batches:
+            batch = batches.pop()
+
+            try:
+                if not (self.__channel and self.__channel.is_open):
+                    self.__connect()
+
+            except Exception as error:
+                if not self.__retry_later(batch, batches, error):
+                    return
+
+                continue
+
+            try:
+                nacked = self.__publish(batch)
+
+            except ChannelClosedByBroker as error:
+                self.__reject(batch, batches, error)
+
+            except Exception as error:
+                if not self.__retry_later(batch, batches, error):
+                    return
+
+            else:
+                if nacked:
+                    batches.append(nacked)
+
+    def __reject(
+        self,
+        batch: List[Message],
+        batches: List[List[Message]],
+        error: ChannelClosedByBroker,
+    ) -> None:
+        """
+        Queue the unconfirmed messages of a batch the broker closed the channel on to be published
+        one by one, or drop the message if it was published by itself.
+        """
+        self.__disconnect()
+        unresolved = self.__unresolved(batch)
+
+        if len(batch) > 1:
+            # Publish them one by one, so only the messages the broker rejects are dropped.
+            batches.extend([message] for message in reversed(unresolved))
+            return
+
+        for exchange, routing_key, _, _ in unresolved:
+            self.__drop(exchange, routing_key, error)
+
+    def __drop(self, exchange: str, routing_key: str, error: Exception) -> None:
+        """
+        Log and count a message the broker rejected.
+        """
+        self.failed += 1
+        logger.error(
+            f"Dropped a message the broker rejected. Exchange: {exchange}, "
+            f"Routing key: {routing_key}: {error!r}"
+        )
+
+    def __retry_later(
+        self, batch: List[Message], batches: List[List[Message]], error: Exception
+    ) -> bool:
+        """
+        Log why a batch could not be published, drop the connection, wait ``retry_delay`` seconds
+        and queue the batch to be published again.
+        :return: ``False`` if ``close`` gave up on the batch and the ones left instead.
+        """
+        if self.__abandoned.is_set():
+            self.__abandon(
+                [*batch, *(message for pending in batches for message in pending)],
+                error,
+            )
+
+            return False
+
+        logger.warning(
+            f"Could not publish a batch of {len(batch)} message(s), "
+            f"retrying in {self.retry_delay} seconds: {error!r}"
+        )
+        self.__disconnect()
+        # Closing with a timeout cuts the wait short.
+        self.__abandoned.wait(self.retry_delay)
+        batches.append(batch)
+
+        return True
+
+    def __abandon(self, messages: List[Message], error: Optional[Exception]) -> None:
+        """
+        Give up on messages after ``close`` timed out, logging and counting them in ``failed``.
+        """
+        if not messages:
+            return
+
+        self.failed += len(messages)
+        logger.error(
+            f"Dropped {len(messages)} message(s) that could not be published before closing: {error!r}"
+        )
+
+    def __run(self) -> None:
+        """
+        Publish batches until the queue is closed and empty.
+        """
+        try:
+            while True:
+                batch = self.__next_batch()
+
+                if not batch:
+                    return
+
+                self.__publish_all(batch)
+                self.__done(len(batch))
+
+                if self.__abandoned.is_set():
+                    with self.__condition:
+                        abandoned = list(self.__queue)
+                        self.__queue.clear()
+
+                    self.__abandon(abandoned, None)
+                    self.__done(len(abandoned))
+                    return
+
+        finally:
+            self.__disconnect()
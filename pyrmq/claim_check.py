@@ -0,0 +1,160 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ claim checks and their blob stores
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import os
+import tempfile
+import uuid
+from contextlib import suppress
+from typing import Any, Callable, Optional, Tuple
+
+from pika import BasicProperties
+
+# Header carrying the blob store key of a message whose body was checked in.
+CLAIM_CHECK_HEADER = "x-claim-check"
+
+
+class BlobStore(object):
+    """
+    Stores message bodies that are too large to travel through RabbitMQ. Subclasses implement
+    another backend, e.g. an object storage bucket shared by publishers and consumers.
+    """
+
+    def put(self, body: bytes) -> str:
+        """
+        Store a message body.
+        :param body: Serialized and possibly compressed message.
+        :return: The key the body can be fetched by.
+        """
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        """
+        Fetch a stored message body.
+        :param key: Key returned by ``put``.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """
+        Delete a stored message body. Deleting a missing key does nothing.
+        :param key: Key returned by ``put``.
+        """
+        raise NotImplementedError
+
+
+class FileSystemBlobStore(BlobStore):
+    """
+    Stores message bodies as files in a directory, e.g. on a volume mounted by publishers and consumers.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: Directory of the stored bodies. It is created if it does not exist.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def __path(self, key: str) -> str:
+        # Keys come from message headers, so they must not point outside the directory.
+        if os.path.basename(key) != key:
+            raise ValueError(f"Invalid blob key {key!r}.")
+
+        return os.path.join(self.directory, key)
+
+    def put(self, body: bytes) -> str:
+        key = uuid.uuid4().hex
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(body)
+
+            # Consumers never see a partially written body.
+            os.replace(temporary_path, self.__path(key))
+
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temporary_path)
+
+            raise
+
+        return key
+
+    def get(self, key: str) -> bytes:
+        with open(self.__path(key), "rb") as file:
+            return file.read()
+
+    def delete(self, key: str) -> None:
+        with suppress(FileNotFoundError):
+            os.remove(self.__path(key))
+
+
+class ClaimCheck(object):
+    """
+    The data of a consumed message whose body is in a blob store, fetched only once ``load`` is called.
+    Consumers pass it to their callback instead of the data when ``claim_check_lazy`` is set.
+    """
+
+    def __init__(self, key: str, loader: Callable[[], Any]):
+        """
+        :param key: Blob store key of the message body.
+        :param loader: Callable that fetches and deserializes the body.
+        """
+        self.key = key
+        self.__loader = loader
+        self.__loaded = False
+        self.__data = None
+
+    def load(self) -> Any:
+        """
+        Fetch and deserialize the message body. Later calls return the same data.
+        """
+        if not self.__loaded:
+            self.__data = self.__loader()
+            self.__loaded = True
+
+        return self.__data
+
+
+def check_in(
+    body: bytes,
+    properties: BasicProperties,
+    store: Optional[BlobStore],
+    threshold: int,
+) -> Tuple[bytes, BasicProperties]:
+    """
+    Move a body that is at least ``threshold`` bytes long to the blob store and publish its key in its place.
+    The given properties are left untouched; checked in bodies get a copy with the key in their headers.
+    :param body: Serialized and possibly compressed message.
+    :param properties: The message's properties.
+    :param store: Blob store to check in to, or ``None`` to check in nothing.
+    :param threshold: Minimum body size in bytes to check in.
+    :return: The body and properties to publish.
+    """
+    if store is None or len(body) < threshold:
+        return body, properties
+
+    key = store.put(body)
+    checked_in_properties = BasicProperties(
+        **{
+            **properties.__dict__,
+            "headers": {**(properties.headers or {}), CLAIM_CHECK_HEADER: key},
+        }
+    )
+
+    return b"", checked_in_properties
+
+
+def claim_check_key(properties: BasicProperties) -> Optional[str]:
+    """
+    The blob store key of a consumed message, or ``None`` if its body travelled through RabbitMQ.
+    :param properties: The message's properties.
+    """
+    return (properties.headers or {}).get(CLAIM_CHECK_HEADER)
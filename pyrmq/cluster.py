@@ -0,0 +1,200 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ Cluster class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import copy
+import logging
+import random
+import time
+from threading import Lock
+from typing import Iterable, List, Optional, Tuple, Union
+
+from pika import BlockingConnection, ConnectionParameters
+from pika.adapters.utils.connection_workflow import AMQPConnectorException
+from pika.exceptions import AMQPConnectionError
+
+ROUND_ROBIN = "round_robin"
+RANDOM = "random"
+HEALTH = "health"
+
+# Errors meaning a node cannot be connected to, so the next one is tried.
+CONNECT_ERRORS = (
+    AMQPConnectionError,
+    AMQPConnectorException,
+    ConnectionError,
+)
+
+logger = logging.getLogger("pyrmq")
+
+Node = Tuple[str, int]
+
+
+class NodeHealth(object):
+    """
+    Recent connect latency and failures of a broker node.
+    """
+
+    def __init__(self):
+        self.latency = 0.0
+        self.failures = 0.0
+        self.failed_at = None
+
+    def score(self, failure_penalty: float) -> float:
+        """
+        Lower is healthier: the moving average of connect latency plus a penalty per recent failure.
+        """
+        return self.latency + self.failures * failure_penalty
+
+
+class Cluster(object):
+    """
+    Connects to one of several RabbitMQ nodes, trying them in the order of a selection strategy.
+
+    Each node gets a single connection attempt, so a dead node costs one failed connect instead of
+    ``connection_attempts * retry_delay`` seconds before the next node is tried. Nodes that failed
+    are quarantined for ``quarantine`` seconds: they are tried only after every other node.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[Union[str, Node]],
+        parameters: ConnectionParameters,
+        strategy: str = ROUND_ROBIN,
+        quarantine: float = 10,
+        failure_penalty: float = 1,
+    ):
+        """
+        :param nodes: Nodes as ``"host"`` or ``"host:port"`` strings or ``(host, port)`` tuples.
+        :param parameters: Connection parameters shared by every node. Their port is the default port of the nodes.
+        :param strategy: ``"round_robin"``, ``"random"``, or ``"health"`` to prefer the nodes with the lowest
+            recent connect latency and fewest recent failures. Default: ``"round_robin"``
+        :param quarantine: Seconds a node that failed is tried only after every other node. Default: ``10``
+        :param failure_penalty: Seconds of latency a recent failure weighs in the ``"health"`` strategy. Default: ``1``
+        """
+        if strategy not in (ROUND_ROBIN, RANDOM, HEALTH):
+            raise ValueError(
+                f"Unknown strategy {strategy!r}. Choose from {[ROUND_ROBIN, RANDOM, HEALTH]}."
+            )
+
+        self.nodes = [self.__parse(node, parameters.port) for node in nodes]
+
+        if not self.nodes:
+            raise ValueError("A cluster needs at least one node.")
+
+        self.parameters = parameters
+        self.strategy = strategy
+        self.quarantine = quarantine
+        self.failure_penalty = failure_penalty
+        self.health = {node: NodeHealth() for node in self.nodes}
+
+        self.__lock = Lock()
+        self.__next = 0
+
+    @staticmethod
+    def __parse(node: Union[str, Node], default_port: int) -> Node:
+        """
+        Split a ``"host:port"`` string into a host and a port.
+        """
+        if not isinstance(node, str):
+            host, port = node
+            return host, int(port)
+
+        host, separator, port = node.rpartition(":")
+
+        if separator and port.isdigit() and not host.endswith(":"):
+            return host.strip("[]"), int(port)
+
+        return node, int(default_port)
+
+    def __is_quarantined(self, node: Node, now: float) -> bool:
+        failed_at = self.health[node].failed_at
+
+        return failed_at is not None and now - failed_at < self.quarantine
+
+    def ordered(self) -> List[Node]:
+        """
+        The nodes in the order the next connect tries them: by strategy, with quarantined nodes last.
+        """
+        with self.__lock:
+            if self.strategy == ROUND_ROBIN:
+                start = self.__next
+                self.__next = (self.__next + 1) % len(self.nodes)
+                nodes = self.nodes[start:] + self.nodes[:start]
+
+            elif self.strategy == RANDOM:
+                nodes = random.sample(self.nodes, len(self.nodes))
+
+            else:
+                nodes = sorted(
+                    self.nodes,
+                    key=lambda node: self.health[node].score(self.failure_penalty),
+                )
+
+            now = time.monotonic()
+
+            # sorted() is stable, so both groups keep the strategy's order.
+            return sorted(nodes, key=lambda node: self.__is_quarantined(node, now))
+
+    def record_success(self, node: Node, latency: float) -> None:
+        """
+        Record a successful connect to a node and how many seconds it took.
+        """
+        with self.__lock:
+            health = self.health[node]
+            health.latency = (
+                latency if not health.latency else 0.8 * health.latency + 0.2 * latency
+            )
+            health.failures /= 2
+            health.failed_at = None
+
+    def record_failure(self, node: Node) -> None:
+        """
+        Record a failed connect to a node and quarantine it.
+        """
+        with self.__lock:
+            health = self.health[node]
+            health.failures += 1
+            health.failed_at = time.monotonic()
+
+    def parameters_for(self, node: Node) -> ConnectionParameters:
+        """
+        Connection parameters of a node, making a single connection attempt.
+        """
+        parameters = copy.copy(self.parameters)
+        parameters.host, parameters.port = node
+        parameters.connection_attempts = 1
+
+        return parameters
+
+    def connect(self) -> BlockingConnection:
+        """
+        Connect to the first node that accepts the connection.
+        :raises: The error of the last node if none of them could be connected to.
+        """
+        error: Optional[Exception] = None
+
+        for node in self.ordered():
+            started_at = time.monotonic()
+
+            try:
+                connection = BlockingConnection(self.parameters_for(node))
+
+            except CONNECT_ERRORS as node_error:
+                logger.warning(
+                    f"Could not connect to RabbitMQ node {node[0]}:{node[1]}: {node_error!r}"
+                )
+                self.record_failure(node)
+                error = node_error
+                continue
+
+            self.record_success(node, time.monotonic() - started_at)
+
+            return connection
+
+        raise error
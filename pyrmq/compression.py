@@ -0,0 +1,165 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ compression codecs and their registry
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import gzip
+import zlib
+from typing import Dict, Optional, Tuple, Type, Union
+
+from pika import BasicProperties
+
+
+class Codec(object):
+    """
+    Compresses message bodies. Subclasses set the ``content_encoding`` that is published with
+    the messages they compressed and that consumers decompress them by.
+    """
+
+    content_encoding = None
+
+    def compress(self, body: bytes) -> bytes:
+        """
+        Compress a message body.
+        :param body: Serialized message.
+        """
+        raise NotImplementedError
+
+    def decompress(self, body: bytes) -> bytes:
+        """
+        Decompress a message body.
+        :param body: Body of a consumed message.
+        """
+        raise NotImplementedError
+
+
+class GzipCodec(Codec):
+    """
+    Compresses with gzip from the standard library.
+    """
+
+    content_encoding = "gzip"
+
+    def __init__(self, level: int = 6):
+        """
+        :param level: Compression level from 0 (none) to 9 (smallest). Default: ``6``
+        """
+        self.level = level
+
+    def compress(self, body: bytes) -> bytes:
+        # mtime is fixed so equal bodies compress to equal bytes.
+        return gzip.compress(body, compresslevel=self.level, mtime=0)
+
+    def decompress(self, body: bytes) -> bytes:
+        return gzip.decompress(body)
+
+
+class ZlibCodec(Codec):
+    """
+    Compresses with zlib from the standard library. Smaller headers than gzip.
+    """
+
+    content_encoding = "deflate"
+
+    def __init__(self, level: int = 6):
+        """
+        :param level: Compression level from 0 (none) to 9 (smallest). Default: ``6``
+        """
+        self.level = level
+
+    def compress(self, body: bytes) -> bytes:
+        return zlib.compress(body, self.level)
+
+    def decompress(self, body: bytes) -> bytes:
+        return zlib.decompress(body)
+
+
+CODECS: Dict[str, Type[Codec]] = {
+    "gzip": GzipCodec,
+    "zlib": ZlibCodec,
+}
+CONTENT_ENCODINGS: Dict[str, str] = {
+    GzipCodec.content_encoding: "gzip",
+    ZlibCodec.content_encoding: "zlib",
+}
+
+_instances: Dict[str, Codec] = {}
+
+
+def register_codec(name: str, codec: Type[Codec]) -> None:
+    """
+    Make a codec available by name to Publishers, and to Consumers by its ``content_encoding``.
+    :param name: Name to pass as the ``compression`` keyword.
+    :param codec: ``Codec`` subclass.
+    """
+    CODECS[name] = codec
+    CONTENT_ENCODINGS[codec.content_encoding] = name
+    _instances.pop(name, None)
+
+
+def get_codec(codec: Union[str, Codec, None]) -> Optional[Codec]:
+    """
+    Get a codec by its registered name.
+    :param codec: Registered name, a ``Codec`` instance which is returned as is, or ``None``.
+    :raises: ValueError if no codec is registered under the name
+    """
+    if codec is None or isinstance(codec, Codec):
+        return codec
+
+    instance = _instances.get(codec)
+
+    if instance is None:
+        if codec not in CODECS:
+            raise ValueError(
+                f"Unknown compression {codec!r}. Choose from {sorted(CODECS)}."
+            )
+
+        instance = _instances[codec] = CODECS[codec]()
+
+    return instance
+
+
+def compress(
+    body: bytes,
+    properties: BasicProperties,
+    codec: Optional[Codec],
+    threshold: int,
+) -> Tuple[bytes, BasicProperties]:
+    """
+    Compress a body that is at least ``threshold`` bytes long and set its ``content_encoding``.
+    Bodies whose properties already carry a ``content_encoding`` were encoded by the caller and are left as they are.
+    The given properties are left untouched; compressed bodies get a copy.
+    :param body: Serialized message.
+    :param properties: The message's properties.
+    :param codec: Codec to compress with, or ``None`` to compress nothing.
+    :param threshold: Minimum body size in bytes to compress.
+    :return: The body and properties to publish.
+    """
+    if properties.content_encoding or codec is None or len(body) < threshold:
+        return body, properties
+
+    compressed_properties = BasicProperties(
+        **{**properties.__dict__, "content_encoding": codec.content_encoding}
+    )
+
+    return codec.compress(body), compressed_properties
+
+
+def decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """
+    Decompress a consumed body according to its ``content_encoding``.
+    Bodies without a registered content encoding are returned as they are.
+    :param body: Body of a consumed message.
+    :param content_encoding: The message's ``content_encoding`` property.
+    """
+    name = CONTENT_ENCODINGS.get(content_encoding) if content_encoding else None
+
+    if name is None:
+        return body
+
+    return get_codec(name).decompress(body)
@@ -0,0 +1,388 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ ConfirmTracker and ConfirmWindow classes
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import logging
+import statistics
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import suppress
+from threading import BoundedSemaphore, Lock, Thread
+from typing import Any, Callable, Optional, Union
+
+from pika import BasicProperties
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.channel import Channel
+from pika.exceptions import AMQPError, ChannelClosedByBroker
+from pika.spec import Basic
+
+CONFIRMED = "CONFIRMED"
+NACKED = "NACKED"
+UNROUTABLE = "UNROUTABLE"
+
+logger = logging.getLogger("pyrmq")
+
+
+class ConfirmTracker(object):
+    """
+    Tracks publisher confirms for messages published on one channel without waiting
+    for each message's confirm before publishing the next one.
+
+    Every tracked message is resolved exactly once as ``CONFIRMED``, ``NACKED`` or ``UNROUTABLE``.
+    Cumulative confirms (``multiple=True``) resolve every pending delivery tag up to theirs.
+    """
+
+    def __init__(self, on_resolve: Optional[Callable[[Any, str], None]] = None):
+        """
+        :param on_resolve: Callback called with a message's reference and result once it is resolved.
+        """
+        self.on_resolve = on_resolve
+        self.delivery_tag = 0
+        self.pending = {}
+        self.returned = set()
+
+    def attach(
+        self,
+        channel: Union[BlockingChannel, Channel],
+        callback: Optional[Callable] = None,
+    ) -> None:
+        """
+        Put a channel in confirm mode and report its confirms and returns to this tracker.
+        :param channel: A fresh pika channel that is not in confirm mode yet.
+        :param callback: Called once the broker has put the channel in confirm mode.
+        """
+        # BlockingChannel.confirm_delivery() makes every basic_publish wait for its own confirm.
+        # Enabling confirms on the underlying channel lets many messages share one wait instead.
+        impl = getattr(channel, "_impl", channel)
+        impl.confirm_delivery(ack_nack_callback=self.on_confirm, callback=callback)
+        impl.add_on_return_callback(self.on_return)
+
+    def track(self, reference: Any, routing_key: str, body: bytes) -> int:
+        """
+        Register a message that is about to be published on the tracked channel.
+        :param reference: Anything that identifies the message to ``on_resolve``.
+        :param routing_key: Routing key the message is published with.
+        :param body: Body the message is published with.
+        :return: The delivery tag the broker will confirm the message with.
+        """
+        self.delivery_tag += 1
+        self.pending[self.delivery_tag] = (reference, routing_key, body)
+
+        return self.delivery_tag
+
+    def on_return(self, channel, method, properties, body: bytes) -> None:
+        """
+        Mark a message the broker could not route as unroutable. Its confirm follows the return.
+        Returns carry no delivery tag, so the oldest pending message with the same routing key
+        and body is the one marked. Messages sharing both are routed alike.
+        """
+        for delivery_tag, (_, routing_key, pending_body) in self.pending.items():
+            if delivery_tag in self.returned:
+                continue
+
+            if routing_key == method.routing_key and pending_body == body:
+                self.returned.add(delivery_tag)
+                return
+
+    def on_confirm(self, frame) -> None:
+        """
+        Resolve the messages covered by a ``Basic.Ack`` or ``Basic.Nack`` from the broker.
+        :param frame: pika's method frame of the confirm.
+        """
+        method = frame.method
+        result = CONFIRMED if isinstance(method, Basic.Ack) else NACKED
+
+        if method.multiple:
+            # Pending delivery tags are kept in publish order, so the covered ones come first.
+            delivery_tags = []
+
+            for delivery_tag in self.pending:
+                if delivery_tag > method.delivery_tag:
+                    break
+
+                delivery_tags.append(delivery_tag)
+
+        else:
+            delivery_tags = [method.delivery_tag]
+
+        for delivery_tag in delivery_tags:
+            self.__resolve(delivery_tag, result)
+
+    def __resolve(self, delivery_tag: int, result: str) -> None:
+        """
+        Resolve one pending message.
+        """
+        pending = self.pending.pop(delivery_tag, None)
+
+        if pending is None:
+            return
+
+        if delivery_tag in self.returned:
+            self.returned.discard(delivery_tag)
+            result = UNROUTABLE
+
+        if self.on_resolve:
+            self.on_resolve(pending[0], result)
+
+
+class ConfirmWindow(object):
+    """
+    Publishes messages without waiting for their publisher confirms.
+
+    Messages are handed to a background thread that owns its own connection and publishes them
+    as fast as the broker allows. Each message gets a ``Future`` that resolves to ``CONFIRMED``,
+    ``NACKED`` or ``UNROUTABLE`` once its confirm arrives, or fails with the connection error
+    that lost it. At most ``max_in_flight`` messages are left unconfirmed at any time.
+
+    With ``verify_exchange``, a message whose exchange does not exist fails its own future with
+    ``ChannelClosedByBroker`` without being published.
+    """
+
+    def __init__(
+        self,
+        open_channel: Callable[[], BlockingChannel],
+        max_in_flight: int = 1000,
+        latency_samples: int = 1000,
+        verify_exchange: Optional[Callable[[BlockingChannel, str], None]] = None,
+    ):
+        """
+        :param open_channel: Callable that opens a new connection and returns a channel that is not in confirm mode yet.
+        :param max_in_flight: Maximum number of unconfirmed messages. Publishing blocks once it is reached. Default: ``1000``
+        :param latency_samples: Number of recent confirm latencies kept for ``latency_stats``. Default: ``1000``
+        :param verify_exchange: Called on the background thread with its channel and a message's exchange before
+            the message is published. It raises ``ChannelClosedByBroker`` if the exchange does not exist,
+            without closing the channel. Default: ``None``
+        """
+        self.open_channel = open_channel
+        self.max_in_flight = max_in_flight
+        self.verify_exchange = verify_exchange
+        self.latencies = deque(maxlen=latency_samples)
+
+        self.__slots = BoundedSemaphore(max_in_flight)
+        self.__outgoing = deque()
+        self.__start_lock = Lock()
+        self.__thread = None
+        self.__channel = None
+        self.__tracker = None
+        self.__closing = False
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of messages published or waiting to be published that are not confirmed yet.
+        """
+        tracker = self.__tracker
+
+        return len(self.__outgoing) + (len(tracker.pending) if tracker else 0)
+
+    def latency_stats(self) -> dict:
+        """
+        Summarize the recent confirm latencies, in seconds, from publish to confirm.
+        :return: ``count``, ``min``, ``mean``, ``p50``, ``p99`` and ``max`` of the recent samples.
+        """
+        samples = sorted(self.latencies)
+
+        if not samples:
+            return {"count": 0}
+
+        return {
+            "count": len(samples),
+            "min": samples[0],
+            "mean": statistics.fmean(samples),
+            "p50": samples[int(0.5 * (len(samples) - 1))],
+            "p99": samples[int(0.99 * (len(samples) - 1))],
+            "max": samples[-1],
+        }
+
+    def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        body: bytes,
+        properties: BasicProperties,
+    ) -> Future:
+        """
+        Queue a message for publishing. Blocks only while ``max_in_flight`` messages are unconfirmed.
+        :param exchange: Exchange to publish to.
+        :param routing_key: Routing key to publish with.
+        :param body: Serialized message.
+        :param properties: Message properties.
+        :return: Future resolved with the message's result once its confirm arrives.
+        """
+        self.__slots.acquire()
+
+        future = Future()
+        future.add_done_callback(lambda _: self.__slots.release())
+        self.__outgoing.append((exchange, routing_key, body, properties, future))
+
+        self.__ensure_started()
+        self.__wake_up()
+
+        return future
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for every queued message to be confirmed, then close the connection.
+        :param timeout: Seconds to wait for the background thread to finish. Waits indefinitely when ``None``.
+        """
+        thread = self.__thread
+        self.__closing = True
+
+        if thread:
+            self.__wake_up()
+            thread.join(timeout)
+
+        self.__closing = False
+
+    def __ensure_started(self) -> None:
+        """
+        Start the background thread unless it is already running.
+        """
+        with self.__start_lock:
+            if self.__thread and self.__thread.is_alive():
+                return
+
+            self.__thread = Thread(target=self.__run, daemon=True)
+            self.__thread.start()
+
+    def __wake_up(self) -> None:
+        """
+        Make the background thread pick up newly queued messages right away.
+        """
+        channel = self.__channel
+
+        if channel:
+            with suppress(AMQPError):
+                channel.connection.add_callback_threadsafe(lambda: None)
+
+    def __connect(self) -> None:
+        """
+        Open the background thread's channel and put it in confirm mode.
+        """
+        channel = self.open_channel()
+        self.__tracker = ConfirmTracker(on_resolve=self.__on_resolve)
+        self.__tracker.attach(channel)
+        self.__channel = channel
+
+    def __disconnect(self, error: Exception) -> None:
+        """
+        Fail every message that was published but not confirmed on the lost channel.
+        Messages still waiting to be published are kept for the next channel.
+        """
+        channel = self.__channel
+        self.__channel = None
+
+        if self.__tracker:
+            for (future, _), _, _ in self.__tracker.pending.values():
+                future.set_exception(error)
+
+            self.__tracker = None
+
+        if channel and channel.connection.is_open:
+            with suppress(AMQPError, OSError):
+                channel.connection.close()
+
+    def __on_resolve(self, reference: tuple, result: str) -> None:
+        """
+        Resolve a message's future once the broker confirmed it.
+        """
+        future, published_at = reference
+        self.latencies.append(time.monotonic() - published_at)
+        future.set_result(result)
+
+    def __drain(self) -> None:
+        """
+        Publish every queued message on the background thread's channel.
+        """
+        while self.__outgoing:
+            exchange, routing_key, body, properties, future = self.__outgoing[0]
+
+            if self.verify_exchange and not future.cancelled():
+                try:
+                    self.verify_exchange(self.__channel, exchange)
+
+                except ChannelClosedByBroker as error:
+                    self.__outgoing.popleft()
+
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(error)
+
+                    continue
+
+            if not future.set_running_or_notify_cancel():
+                # Cancelled before it was published.
+                self.__outgoing.popleft()
+                continue
+
+            self.__tracker.track((future, time.monotonic()), routing_key, body)
+            self.__outgoing.popleft()
+            self.__channel.basic_publish(
+                exchange=exchange,
+                routing_key=routing_key,
+                body=body,
+                properties=properties,
+                mandatory=True,
+            )
+
+    def __is_done(self) -> bool:
+        """
+        Check whether the window is closing and every message has been confirmed.
+        """
+        return (
+            self.__closing
+            and not self.__outgoing
+            and not (self.__tracker and self.__tracker.pending)
+        )
+
+    def __run(self) -> None:
+        """
+        Serve the window until nothing is queued anymore. The check happens under the start lock,
+        so a message queued while the thread is exiting makes the next ``publish`` start a new thread.
+        """
+        while True:
+            self.__serve()
+
+            with self.__start_lock:
+                if not self.__outgoing:
+                    self.__thread = None
+                    return
+
+    def __serve(self) -> None:
+        """
+        Publish queued messages and process their confirms until the window is closed.
+        """
+        while not self.__is_done():
+            if not (self.__channel and self.__channel.is_open):
+                self.__disconnect(AMQPError("Channel closed before confirm."))
+
+                try:
+                    self.__connect()
+
+                except Exception as error:
+                    # Fail the queued messages instead of leaving their futures hanging.
+                    logger.exception(error)
+
+                    while self.__outgoing:
+                        future = self.__outgoing.popleft()[-1]
+
+                        if future.set_running_or_notify_cancel():
+                            future.set_exception(error)
+
+                    return
+
+            try:
+                self.__drain()
+                self.__channel.connection.process_data_events(time_limit=1)
+
+            except Exception as error:
+                logger.exception(error)
+                self.__disconnect(error)
+
+        self.__disconnect(AMQPError("Confirm window closed."))
@@ -8,17 +8,31 @@
     Full documentation is available at https://pyrmq.readthedocs.io
 """
 
-import json
 import logging
+import multiprocessing
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from threading import Thread
-from typing import Callable, Optional, Union
+from threading import Lock, Thread
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from pika import BlockingConnection, ConnectionParameters, PlainCredentials
 from pika.adapters.utils.connection_workflow import AMQPConnectorException
-from pika.exceptions import AMQPChannelError, AMQPConnectionError, ChannelClosedByBroker
+from pika.exceptions import (
+    AMQPChannelError,
+    AMQPConnectionError,
+    ChannelClosedByBroker,
+    ConnectionWrongStateError,
+)
+
+from pyrmq.acks import AckCoalescer
+from pyrmq.adaptive import AdaptivePrefetch
+from pyrmq.claim_check import CLAIM_CHECK_HEADER, ClaimCheck, claim_check_key
+from pyrmq.cluster import ROUND_ROBIN, Cluster
+from pyrmq.compression import decompress
+from pyrmq.serializers import get_serializer, negotiate_serializer
 
 CONNECTION_ERRORS = (
     AMQPConnectionError,
@@ -34,6 +48,51 @@ CONSUME_ERROR = "CONSUME_ERROR"
 logger = logging.getLogger("pyrmq")
 
 
+def retry_message_properties(
+    properties, retry_reason: Exception, retry_interval: float, max_retries: int
+) -> Tuple[int, dict]:
+    """
+    The properties a failed message is published to the retry queue with, with the appropriate metadata in the headers.
+    :param properties: pika's BasicProperties of the failed message.
+    :param retry_reason: Error that the message failed with.
+    :param retry_interval: Seconds until the message is consumed again.
+    :param max_retries: Number of maximum retries.
+    :return: The number of this attempt, and the message properties.
+    """
+    headers = properties.headers or {}
+    attempt = headers.get("x-attempt", 0) + 1
+    # The data is published again in full and encoded anew, so neither a claim check
+    # nor the content encoding of the original body applies.
+    headers = {
+        key: value for key, value in headers.items() if key != CLAIM_CHECK_HEADER
+    }
+    expiration = retry_interval * 1000
+    now = datetime.now()
+    next_attempt = now + timedelta(seconds=retry_interval)
+    message_properties = {
+        **properties.__dict__,
+        "content_encoding": None,
+        "expiration": str(expiration),
+        "headers": {
+            **headers,
+            "x-attempt": attempt,
+            "x-max-attempts": max_retries,
+            "x-created-at": headers.get("x-created-at", now.isoformat()),
+            "x-retry-reason": repr(retry_reason),
+            "x-next-attempt": next_attempt.isoformat(),
+        },
+    }
+
+    for i in range(1, attempt + 1):
+        attempt_no = f"x-attempt-{i}"
+        previous_attempts = message_properties["headers"]
+        previous_attempts[attempt_no] = previous_attempts.get(
+            attempt_no, now.isoformat()
+        )
+
+    return attempt, message_properties
+
+
 class Consumer(object):
     """
     This class uses a ``BlockingConnection`` from pika that automatically handles
@@ -59,6 +118,11 @@ class Consumer(object):
         :keyword port: Your RabbitMQ port. Default: ``5672``
         :keyword username: Your RabbitMQ username. Default: ``"guest"``
         :keyword password: Your RabbitMQ password. Default: ``"guest"``
+        :keyword hosts: RabbitMQ nodes of a cluster as ``"host"`` or ``"host:port"`` strings, used instead of ``host``.
+            Every connect tries them in the order of ``host_strategy``, one attempt each. Default: ``None``
+        :keyword host_strategy: ``"round_robin"``, ``"random"``, or ``"health"`` to prefer the nodes with the lowest
+            recent connect latency and fewest recent failures. Default: ``"round_robin"``
+        :keyword host_quarantine: Seconds a node that failed to connect is only tried after every other node. Default: ``10``
         :keyword connection_attempts: How many times should PyRMQ try? Default: ``3``
         :keyword is_dlk_retry_enabled: Flag to enable DLK-based retry logic of consumed messages. Default: ``False``
         :keyword retry_delay: Seconds between connection retries. Default: ``5``
@@ -69,8 +133,43 @@ class Consumer(object):
         :keyword queue_args: Your queue arguments. Default: ``None``
         :keyword bound_exchange: The exchange this consumer needs to bind to. This is an object that has two keys, ``name`` and ``type``. Default: ``None``
         :keyword auto_ack: Flag whether to ack or nack the consumed message regardless of its outcome. Default: ``True``
-        :keyword prefetch_count: How many messages should the consumer retrieve at a time for consumption. Default: ``1``
+        :keyword prefetch_count: How many messages should the consumer retrieve at a time for consumption.
+            Default: ``batch_size``, ``workers`` or ``worker_processes``, or ``1`` without either
+        :keyword workers: Run the callback on a pool of this many threads instead of pika's I/O thread, which keeps
+            sending heartbeats meanwhile and acks or nacks on their behalf. Default: ``None``
+        :keyword worker_processes: Run the callback on a pool of this many processes for CPU-bound work, while the
+            connection stays in this process. The callback and the data it gets must be picklable. Default: ``None``
+        :keyword max_tasks_per_child: Replace a worker process after it consumed this many messages. Default: ``None``
+        :keyword batch_size: Call the callback with a list of up to this many messages at once. Default: ``None``
+        :keyword batch_timeout: Seconds to wait for a batch to fill up before calling the callback with
+            the messages that arrived so far. Default: ``1``
+        :keyword coalesce_acks: Ack consumed messages with one cumulative ack once this many acks are pending.
+            Keep it below ``prefetch_count``. Default: ``None``
+        :keyword coalesce_acks_timeout: Seconds an ack is held back at most with ``coalesce_acks``. Default: ``0.1``
+        :keyword adaptive_prefetch: Tune the prefetch count, starting at ``prefetch_count``, with an
+            ``AdaptivePrefetch`` to how long callbacks take and how long the broker takes to deliver.
+            Needs ``workers`` or ``worker_processes``. Default: ``False``
+        :keyword min_prefetch: Lowest prefetch count with ``adaptive_prefetch``. Default: ``1``
+        :keyword max_prefetch: Highest prefetch count with ``adaptive_prefetch``. Default: ``100``
+        :keyword adaptive_interval: Seconds between prefetch count adjustments with ``adaptive_prefetch``. Default: ``1``
         :keyword heart_beat: Heartbeat seconds to wait for consumer process. Default: ``None``
+        :keyword serializer: Name of a registered serializer or a ``Serializer`` instance. Decodes messages whose
+            ``content_type`` no registered serializer handles, e.g. messages from older publishers. Default: ``"json"``
+        :keyword compression: Name of a registered codec or a ``Codec`` instance that messages published to the
+            retry queue are compressed with. Default: ``None``
+        :keyword compression_threshold: Minimum body size in bytes to compress. Default: ``1024``
+        :keyword claim_check_store: The ``BlobStore`` that publishers check large message bodies in to.
+            Their bodies are fetched from it before the callback is called. Default: ``None``
+        :keyword claim_check_lazy: Pass the callback a ``ClaimCheck`` whose ``load()`` fetches the data
+            instead of fetching it up front. Default: ``False``
+        :keyword claim_check_cleanup: Delete a checked in body from the store once its message is acked.
+            Only enable it when no other queue receives the same message. Default: ``False``
+        :keyword dedupe_store: A ``DedupeStore`` that the dedupe key of every consumed message is checked against.
+            Messages whose key was processed already are acked without calling the callback. Default: ``None``
+        :keyword dedupe_header: Header holding the dedupe key. The ``message_id`` property is used when ``None``.
+            Messages without a dedupe key are always processed. Default: ``None``
+        :keyword group: The ``ConsumerGroup`` whose connection and retry publisher this consumer shares.
+            Set by ``ConsumerGroup.add()``. Default: ``None``
         """
 
         from pyrmq import Publisher
@@ -85,6 +184,9 @@ class Consumer(object):
         self.port = kwargs.get("port") or os.getenv("RABBITMQ_PORT") or 5672
         self.username = kwargs.get("username", "guest")
         self.password = kwargs.get("password", "guest")
+        self.hosts = kwargs.get("hosts")
+        self.host_strategy = kwargs.get("host_strategy", ROUND_ROBIN)
+        self.host_quarantine = kwargs.get("host_quarantine", 10)
         self.connection_attempts = kwargs.get("connection_attempts", 3)
         self.retry_delay = kwargs.get("retry_delay", 5)
         self.retry_interval = kwargs.get("retry_interval", 5)
@@ -97,10 +199,76 @@ class Consumer(object):
         self.queue_args = kwargs.get("queue_args", {})
         self.bound_exchange = kwargs.get("bound_exchange")
         self.auto_ack = kwargs.get("auto_ack", True)
-        self.prefetch_count = kwargs.get("prefetch_count", 1)
+        self.workers = kwargs.get("workers")
+        self.worker_processes = kwargs.get("worker_processes")
+        self.max_tasks_per_child = kwargs.get("max_tasks_per_child")
+        self.batch_size = kwargs.get("batch_size")
+        self.batch_timeout = kwargs.get("batch_timeout", 1)
+        self.coalesce_acks = kwargs.get("coalesce_acks")
+        self.coalesce_acks_timeout = kwargs.get("coalesce_acks_timeout", 0.1)
+        self.prefetch_count = kwargs.get(
+            "prefetch_count",
+            self.batch_size or self.workers or self.worker_processes or 1,
+        )
+        self.adaptive_prefetch = None
+
+        if kwargs.get("adaptive_prefetch"):
+            self.adaptive_prefetch = AdaptivePrefetch(
+                self.prefetch_count,
+                min_prefetch=kwargs.get("min_prefetch", 1),
+                max_prefetch=kwargs.get("max_prefetch", 100),
+                interval=kwargs.get("adaptive_interval", 1),
+            )
+            self.prefetch_count = self.adaptive_prefetch.prefetch
+
         self.heart_beat = kwargs.get("heart_beat", None)
+        self.serializer = get_serializer(kwargs.get("serializer", "json"))
+        self.compression = kwargs.get("compression")
+        self.compression_threshold = kwargs.get("compression_threshold", 1024)
+        self.claim_check_store = kwargs.get("claim_check_store")
+        self.claim_check_lazy = kwargs.get("claim_check_lazy", False)
+        self.claim_check_cleanup = kwargs.get("claim_check_cleanup", False)
+        self.dedupe_store = kwargs.get("dedupe_store")
+        self.dedupe_header = kwargs.get("dedupe_header")
+        self.group = kwargs.get("group")
         self.channel = None
         self.thread = None
+        self.executor = None
+        self.process_pool = None
+        self.__process_pool_lock = Lock()
+        self.__batch = []
+        self.__batch_timer = None
+        self.ack_coalescer = None
+
+        if self.workers and self.worker_processes:
+            raise ValueError("Choose either workers or worker_processes, not both.")
+
+        if self.adaptive_prefetch and not (self.workers or self.worker_processes):
+            # On the I/O thread, pika hands every message to the callback as soon as it dispatches it,
+            # so there is no wait to tell a prefetch count that hoards messages by.
+            raise ValueError(
+                "adaptive_prefetch measures how long messages wait for a worker and needs workers or worker_processes."
+            )
+
+        if self.batch_size and (self.workers or self.worker_processes):
+            raise ValueError(
+                "Batches are consumed on the I/O thread and cannot be combined with workers or worker_processes."
+            )
+
+        if self.worker_processes and self.claim_check_lazy:
+            raise ValueError(
+                "A lazy ClaimCheck cannot be sent to worker_processes. Disable claim_check_lazy."
+            )
+
+        if self.worker_processes:
+            self.process_pool = self.__create_process_pool()
+
+        if self.workers or self.worker_processes:
+            # With worker processes, every thread waits on the process that consumes its message.
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers or self.worker_processes,
+                thread_name_prefix="pyrmq-consumer",
+            )
 
         self.connection_parameters = ConnectionParameters(
             host=self.host,
@@ -110,13 +278,29 @@ class Consumer(object):
             retry_delay=self.retry_delay,
             heartbeat=self.heart_beat,
         )
+        self.cluster = None
+
+        if self.hosts:
+            self.cluster = Cluster(
+                self.hosts,
+                self.connection_parameters,
+                strategy=self.host_strategy,
+                quarantine=self.host_quarantine,
+            )
 
         if "x-queue-type" not in self.queue_args:
             self.queue_args["x-queue-type"] = "quorum"
 
         self.retry_queue_name = f"{self.queue_name}.{self.retry_queue_suffix}"
+        self.retry_queue_args = {
+            "x-dead-letter-exchange": self.exchange_name,
+            "x-dead-letter-routing-key": self.routing_key,
+            "x-queue-type": "quorum",
+        }
+        # A ConsumerGroup gives its consumers a retry publisher they share once it connects.
+        self.retry_publisher = None
 
-        if self.is_dlk_retry_enabled:
+        if self.is_dlk_retry_enabled and self.group is None:
             self.retry_publisher = Publisher(
                 exchange_name=self.retry_queue_name,
                 queue_name=self.retry_queue_name,
@@ -125,32 +309,41 @@ class Consumer(object):
                 password=self.password,
                 port=self.port,
                 host=self.host,
-                queue_args={
-                    "x-dead-letter-exchange": self.exchange_name,
-                    "x-dead-letter-routing-key": self.routing_key,
-                },
+                hosts=self.hosts,
+                host_strategy=self.host_strategy,
+                host_quarantine=self.host_quarantine,
+                queue_args=self.retry_queue_args,
+                serializer=self.serializer,
+                compression=self.compression,
+                compression_threshold=self.compression_threshold,
+                claim_check_store=self.claim_check_store,
+                # Worker threads publish retries at the same time, and channels are not thread-safe.
+                pool_size=self.workers or self.worker_processes,
             )
+            self.declare_retry_queue(self.__create_connection().channel())
 
-            retry_channel = BlockingConnection(
-                self.retry_publisher.connection_parameters
-            ).channel()
-            retry_channel.exchange_declare(
-                exchange=self.retry_queue_name,
-                durable=True,
-                exchange_type=self.exchange_type,
-                arguments=self.exchange_args,
-            )
-            retry_channel.queue_declare(
-                queue=self.retry_queue_name,
-                arguments=self.retry_publisher.queue_args,
-                durable=True,
-            )
-            retry_channel.queue_bind(
-                queue=self.retry_queue_name,
-                exchange=self.retry_queue_name,
-                routing_key=self.retry_queue_name,
-                arguments=self.queue_args,
-            )
+    def declare_retry_queue(self, channel) -> None:
+        """
+        Declare the retry queue and bind it to its exchange.
+        :param channel: pika's Channel to declare them on.
+        """
+        channel.exchange_declare(
+            exchange=self.retry_queue_name,
+            durable=True,
+            exchange_type=self.exchange_type,
+            arguments=self.exchange_args,
+        )
+        channel.queue_declare(
+            queue=self.retry_queue_name,
+            arguments=self.retry_queue_args,
+            durable=True,
+        )
+        channel.queue_bind(
+            queue=self.retry_queue_name,
+            exchange=self.retry_queue_name,
+            routing_key=self.retry_queue_name,
+            arguments=self.queue_args,
+        )
 
     def declare_queue(self) -> None:
         """
@@ -252,8 +445,12 @@ class Consumer(object):
 
     def __create_connection(self) -> BlockingConnection:
         """
-        Create pika's ``BlockingConnection`` from the given connection parameters.
+        Create pika's ``BlockingConnection`` from the given connection parameters,
+        or to a node of the cluster.
         """
+        if self.cluster:
+            return self.cluster.connect()
+
         return BlockingConnection(self.connection_parameters)
 
     def _publish_to_retry_queue(
@@ -262,37 +459,309 @@ class Consumer(object):
         """
         Publish message to retry queue with the appropriate metadata in the headers.
         """
-        headers = properties.headers or {}
-        attempt = headers.get("x-attempt", 0) + 1
+        attempt, message_properties = retry_message_properties(
+            properties, retry_reason, self.retry_interval, self.max_retries
+        )
         self.__send_consume_error_message(retry_reason, attempt)
 
         if attempt > self.max_retries:
             return
 
-        expiration = self.retry_interval * 1000
-        now = datetime.now()
-        next_attempt = now + timedelta(seconds=self.retry_interval)
-        message_properties = {
-            **properties.__dict__,
-            "expiration": str(expiration),
-            "headers": {
-                **headers,
-                "x-attempt": attempt,
-                "x-max-attempts": self.max_retries,
-                "x-created-at": headers.get("x-created-at", now.isoformat()),
-                "x-retry-reason": repr(retry_reason),
-                "x-next-attempt": next_attempt.isoformat(),
-            },
-        }
+        self.retry_publisher.publish(
+            data,
+            message_properties=message_properties,
+            exchange=self.retry_queue_name,
+            routing_key=self.retry_queue_name,
+        )
+
+    def __dedupe_key(self, properties) -> Optional[str]:
+        """
+        The dedupe key of a consumed message, or ``None`` when it has none or deduplication is off.
+        :param properties: pika's BasicProperties
+        """
+        if self.dedupe_store is None:
+            return None
+
+        if self.dedupe_header:
+            key = (properties.headers or {}).get(self.dedupe_header)
+
+            return str(key) if key is not None else None
 
-        for i in range(1, attempt + 1):
-            attempt_no = f"x-attempt-{i}"
-            previous_attempts = message_properties["headers"]
-            previous_attempts[attempt_no] = previous_attempts.get(
-                attempt_no, now.isoformat()
+        return properties.message_id
+
+    def __decode(
+        self, data: bytes, properties, key: Optional[str]
+    ) -> Tuple[Any, Optional[Exception]]:
+        """
+        Deserialize a consumed body. A checked in body is fetched from the store first,
+        or handed over as a ``ClaimCheck`` with ``claim_check_lazy``.
+        :param data: Data received in bytes.
+        :param properties: pika's BasicProperties
+        :param key: The message's claim check key, if any.
+        :return: The data, and the error that prevented fetching the body, if any.
+        """
+        serializer = negotiate_serializer(properties.content_type, self.serializer)
+
+        if key is None:
+            return serializer.loads(decompress(data, properties.content_encoding)), None
+
+        def load():
+            body = self.claim_check_store.get(key)
+
+            return serializer.loads(decompress(body, properties.content_encoding))
+
+        claim_check = ClaimCheck(key, load)
+
+        if self.claim_check_lazy:
+            return claim_check, None
+
+        try:
+            return claim_check.load(), None
+
+        except Exception as error:
+            return None, error
+
+    def __handle_consume_error(
+        self, data: Any, properties, error: Exception
+    ) -> Optional[Exception]:
+        """
+        Publish a message the callback failed on to the retry queue, or report the error.
+        :param data: The data the callback got.
+        :param properties: pika's BasicProperties
+        :param error: Error raised by the callback.
+        :return: The error that prevented fetching a lazily checked in body for the retry queue, if any.
+        """
+        if not self.is_dlk_retry_enabled:
+            self.__send_consume_error_message(error)
+            return None
+
+        if isinstance(data, ClaimCheck):
+            try:
+                data = data.load()
+
+            except Exception as fetch_error:
+                return fetch_error
+
+        self._publish_to_retry_queue(data, properties, error)
+
+        return None
+
+    def __create_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Create the pool of worker processes. They are spawned rather than forked,
+        so they do not inherit the connection's socket and threads.
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.worker_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self.max_tasks_per_child,
+        )
+
+    def __run_callback(self, data: Any, channel, method, properties) -> Optional[bool]:
+        """
+        Call the callback, in a worker process with ``worker_processes``. There it is passed no channel,
+        since channels cannot leave this process.
+        :return: What the callback returned.
+        """
+        if self.process_pool is None:
+            return self.message_received_callback(
+                data, channel=channel, method=method, properties=properties
             )
 
-        self.retry_publisher.publish(data, message_properties=message_properties)
+        process_pool = self.process_pool
+
+        try:
+            return process_pool.submit(
+                self.message_received_callback,
+                data,
+                channel=None,
+                method=method,
+                properties=properties,
+            ).result()
+
+        except BrokenProcessPool:
+            # A worker process died, e.g. killed for running out of memory, and took the pool with it.
+            with self.__process_pool_lock:
+                if self.process_pool is process_pool:
+                    self.process_pool = self.__create_process_pool()
+
+            raise
+
+    def __coalesce(self, channel, delivery_tag: int, ack: bool) -> None:
+        """
+        Ack or nack a consumed message with the ``AckCoalescer`` of its channel.
+        A new channel after a reconnect gets a new one, since delivery tags start over.
+        """
+        if self.ack_coalescer is None or self.ack_coalescer.channel is not channel:
+            self.ack_coalescer = AckCoalescer(
+                channel, self.coalesce_acks, self.coalesce_acks_timeout
+            )
+
+        if ack:
+            self.ack_coalescer.ack(delivery_tag)
+
+        else:
+            self.ack_coalescer.nack(delivery_tag)
+
+    def __settle(self, channel, method, ack: bool) -> None:
+        """
+        Ack or nack a consumed message. Workers have the connection's I/O thread do it,
+        since pika's channels are not thread-safe.
+        :param channel: pika's Channel this message was received.
+        :param method: pika's basic Return
+        :param ack: Whether to ack or nack the message.
+        """
+
+        def settle():
+            # A channel that was closed meanwhile redelivers its unacked messages anyway.
+            if not channel.is_open:
+                return
+
+            if self.coalesce_acks:
+                self.__coalesce(channel, method.delivery_tag, ack)
+
+            elif ack:
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+
+            else:
+                channel.basic_nack(delivery_tag=method.delivery_tag)
+
+            if self.adaptive_prefetch:
+                self.__set_prefetch(channel, self.adaptive_prefetch.settled())
+
+        if self.executor is None:
+            settle()
+            return
+
+        try:
+            channel.connection.add_callback_threadsafe(settle)
+
+        except ConnectionWrongStateError:
+            logger.debug(
+                f"Connection closed before settling message {method.delivery_tag}"
+            )
+
+    def __set_prefetch(self, channel, prefetch: Optional[int]) -> None:
+        """
+        Apply a prefetch count that ``adaptive_prefetch`` adjusted, if it did. Called on pika's I/O thread.
+        """
+        if prefetch is None or not channel.is_open:
+            return
+
+        logger.debug(f"Adjusting prefetch count of {self.queue_name!r} to {prefetch}")
+        channel.basic_qos(prefetch_count=prefetch)
+        self.prefetch_count = prefetch
+
+    def __measure(
+        self, channel, method, properties, data: bytes, delivered_at: float
+    ) -> None:
+        """
+        Consume a message and let ``adaptive_prefetch`` measure how long it waited and took.
+        """
+        started_at = self.adaptive_prefetch.started(delivered_at)
+
+        try:
+            self._consume_message(channel, method, properties, data)
+
+        finally:
+            self.adaptive_prefetch.finished(started_at)
+
+    def __deliver(self, channel) -> float:
+        """
+        Let ``adaptive_prefetch`` know that a message was delivered.
+        :return: ``time.monotonic()`` when it was delivered.
+        """
+        delivered_at = time.monotonic()
+        self.__set_prefetch(channel, self.adaptive_prefetch.delivered())
+
+        return delivered_at
+
+    def __work(
+        self,
+        channel,
+        method,
+        properties,
+        data: bytes,
+        delivered_at: Optional[float] = None,
+    ) -> None:
+        """
+        Consume a message on a worker thread. Errors that ``_consume_message`` does not handle
+        itself are reported and the message is nacked, so it is not left unacked.
+        """
+        try:
+            if self.adaptive_prefetch:
+                self.__measure(channel, method, properties, data, delivered_at)
+
+            else:
+                self._consume_message(channel, method, properties, data)
+
+        except Exception as error:
+            self.__send_consume_error_message(error)
+            self.__settle(channel, method, False)
+
+    def __dispatch(self, channel, method, properties, data: bytes) -> None:
+        """
+        Hand a delivery from pika's I/O thread to the worker threads.
+        """
+        delivered_at = self.__deliver(channel) if self.adaptive_prefetch else None
+        self.executor.submit(
+            self.__work, channel, method, properties, data, delivered_at
+        )
+
+    def __is_duplicate(self, dedupe_key: Optional[str]) -> bool:
+        """
+        Whether a message with this dedupe key was processed already.
+        """
+        if dedupe_key is None or not self.dedupe_store.is_duplicate(dedupe_key):
+            return False
+
+        logger.debug(f"Skipping duplicate message {dedupe_key!r}")
+
+        return True
+
+    def __finish(
+        self,
+        channel,
+        method,
+        key: Optional[str],
+        dedupe_key: Optional[str],
+        auto_ack: Optional[bool],
+        failed: bool,
+        fetch_error: Optional[Exception],
+        settle: Callable,
+    ) -> None:
+        """
+        Ack or nack a consumed message, and clean up after it once it is acked.
+        Errors while cleaning up are only reported, since the message is settled already.
+        :param key: The message's claim check key, if any.
+        :param dedupe_key: The message's dedupe key, if any.
+        :param auto_ack: What the callback returned.
+        :param failed: Whether consuming the message failed.
+        :param fetch_error: The error that prevented fetching the message's body, if any.
+        :param settle: Function that acks or nacks the message.
+        """
+        if fetch_error is not None:
+            # E.g. the body was deleted once an earlier delivery of the same message was acked.
+            # There is no data to retry with, so the message is only reported and acked or nacked.
+            self.__send_consume_error_message(fetch_error)
+
+        if not (auto_ack or (auto_ack is None and self.auto_ack)):
+            settle(channel, method, False)
+            return
+
+        settle(channel, method, True)
+
+        try:
+            if key is not None and self.claim_check_cleanup and fetch_error is None:
+                self.claim_check_store.delete(key)
+
+            if dedupe_key is not None and not failed:
+                # Failed messages may come back through the retry queue with the same key.
+                self.dedupe_store.add(dedupe_key)
+
+        except Exception as error:
+            # The message is acked already. Settling it again would close the channel.
+            self.__send_consume_error_message(error)
 
     def _consume_message(self, channel, method, properties, data: dict) -> None:
         """
@@ -303,33 +772,177 @@ class Consumer(object):
         :param properties: pika's BasicProperties
         :param data: Data received in bytes.
         """
+        key = claim_check_key(properties) if self.claim_check_store else None
+        dedupe_key = self.__dedupe_key(properties)
 
-        if isinstance(data, bytes):
-            data = data.decode("utf-8", errors="replace")
-
-        data = json.loads(data)
+        if self.__is_duplicate(dedupe_key):
+            self.__finish(channel, method, key, None, True, False, None, self.__settle)
+            return
 
+        data, fetch_error = self.__decode(data, properties, key)
         auto_ack = None
+        failed = fetch_error is not None
+
+        if not failed:
+            try:
+                logger.debug("Received message from queue")
+
+                auto_ack = self.__run_callback(data, channel, method, properties)
+
+            except Exception as error:
+                failed = True
+                fetch_error = self.__handle_consume_error(data, properties, error)
+
+        self.__finish(
+            channel,
+            method,
+            key,
+            dedupe_key,
+            auto_ack,
+            failed,
+            fetch_error,
+            self.__settle,
+        )
+
+    def __collect(self, channel, method, properties, data: bytes) -> None:
+        """
+        Add a delivery to the current batch, and consume the batch once it is full.
+        The first delivery of a batch starts the ``batch_timeout`` timer.
+        """
+        self.__batch.append((channel, method, properties, data))
+
+        if len(self.__batch) >= self.batch_size:
+            self.__flush_batch()
 
+        elif self.__batch_timer is None:
+            connection = channel.connection
+            timer_id = connection.call_later(self.batch_timeout, self.__flush_batch)
+            self.__batch_timer = (connection, timer_id)
+
+    def __flush_batch(self) -> None:
+        """
+        Consume the current batch, if there is one.
+        """
+        if self.__batch_timer is not None:
+            connection, timer_id = self.__batch_timer
+            self.__batch_timer = None
+            connection.remove_timeout(timer_id)
+
+        batch, self.__batch = self.__batch, []
+
+        if batch:
+            self._consume_batch(batch)
+
+    def __run_batch_callback(self, channel, messages: List[tuple]) -> List[Any]:
+        """
+        Call the callback with the data of a batch of messages.
+        :param messages: The ``(method, properties, data, key, dedupe_key)`` of every message.
+        :return: What the callback returned for every message, or the error it failed with.
+        """
         try:
-            logger.debug("Received message from queue")
+            logger.debug(f"Received batch of {len(messages)} messages from queue")
 
-            auto_ack = self.message_received_callback(
-                data, channel=channel, method=method, properties=properties
+            result = self.message_received_callback(
+                [data for _, _, data, _, _ in messages],
+                channel=channel,
+                methods=[method for method, _, _, _, _ in messages],
+                properties=[properties for _, properties, _, _, _ in messages],
             )
 
         except Exception as error:
-            if self.is_dlk_retry_enabled:
-                self._publish_to_retry_queue(data, properties, error)
+            return [error] * len(messages)
 
-            else:
-                self.__send_consume_error_message(error)
+        if isinstance(result, dict):
+            # Maps the indices of the failed messages to their errors. The rest are acked.
+            return [result.get(index, True) for index in range(len(messages))]
 
-        if auto_ack or (auto_ack is None and self.auto_ack):
-            channel.basic_ack(delivery_tag=method.delivery_tag)
+        return [result] * len(messages)
 
-        else:
-            channel.basic_nack(delivery_tag=method.delivery_tag)
+    def _consume_batch(self, batch: List[tuple]) -> None:
+        """
+        Wrap the user-provided batch callback and gracefully handle the errors of each message.
+        Failed messages are nacked or retried one by one, and then the rest of the batch
+        is acked at once with pika's ``basic_ack`` for multiple messages.
+        :param batch: The ``(channel, method, properties, data)`` of every delivery, in the order they arrived.
+        """
+        channel = batch[0][0]
+        settled = {True: [], False: []}
+        messages = []
+
+        def settle(channel, method, ack: bool) -> None:
+            settled[ack].append(method.delivery_tag)
+
+        for _, method, properties, data in batch:
+            key = claim_check_key(properties) if self.claim_check_store else None
+            dedupe_key = self.__dedupe_key(properties)
+
+            if self.__is_duplicate(dedupe_key):
+                self.__finish(channel, method, key, None, True, False, None, settle)
+                continue
+
+            data, fetch_error = self.__decode(data, properties, key)
+
+            if fetch_error is not None:
+                self.__finish(
+                    channel, method, key, dedupe_key, None, True, fetch_error, settle
+                )
+                continue
+
+            messages.append((method, properties, data, key, dedupe_key))
+
+        results = self.__run_batch_callback(channel, messages) if messages else []
+
+        for (method, properties, data, key, dedupe_key), result in zip(
+            messages, results
+        ):
+            failed = isinstance(result, Exception)
+            fetch_error = (
+                self.__handle_consume_error(data, properties, result)
+                if failed
+                else None
+            )
+            auto_ack = None if failed else result
+            self.__finish(
+                channel, method, key, dedupe_key, auto_ack, failed, fetch_error, settle
+            )
+
+        if channel.is_open:
+            for delivery_tag in settled[False]:
+                channel.basic_nack(delivery_tag=delivery_tag)
+
+            if settled[True]:
+                # Nacked messages are settled already, so the rest of the batch is all that is left to ack.
+                channel.basic_ack(delivery_tag=max(settled[True]), multiple=True)
+
+    def open_channel(self, connection: BlockingConnection) -> None:
+        """
+        Open this consumer's channel on a connection, which a ``ConsumerGroup`` shares between its consumers.
+        :param connection: pika's ``BlockingConnection``
+        """
+        self.connection = connection
+        self.channel = connection.channel()
+        self.channel.basic_qos(prefetch_count=self.prefetch_count)
+
+        # The broker redelivers the messages of a batch that was cut short.
+        self.__batch = []
+        self.__batch_timer = None
+
+        if self.adaptive_prefetch:
+            self.adaptive_prefetch.reset()
+
+    def subscribe(self) -> None:
+        """
+        Wrap pika's ``basic_consume()`` to have messages delivered to this consumer's channel.
+        """
+        on_message = self._consume_message
+
+        if self.executor is not None:
+            on_message = self.__dispatch
+
+        elif self.batch_size:
+            on_message = self.__collect
+
+        self.channel.basic_consume(self.queue_name, on_message)
 
     def connect(self, retry_count=1) -> None:
         """
@@ -337,9 +950,7 @@ class Consumer(object):
         :param retry_count: Amount retries the Consumer tried before sending an error message.
         """
         try:
-            self.connection = self.__create_connection()
-            self.channel = self.connection.channel()
-            self.channel.basic_qos(prefetch_count=self.prefetch_count)
+            self.open_channel(self.__create_connection())
 
         except CONNECTION_ERRORS as error:
             if not (retry_count % self.connection_attempts):
@@ -365,7 +976,7 @@ class Consumer(object):
         Wrap pika's ``basic_consume()`` and ``start_consuming()`` with retry logic.
         """
         try:
-            self.channel.basic_consume(self.queue_name, self._consume_message)
+            self.subscribe()
 
             self.channel.start_consuming()
 
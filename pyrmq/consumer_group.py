@@ -0,0 +1,308 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ ConsumerGroup class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import logging
+import os
+import time
+from threading import Thread
+from typing import Callable, Dict, List, Optional
+
+from pika import BlockingConnection, ConnectionParameters, PlainCredentials
+
+from pyrmq.cluster import ROUND_ROBIN, Cluster
+from pyrmq.consumer import CONNECT_ERROR, CONNECTION_ERRORS, Consumer
+from pyrmq.publisher import Publisher
+
+logger = logging.getLogger("pyrmq")
+
+CONNECTION_KWARGS = (
+    "host",
+    "port",
+    "username",
+    "password",
+    "hosts",
+    "host_strategy",
+    "host_quarantine",
+    "connection_attempts",
+    "retry_delay",
+    "heart_beat",
+    "error_callback",
+    "infinite_retry",
+)
+
+
+class ConsumerGroup(object):
+    """
+    Runs many :class:`~pyrmq.Consumer` subscriptions over one ``BlockingConnection``, with one channel
+    per queue, on a single thread of its own that runs pika's I/O loop for all of them.
+
+    Consumers with DLK retries share one retry :class:`~pyrmq.Publisher`, and so one connection, per combination
+    of serializer, compression and claim check store. It is given a channel pool once a consumer has workers.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        :keyword host: Your RabbitMQ host. Default: ``"localhost"``
+        :keyword port: Your RabbitMQ port. Default: ``5672``
+        :keyword username: Your RabbitMQ username. Default: ``"guest"``
+        :keyword password: Your RabbitMQ password. Default: ``"guest"``
+        :keyword hosts: RabbitMQ nodes of a cluster as ``"host"`` or ``"host:port"`` strings, used instead of ``host``.
+            Every connect tries them in the order of ``host_strategy``, one attempt each. Default: ``None``
+        :keyword host_strategy: ``"round_robin"``, ``"random"``, or ``"health"`` to prefer the nodes with the lowest
+            recent connect latency and fewest recent failures. Default: ``"round_robin"``
+        :keyword host_quarantine: Seconds a node that failed to connect is only tried after every other node. Default: ``10``
+        :keyword connection_attempts: How many times should PyRMQ try? Default: ``3``
+        :keyword retry_delay: Seconds between connection retries. Default: ``5``
+        :keyword heart_beat: Heartbeat seconds to wait for consumer process. Default: ``None``
+        :keyword error_callback: Callback function to be called when connection_attempts is reached.
+            Also the default ``error_callback`` of the consumers. Default: ``None``
+        :keyword infinite_retry: Tells PyRMQ to keep on retrying to connect while firing error_callback, if any. Default: ``False``
+        """
+        self.host = kwargs.get("host") or os.getenv("RABBITMQ_HOST") or "localhost"
+        self.port = kwargs.get("port") or os.getenv("RABBITMQ_PORT") or 5672
+        self.username = kwargs.get("username", "guest")
+        self.password = kwargs.get("password", "guest")
+        self.hosts = kwargs.get("hosts")
+        self.host_strategy = kwargs.get("host_strategy", ROUND_ROBIN)
+        self.host_quarantine = kwargs.get("host_quarantine", 10)
+        self.connection_attempts = kwargs.get("connection_attempts", 3)
+        self.retry_delay = kwargs.get("retry_delay", 5)
+        self.heart_beat = kwargs.get("heart_beat", None)
+        self.error_callback = kwargs.get("error_callback")
+        self.infinite_retry = kwargs.get("infinite_retry", False)
+        self.consumers: List[Consumer] = []
+        self.retry_publishers: Dict[tuple, Publisher] = {}
+        self.connection = None
+        self.thread = None
+
+        self.__connection_kwargs = {
+            key: value for key, value in kwargs.items() if key in CONNECTION_KWARGS
+        }
+        self.__closing = False
+
+        self.connection_parameters = ConnectionParameters(
+            host=self.host,
+            port=self.port,
+            credentials=PlainCredentials(self.username, self.password),
+            connection_attempts=self.connection_attempts,
+            retry_delay=self.retry_delay,
+            heartbeat=self.heart_beat,
+        )
+        self.cluster = None
+
+        if self.hosts:
+            self.cluster = Cluster(
+                self.hosts,
+                self.connection_parameters,
+                strategy=self.host_strategy,
+                quarantine=self.host_quarantine,
+            )
+
+    def add(
+        self,
+        exchange_name: str,
+        queue_name: str,
+        routing_key: str,
+        callback: Callable,
+        exchange_type: Optional[str] = "direct",
+        **kwargs,
+    ) -> Consumer:
+        """
+        Subscribe to a queue. Takes the same arguments as :class:`~pyrmq.Consumer`, e.g. its own
+        ``prefetch_count``, ``workers`` or DLK retry settings, and the group's connection settings by default.
+        Add every consumer before calling ``start()``.
+        :return: The :class:`~pyrmq.Consumer` of the subscription.
+        """
+        consumer = Consumer(
+            exchange_name,
+            queue_name,
+            routing_key,
+            callback,
+            exchange_type,
+            **{**self.__connection_kwargs, **kwargs, "group": self},
+        )
+        self.consumers.append(consumer)
+
+        return consumer
+
+    def __send_reconnection_error_message(self, error, retry_count: int) -> None:
+        """
+        Send error message to your preferred location.
+        :param error: Error that prevented the ConsumerGroup from connecting.
+        :param retry_count: Amount retries the ConsumerGroup tried before sending an error message.
+        """
+        message = (
+            f"Service tried to reconnect to queue **{retry_count}** times "
+            f"but still failed."
+            f"\n{repr(error)}"
+        )
+
+        if self.error_callback:
+            try:
+                self.error_callback(message, error=error, error_type=CONNECT_ERROR)
+
+            except Exception as exception:
+                logger.exception(exception)
+
+        else:
+            logger.exception(error)
+
+    def __create_connection(self) -> BlockingConnection:
+        """
+        Create pika's ``BlockingConnection`` from the given connection parameters,
+        or to a node of the cluster.
+        """
+        if self.cluster:
+            return self.cluster.connect()
+
+        return BlockingConnection(self.connection_parameters)
+
+    def __open_channel(self, consumer: Consumer) -> None:
+        """
+        Open a consumer's channel on the shared connection and declare its queues.
+        """
+        consumer.open_channel(self.connection)
+        consumer.declare_queue()
+
+        if consumer.is_dlk_retry_enabled:
+            consumer.declare_retry_queue(consumer.channel)
+
+    def __share_retry_publishers(self) -> None:
+        """
+        Give the consumers with DLK retries the retry publisher they share. Every consumer is added by now,
+        so the pool is sized for the consumer with the most workers.
+        """
+        pool_size = max(
+            [
+                consumer.workers or consumer.worker_processes or 0
+                for consumer in self.consumers
+            ],
+            default=0,
+        )
+
+        for consumer in self.consumers:
+            if not consumer.is_dlk_retry_enabled or consumer.retry_publisher:
+                continue
+
+            # Encoding happens in the publisher, so only consumers that encode the same way can share one.
+            key = (
+                consumer.serializer,
+                consumer.compression,
+                consumer.compression_threshold,
+                consumer.claim_check_store,
+            )
+
+            if key not in self.retry_publishers:
+                self.retry_publishers[key] = Publisher(
+                    exchange_name=consumer.retry_queue_name,
+                    routing_key=consumer.retry_queue_name,
+                    username=self.username,
+                    password=self.password,
+                    port=self.port,
+                    host=self.host,
+                    hosts=self.hosts,
+                    host_strategy=self.host_strategy,
+                    host_quarantine=self.host_quarantine,
+                    serializer=consumer.serializer,
+                    compression=consumer.compression,
+                    compression_threshold=consumer.compression_threshold,
+                    claim_check_store=consumer.claim_check_store,
+                    pool_size=pool_size or None,
+                )
+
+            consumer.retry_publisher = self.retry_publishers[key]
+
+    def connect(self, retry_count=1) -> None:
+        """
+        Create pika's ``BlockingConnection``, open a channel for every consumer and declare their queues.
+        :param retry_count: Amount retries the ConsumerGroup tried before sending an error message.
+        """
+        self.__share_retry_publishers()
+
+        try:
+            self.connection = self.__create_connection()
+
+            for consumer in self.consumers:
+                self.__open_channel(consumer)
+
+        except CONNECTION_ERRORS as error:
+            if not (retry_count % self.connection_attempts):
+                self.__send_reconnection_error_message(
+                    error, self.connection_attempts * retry_count
+                )
+
+                if not self.infinite_retry:
+                    raise error
+
+            time.sleep(self.retry_delay)
+
+            self.connect(retry_count=(retry_count + 1))
+
+    def start(self) -> None:
+        """
+        Connect, then consume on a thread of its own.
+        """
+        self.__closing = False
+        self.connect()
+
+        self.thread = Thread(target=self.consume, daemon=True)
+        self.thread.start()
+
+    def __reopen_closed_channels(self) -> None:
+        """
+        Open the channels the broker closed again. The other consumers keep consuming meanwhile.
+        """
+        for consumer in self.consumers:
+            if consumer.channel.is_closed:
+                logger.warning(f"Reopening closed channel of {consumer.queue_name!r}")
+                self.__open_channel(consumer)
+                consumer.subscribe()
+
+    def consume(self, retry_count=1) -> None:
+        """
+        Subscribe every consumer and run pika's I/O loop for all of them until ``close()`` is called,
+        with retry logic.
+        """
+        try:
+            for consumer in self.consumers:
+                consumer.subscribe()
+
+            while not self.__closing:
+                self.connection.process_data_events(time_limit=1)
+                self.__reopen_closed_channels()
+
+            self.connection.close()
+
+        except CONNECTION_ERRORS as error:
+            if self.__closing:
+                return
+
+            if not (retry_count % self.connection_attempts):
+                self.__send_reconnection_error_message(error, retry_count)
+
+                if not self.infinite_retry:
+                    raise error
+
+            time.sleep(self.retry_delay)
+
+            self.connect()
+            self.consume(retry_count=(retry_count + 1))
+
+    def close(self) -> None:
+        """
+        Stop consuming and close the connection within a second.
+        """
+        self.__closing = True
+
+        if self.thread:
+            self.thread.join(1.5)
+
+        for publisher in self.retry_publishers.values():
+            publisher.close()
@@ -0,0 +1,215 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ dedupe stores for idempotent consumption
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import hashlib
+import math
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+
+class DedupeStore(object):
+    """
+    Remembers the dedupe keys of processed messages so a redelivered or republished message is recognized.
+    Subclasses implement ``contains`` and ``add``; ``is_duplicate`` counts ``hits`` and ``misses``.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def is_duplicate(self, key: str) -> bool:
+        """
+        Check whether a message with this key was processed already, and count the result.
+        :param key: Dedupe key of a consumed message.
+        """
+        if self.contains(key):
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    def contains(self, key: str) -> bool:
+        """
+        Whether a message with this key was processed already.
+        :param key: Dedupe key of a consumed message.
+        """
+        raise NotImplementedError
+
+    def add(self, key: str) -> None:
+        """
+        Remember that a message with this key was processed.
+        :param key: Dedupe key of a consumed message.
+        """
+        raise NotImplementedError
+
+
+class MemoryDedupeStore(DedupeStore):
+    """
+    Remembers keys in process memory for ``ttl`` seconds, evicting the least recently used ones beyond ``max_size``.
+    """
+
+    def __init__(self, max_size: int = 100000, ttl: Optional[float] = 3600):
+        """
+        :param max_size: Maximum number of remembered keys. Default: ``100000``
+        :param ttl: Seconds a key is remembered for. Forever when ``None``. Default: ``3600``
+        """
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.__lock = Lock()
+        self.__keys = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def contains(self, key: str) -> bool:
+        with self.__lock:
+            expires_at = self.__keys.get(key, False)
+
+            if expires_at is False:
+                return False
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.__keys[key]
+                return False
+
+            self.__keys.move_to_end(key)
+            return True
+
+    def add(self, key: str) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self.__lock:
+            self.__keys[key] = expires_at
+            self.__keys.move_to_end(key)
+
+            while len(self.__keys) > self.max_size:
+                self.__keys.popitem(last=False)
+
+
+class BloomDedupeStore(DedupeStore):
+    """
+    A Bloom filter in front of another store for high volumes. Most new keys are told apart by the filter
+    in memory, so the other store is only asked about keys the filter may have seen.
+    The filter never forgets keys, so size ``capacity`` for the keys expected over the process' lifetime.
+    """
+
+    def __init__(
+        self, store: DedupeStore, capacity: int = 1000000, error_rate: float = 0.001
+    ):
+        """
+        :param store: Store that decides about keys the filter may have seen, and that every key is added to.
+        :param capacity: Number of keys the filter is sized for. Default: ``1000000``
+        :param error_rate: Rate of new keys the filter passes on to ``store`` at ``capacity``. Default: ``0.001``
+        """
+        super().__init__()
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+
+        self.__lock = Lock()
+        self.__bits = bytearray((self.size + 7) // 8)
+
+    def __positions(self, key: str):
+        """
+        Bit positions of a key, from two halves of one digest combined by double hashing.
+        """
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def contains(self, key: str) -> bool:
+        bits = self.__bits
+
+        if not all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self.__positions(key)
+        ):
+            return False
+
+        return self.store.contains(key)
+
+    def add(self, key: str) -> None:
+        with self.__lock:
+            for position in self.__positions(key):
+                self.__bits[position >> 3] |= 1 << (position & 7)
+
+        self.store.add(key)
+
+
+class SQLiteDedupeStore(DedupeStore):
+    """
+    Remembers keys in an SQLite database, so they survive process restarts and can be shared
+    by the consumers of one host.
+    """
+
+    # Expired keys are deleted once every this many adds.
+    PURGE_INTERVAL = 1000
+
+    def __init__(self, path: str, ttl: Optional[float] = 86400):
+        """
+        :param path: Path of the SQLite database. It is created if it does not exist.
+        :param ttl: Seconds a key is remembered for. Forever when ``None``. Default: ``86400``
+        """
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+
+        self.__lock = Lock()
+        self.__adds = 0
+        self.__database = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.__database.execute("PRAGMA journal_mode=WAL")
+        self.__database.execute(
+            "CREATE TABLE IF NOT EXISTS dedupe ("
+            "key TEXT PRIMARY KEY, "
+            "expires_at REAL)"
+        )
+
+    def contains(self, key: str) -> bool:
+        with self.__lock:
+            row = self.__database.execute(
+                "SELECT 1 FROM dedupe WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+
+        return row is not None
+
+    def add(self, key: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+
+        with self.__lock:
+            self.__database.execute(
+                "INSERT OR REPLACE INTO dedupe (key, expires_at) VALUES (?, ?)",
+                (key, expires_at),
+            )
+            self.__adds += 1
+
+            if not self.__adds % self.PURGE_INTERVAL:
+                self.__database.execute(
+                    "DELETE FROM dedupe WHERE expires_at <= ?", (now,)
+                )
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        self.__database.close()
@@ -0,0 +1,324 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ Outbox class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import logging
+import sqlite3
+from contextlib import suppress
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional, Tuple
+
+from pika import BasicProperties
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.exceptions import AMQPError, ChannelClosedByBroker, ChannelWrongStateError
+
+from pyrmq.confirms import CONFIRMED, UNROUTABLE, ConfirmTracker
+
+logger = logging.getLogger("pyrmq")
+
+
+class Outbox(object):
+    """
+    An append-only journal in SQLite for messages that could not be published while the broker was unreachable.
+
+    A background thread replays the journal in order on its own connection once the broker is back,
+    and removes each message only after the broker confirmed it. Messages survive process restarts:
+    an outbox opened on an existing journal starts replaying it right away. Replayed messages are
+    delivered at least once, so a message whose confirm was lost to a failure may be published twice.
+
+    When the broker closes the channel, e.g. because a spooled message's exchange does not exist, the unconfirmed
+    messages of the batch are replayed again one by one. Messages the broker closes the channel on by themselves
+    are logged, counted in ``failed`` and removed from the journal instead of blocking the ones after them forever.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        open_channel: Callable[[], BlockingChannel],
+        retry_delay: float = 5,
+        batch_size: int = 100,
+    ):
+        """
+        :param path: Path of the SQLite journal. It is created if it does not exist.
+        :param open_channel: Callable that opens a new connection and returns a channel that is not in confirm mode yet.
+        :param retry_delay: Seconds to wait before replaying again after the broker could not be reached. Default: ``5``
+        :param batch_size: Maximum number of messages replayed per confirm round trip. Default: ``100``
+        """
+        self.path = path
+        self.open_channel = open_channel
+        self.retry_delay = retry_delay
+        self.batch_size = batch_size
+        self.failed = 0
+
+        self.__lock = Lock()
+        self.__closed = Event()
+        self.__thread = None
+        self.__closed_reason = None
+        self.__journal = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.__journal.execute("PRAGMA journal_mode=WAL")
+        # Every append is on disk once it returns, so a crash right after cannot lose it.
+        self.__journal.execute("PRAGMA synchronous=FULL")
+        self.__journal.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "exchange TEXT NOT NULL, "
+            "routing_key TEXT NOT NULL, "
+            "body BLOB NOT NULL, "
+            "properties BLOB NOT NULL)"
+        )
+        (self.__pending,) = self.__journal.execute(
+            "SELECT COUNT(*) FROM outbox"
+        ).fetchone()
+
+        if self.__pending:
+            self.__ensure_started()
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of messages in the journal that the broker has not confirmed yet.
+        """
+        return self.__pending
+
+    def append(
+        self,
+        exchange: str,
+        routing_key: str,
+        body: bytes,
+        properties: BasicProperties,
+    ) -> None:
+        """
+        Write a message to the journal and make sure it is being replayed. Never waits for the broker.
+        :param exchange: Exchange to publish to.
+        :param routing_key: Routing key to publish with.
+        :param body: Serialized message.
+        :param properties: Message properties, stored in their AMQP encoding.
+        """
+        with self.__lock:
+            self.__journal.execute(
+                "INSERT INTO outbox (exchange, routing_key, body, properties) VALUES (?, ?, ?, ?)",
+                (exchange, routing_key, body, b"".join(properties.encode())),
+            )
+            self.__pending += 1
+            self.__ensure_started()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop replaying the journal. Messages not confirmed yet stay in it and are replayed
+        after the next ``append`` or by the next outbox opened on the same path.
+        :param timeout: Seconds to wait for the background thread to finish. Waits indefinitely when ``None``.
+        """
+        self.__closed.set()
+
+        with self.__lock:
+            thread = self.__thread
+
+        if thread:
+            thread.join(timeout)
+
+        self.__closed.clear()
+
+    def __ensure_started(self) -> None:
+        """
+        Start the background thread unless it is already running. Called with the lock held.
+        """
+        if self.__thread is None and not self.__closed.is_set():
+            self.__thread = Thread(target=self.__run, daemon=True)
+            self.__thread.start()
+
+    def __next_batch(self) -> List[Tuple[int, str, str, bytes, bytes]]:
+        """
+        Read the oldest messages of the journal. Stops the background thread when there are none.
+        """
+        with self.__lock:
+            rows = self.__journal.execute(
+                "SELECT id, exchange, routing_key, body, properties FROM outbox ORDER BY id LIMIT ?",
+                (self.batch_size,),
+            ).fetchall()
+
+            if not rows or self.__closed.is_set():
+                self.__thread = None
+                return []
+
+            return rows
+
+    def __remove(self, ids: List[int]) -> None:
+        """
+        Delete messages from the journal once the broker took responsibility for them.
+        """
+        with self.__lock:
+            self.__journal.executemany(
+                "DELETE FROM outbox WHERE id = ?", [(id_,) for id_ in ids]
+            )
+            self.__pending -= len(ids)
+
+    def __connect(self, results: dict) -> Tuple[BlockingChannel, ConfirmTracker]:
+        """
+        Open the background thread's channel and put it in confirm mode.
+        :param results: Filled with the result of each replayed message by its journal id.
+        """
+        channel = self.open_channel()
+
+        def on_resolve(id_: int, result: str) -> None:
+            results[id_] = result
+
+            if not tracker.pending:
+                # Wake up process_data_events() as soon as the last confirm is in.
+                channel.connection.add_callback_threadsafe(lambda: None)
+
+        def on_close(impl, reason: Exception) -> None:
+            self.__closed_reason = reason
+
+        self.__closed_reason = None
+        tracker = ConfirmTracker(on_resolve=on_resolve)
+        tracker.attach(channel)
+        channel._impl.add_on_close_callback(on_close)
+
+        return channel, tracker
+
+    def __replay(
+        self,
+        channel: BlockingChannel,
+        tracker: ConfirmTracker,
+        rows: List[Tuple[int, str, str, bytes, bytes]],
+        results: dict,
+    ) -> None:
+        """
+        Publish a batch on the channel and remove the messages the broker confirmed or could not route,
+        even if the channel fails before every message was confirmed. Nacked messages stay in the journal
+        to be replayed again.
+        :raises: ChannelClosedByBroker if the broker closed the channel before every message was confirmed.
+        """
+        results.clear()
+
+        try:
+            for id_, exchange, routing_key, body, encoded_properties in rows:
+                properties = BasicProperties()
+                properties.decode(encoded_properties)
+                tracker.track(id_, routing_key, body)
+                channel.basic_publish(
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    body=body,
+                    properties=properties,
+                    mandatory=True,
+                )
+
+            while tracker.pending:
+                if not channel.is_open:
+                    if isinstance(self.__closed_reason, ChannelClosedByBroker):
+                        raise self.__closed_reason
+
+                    raise ChannelWrongStateError(
+                        "Channel closed before every message was confirmed."
+                    )
+
+                channel.connection.process_data_events(time_limit=1)
+
+        finally:
+            self.__remove_resolved(results)
+
+    def __remove_resolved(self, results: dict) -> None:
+        """
+        Remove the replayed messages the broker confirmed or could not route from the journal.
+        """
+        unroutable = [id_ for id_, result in results.items() if result == UNROUTABLE]
+
+        if unroutable:
+            logger.warning(
+                f"{len(unroutable)} replayed message(s) could not be routed to any queue."
+            )
+
+        self.__remove(
+            [
+                id_
+                for id_, result in results.items()
+                if result in (CONFIRMED, UNROUTABLE)
+            ]
+        )
+
+    def __drop(
+        self, rows: List[Tuple[int, str, str, bytes, bytes]], error: Exception
+    ) -> None:
+        """
+        Remove messages the broker rejected from the journal, so the messages after them are replayed.
+        """
+        for _, exchange, routing_key, _, _ in rows:
+            self.failed += 1
+            logger.error(
+                f"Dropped a replayed message the broker rejected. Exchange: {exchange}, "
+                f"Routing key: {routing_key}: {error!r}"
+            )
+
+        self.__remove([row[0] for row in rows])
+
+    @staticmethod
+    def __close_channel(channel: Optional[BlockingChannel]) -> None:
+        """
+        Close the channel's connection, ignoring errors from connections that are already gone.
+        """
+        if channel and channel.connection.is_open:
+            with suppress(AMQPError, OSError):
+                channel.connection.close()
+
+    def __run(self) -> None:
+        """
+        Replay the journal until it is empty or the outbox is closed.
+        """
+        channel = tracker = None
+        results = {}
+
+        try:
+            while True:
+                rows = self.__next_batch()
+
+                if not rows:
+                    return
+
+                batches = [rows]
+
+                while batches and not self.__closed.is_set():
+                    rows = batches.pop()
+
+                    try:
+                        if not (channel and channel.is_open):
+                            channel, tracker = self.__connect(results)
+
+                        self.__replay(channel, tracker, rows, results)
+
+                    except ChannelClosedByBroker as error:
+                        self.__close_channel(channel)
+                        channel = None
+                        unresolved = [
+                            row
+                            for row in rows
+                            if results.get(row[0]) not in (CONFIRMED, UNROUTABLE)
+                        ]
+
+                        if len(rows) > 1:
+                            # Replay them one by one, so only the messages the broker rejects are dropped.
+                            batches.extend([row] for row in reversed(unresolved))
+
+                        else:
+                            self.__drop(unresolved, error)
+
+                    except Exception as error:
+                        logger.warning(
+                            f"Could not replay the outbox {self.path}, retrying in {self.retry_delay} seconds: {error!r}"
+                        )
+                        self.__close_channel(channel)
+                        channel = None
+                        # Read the journal again, so the messages are replayed in order.
+                        batches.clear()
+                        self.__closed.wait(self.retry_delay)
+
+        finally:
+            self.__close_channel(channel)
@@ -0,0 +1,144 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ ChannelPool class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import time
+from collections import deque
+from contextlib import suppress
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Optional
+
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.exceptions import AMQPError
+
+
+class ChannelPool(object):
+    """
+    A bounded pool of publishing channels that can be shared between threads.
+
+    pika's ``BlockingConnection`` and its channels are not thread-safe, so every pooled
+    channel owns its own connection and is checked out by one thread at a time.
+    Checking out and in only touches the pool's bookkeeping; no lock is held while publishing.
+    """
+
+    def __init__(
+        self,
+        open_channel: Callable[[], BlockingChannel],
+        size: int = 8,
+        checkout_timeout: Optional[float] = None,
+        max_idle: Optional[float] = 60,
+    ):
+        """
+        :param open_channel: Callable that opens a new connection and returns its ready-to-use channel.
+        :param size: Maximum number of channels, and therefore connections, in the pool. Default: ``8``
+        :param checkout_timeout: Seconds to wait for a free channel before raising ``TimeoutError``.
+            Waits indefinitely when ``None``. Default: ``None``
+        :param max_idle: Seconds a channel may sit unused before it is closed instead of reused.
+            Keep this below the connection's heartbeat. Never expires when ``None``. Default: ``60``
+        """
+        self.open_channel = open_channel
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.max_idle = max_idle
+
+        self.__idle = deque()
+        self.__idle_lock = Lock()
+        self.__slots = BoundedSemaphore(size)
+
+    @staticmethod
+    def __close_channel(channel: BlockingChannel) -> None:
+        """
+        Close the channel's connection, ignoring errors from connections that are already gone.
+        """
+        if channel.connection.is_open:
+            with suppress(AMQPError, OSError):
+                channel.connection.close()
+
+    def __is_expired(self, last_used: float, now: float) -> bool:
+        """
+        Check whether a channel has been idle for longer than ``max_idle``.
+        """
+        return self.max_idle is not None and now - last_used >= self.max_idle
+
+    def __take_idle_channel(self) -> Optional[BlockingChannel]:
+        """
+        Take the most recently used idle channel that is still open and fresh.
+        Expired and closed channels found along the way are closed.
+        """
+        stale = []
+        channel = None
+        now = time.monotonic()
+
+        with self.__idle_lock:
+            while self.__idle:
+                candidate, last_used = self.__idle.pop()
+
+                if (
+                    candidate.is_open
+                    and candidate.connection.is_open
+                    and not self.__is_expired(last_used, now)
+                ):
+                    channel = candidate
+                    break
+
+                stale.append(candidate)
+
+            # Channels at the cold end of the deque are the ones idling the longest.
+            while self.__idle and self.__is_expired(self.__idle[0][1], now):
+                stale.append(self.__idle.popleft()[0])
+
+        for candidate in stale:
+            self.__close_channel(candidate)
+
+        return channel
+
+    def checkout(self) -> BlockingChannel:
+        """
+        Take a channel from the pool, opening a new one if no idle channel can be reused.
+        Every checked out channel must be given back through ``checkin``.
+        :raises: TimeoutError if no channel becomes available within ``checkout_timeout``
+        """
+        if not self.__slots.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(
+                f"No channel became available within {self.checkout_timeout} seconds."
+            )
+
+        try:
+            return self.__take_idle_channel() or self.open_channel()
+
+        except Exception:
+            self.__slots.release()
+            raise
+
+    def checkin(self, channel: BlockingChannel) -> None:
+        """
+        Give a checked out channel back to the pool. Closed channels are discarded.
+        :param channel: Channel previously returned by ``checkout``.
+        """
+        try:
+            if channel.is_open and channel.connection.is_open:
+                with self.__idle_lock:
+                    self.__idle.append((channel, time.monotonic()))
+
+            else:
+                self.__close_channel(channel)
+
+        finally:
+            self.__slots.release()
+
+    def close(self) -> None:
+        """
+        Close every idle channel in the pool. Channels are opened again if the pool is reused.
+        """
+        with self.__idle_lock:
+            idle = [channel for channel, _ in self.__idle]
+            self.__idle.clear()
+
+        for channel in idle:
+            self.__close_channel(channel)
@@ -0,0 +1,112 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ PublishProfile class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from pika import BasicProperties
+
+from pyrmq.claim_check import check_in
+from pyrmq.compression import compress
+
+
+class PublishProfile(object):
+    """
+    A publishing destination with its message properties, priority and serializer resolved once.
+    Create one with :meth:`~pyrmq.Publisher.profile`.
+
+    ``publish`` only serializes the data and fills in the per-message properties,
+    then publishes through its Publisher's connection, retries and confirms.
+    """
+
+    def __init__(
+        self,
+        publisher,
+        routing_key: str,
+        properties: BasicProperties,
+        serializer,
+        exchange: Optional[str] = None,
+    ):
+        """
+        :param publisher: The :class:`~pyrmq.Publisher` to publish through.
+        :param routing_key: Routing key every message is published with.
+        :param properties: Default properties of every message, including their ``content_type``.
+        :param serializer: ``Serializer`` of every message.
+        :param exchange: Exchange every message is published to. Defaults to the Publisher's ``exchange_name``.
+        """
+        self.publisher = publisher
+        self.routing_key = routing_key
+        self.properties = properties
+        self.serializer = serializer
+        self.exchange = exchange or publisher.exchange_name
+
+        self.__defaults = dict(properties.__dict__)
+        self.__headers = properties.headers
+
+    def publish(
+        self,
+        data: Any,
+        message_id: Optional[str] = None,
+        timestamp: Optional[int] = None,
+        headers: Optional[dict] = None,
+    ) -> Optional[Future]:
+        """
+        Publish data with the profile's destination and properties.
+        :param data: Data to be published.
+        :param message_id: The message's ``message_id`` property.
+        :param timestamp: The message's ``timestamp`` property, in seconds since the epoch.
+        :param headers: Headers added to the profile's default headers.
+        :return: With ``confirm_window`` set on the Publisher, a ``Future`` resolved once the broker
+            confirms the message. Otherwise ``None``.
+        """
+        publisher = self.publisher
+
+        if message_id is None and timestamp is None and headers is None:
+            # Nothing differs from the defaults, so every message shares them.
+            properties = self.properties
+
+        else:
+            # Copying the defaults' attributes is several times cheaper than
+            # BasicProperties.__init__ with every property as a keyword.
+            properties = object.__new__(BasicProperties)
+            properties.__dict__ = self.__defaults.copy()
+
+            if message_id is not None:
+                properties.message_id = message_id
+
+            if timestamp is not None:
+                properties.timestamp = timestamp
+
+            if headers is not None:
+                properties.headers = (
+                    {**self.__headers, **headers} if self.__headers else headers
+                )
+
+        body = self.serializer.dumps(data)
+
+        if publisher.compression:
+            body, properties = compress(
+                body,
+                properties,
+                publisher.compression,
+                publisher.compression_threshold,
+            )
+
+        if publisher.claim_check_store:
+            body, properties = check_in(
+                body,
+                properties,
+                publisher.claim_check_store,
+                publisher.claim_check_threshold,
+            )
+
+        return publisher._publish_body(
+            body, properties, self.routing_key, exchange=self.exchange
+        )
@@ -8,11 +8,14 @@
     Full documentation is available at https://pyrmq.readthedocs.io
 """
 
-import json
 import logging
 import os
 import time
-from typing import Optional
+from concurrent.futures import Future
+from contextlib import suppress
+from threading import Lock
+from typing import Iterable, List, Optional, Tuple, Union
+from weakref import WeakKeyDictionary
 
 from pika import (
     BasicProperties,
@@ -26,11 +29,25 @@ from pika.exceptions import (
     AMQPChannelError,
     AMQPConnectionError,
     ChannelClosedByBroker,
+    ChannelWrongStateError,
+    ConnectionBlockedTimeout,
     StreamLostError,
     UnroutableError,
 )
 from pika.spec import PERSISTENT_DELIVERY_MODE
 
+from pyrmq.background import BLOCK, RAISE, PublishQueue
+from pyrmq.claim_check import check_in
+from pyrmq.cluster import ROUND_ROBIN, Cluster
+from pyrmq.compression import compress, get_codec
+from pyrmq.confirms import UNROUTABLE, ConfirmTracker, ConfirmWindow
+from pyrmq.outbox import Outbox
+from pyrmq.pool import ChannelPool
+from pyrmq.profile import PublishProfile
+from pyrmq.rate_limit import RateLimitExceeded
+from pyrmq.retry import RetryPolicy
+from pyrmq.serializers import Serializer, get_serializer, negotiate_serializer
+
 CONNECTION_ERRORS = (
     AMQPConnectionError,
     AMQPConnectorException,
@@ -40,14 +57,28 @@ CONNECTION_ERRORS = (
     ConnectionError,
     StreamLostError,
 )
+# Errors meaning the broker cannot be reached, as opposed to errors about the message or the exchange.
+OUTAGE_ERRORS = (
+    AMQPConnectionError,
+    AMQPConnectorException,
+    ConnectionError,
+)
 CONNECT_ERROR = "CONNECT_ERROR"
 
+# What publish does while the broker blocks publishing connections because of a resource alarm.
+WAIT = "wait"
+SPOOL = "spool"
+# Result of a publish_many message written to the outbox while the broker blocks publishing.
+SPOOLED = "SPOOLED"
+
 logger = logging.getLogger("pyrmq")
 
 
 class Publisher(object):
     """
     This class uses a ``BlockingConnection`` from pika for publishing messages to RabbitMQ.
+    The connection and its channel are opened lazily on the first publish and reused
+    afterwards. They are re-established whenever they are found closed.
 
     Important Note:
     This class does not declare or bind queues. It only verifies that exchanges exist but will not
@@ -72,12 +103,62 @@ class Publisher(object):
         :keyword port: Your RabbitMQ port. Checks env var ``RABBITMQ_PORT``. Default: ``5672``
         :keyword username: Your RabbitMQ username. Default: ``"guest"``
         :keyword password: Your RabbitMQ password. Default: ``"guest"``
+        :keyword hosts: RabbitMQ nodes of a cluster as ``"host"`` or ``"host:port"`` strings, used instead of ``host``.
+            Every connect tries them in the order of ``host_strategy``, one attempt each. Default: ``None``
+        :keyword host_strategy: ``"round_robin"``, ``"random"``, or ``"health"`` to prefer the nodes with the lowest
+            recent connect latency and fewest recent failures. Default: ``"round_robin"``
+        :keyword host_quarantine: Seconds a node that failed to connect is only tried after every other node. Default: ``10``
         :keyword connection_attempts: How many times should PyRMQ try?. Default: ``3``
         :keyword retry_delay: Seconds between connection retries. Default: ``5``
+        :keyword retry_backoff: Factor ``retry_delay`` grows by after every retry. Default: ``1``
+        :keyword retry_max_delay: Upper bound of the delay between retries in seconds. Default: ``None``
+        :keyword retry_jitter: Wait a random delay between zero and the computed one, so publishers that failed
+            together do not retry together. Default: ``False``
+        :keyword retry_deadline: Seconds after which a publish stops retrying, even with ``infinite_retry``. Default: ``None``
+        :keyword retry_policy: A ``RetryPolicy`` used instead of the one built from the retry keywords. Default: ``None``
         :keyword error_callback: Callback function to be called when connection_attempts is reached.
         :keyword infinite_retry: Tells PyRMQ to keep on retrying to publish while firing error_callback, if any. Default: ``False``
         :keyword exchange_args: Exchange arguments for verification. Default: ``None``
         :keyword queue_args: Queue arguments for message properties. Default: ``{}``
+        :keyword pool_size: Publish through a thread-safe pool of up to this many channels, each on its own connection,
+            instead of the single long-lived channel. Use this when one Publisher is shared between threads. Default: ``None``
+        :keyword pool_checkout_timeout: Seconds a publish waits for a free pooled channel before raising ``TimeoutError``.
+            Waits indefinitely when ``None``. Default: ``None``
+        :keyword pool_max_idle: Seconds a pooled channel may stay unused before it is closed instead of reused. Default: ``60``
+        :keyword confirm_window: Makes ``publish`` return a ``Future`` right away instead of waiting for the broker's confirm,
+            with at most this many messages unconfirmed at a time. Default: ``None``
+        :keyword exchange_verify_ttl: Seconds a connection trusts its last check that the exchange exists.
+            When ``None``, the exchange is checked once per connection. Default: ``None``
+        :keyword serializer: Name of a registered serializer, e.g. ``"json"``, ``"orjson"``, ``"msgpack"`` or ``"raw"``,
+            or a ``Serializer`` instance. Its content type is set on every message. Default: ``"json"``
+        :keyword compression: Name of a registered codec, ``"gzip"`` or ``"zlib"``, or a ``Codec`` instance that compresses
+            message bodies of at least ``compression_threshold`` bytes and sets their ``content_encoding``. Default: ``None``
+        :keyword compression_threshold: Minimum body size in bytes to compress. Default: ``1024``
+        :keyword claim_check_store: A ``BlobStore`` that message bodies of at least ``claim_check_threshold`` bytes,
+            after compression, are written to. Only their key is published, in the ``x-claim-check`` header. Default: ``None``
+        :keyword claim_check_threshold: Minimum body size in bytes to write to the ``claim_check_store``. Default: ``1048576``
+        :keyword outbox_path: Path of an SQLite journal that messages are written to instead of retrying when the broker
+            cannot be reached. They are replayed in order in the background once it is back. Connections then make a single
+            attempt, so publishing does not wait for an unreachable broker. Default: ``None``
+        :keyword background_queue_size: Makes ``publish`` queue messages in memory, up to this many, and return right away
+            while a background thread publishes them in batches. Default: ``None``
+        :keyword background_batch_size: Maximum number of messages the background thread publishes per batch. Default: ``100``
+        :keyword background_linger: Seconds the background thread waits for a batch to fill up before publishing it.
+            Default: ``0.005``
+        :keyword background_full_policy: What ``publish`` does when the background queue is full: ``"block"``,
+            ``"drop_oldest"`` or ``"raise"`` ``queue.Full``. Default: ``"block"``
+        :keyword blocked_connection_timeout: Seconds a connection may stay blocked by a broker resource alarm
+            before pika closes it and the publish waiting on it raises ``ConnectionBlockedTimeout``.
+            Waits indefinitely when ``None``. Default: ``None``
+        :keyword blocked_policy: What ``publish`` does while the broker blocks the Publisher: ``"wait"`` until it is
+            unblocked or ``blocked_connection_timeout`` passes, ``"spool"`` the message to the outbox, which requires
+            ``outbox_path``, or ``"raise"`` ``ConnectionBlockedTimeout`` right away. Default: ``"wait"``
+        :keyword rate_limiter: A ``RateLimiter`` every publish acquires its messages and bytes from first.
+            Share one between Publishers to limit them together. Default: ``None``
+        :keyword rate_limit_block: Whether a publish waits for the rate limiter or raises ``RateLimitExceeded``
+            right away. Default: ``True``
+        :keyword rate_limit_timeout: Seconds a publish waits for the rate limiter before raising ``RateLimitExceeded``.
+            Waits as long as needed when ``None``. Default: ``None``
 
         .. note::
            This class no longer creates queues or exchanges. The exchange must exist before publishing,
@@ -92,25 +173,123 @@ class Publisher(object):
         self.port = kwargs.get("port") or os.getenv("RABBITMQ_PORT") or 5672
         self.username = kwargs.get("username", "guest")
         self.password = kwargs.get("password", "guest")
+        self.hosts = kwargs.get("hosts")
+        self.host_strategy = kwargs.get("host_strategy", ROUND_ROBIN)
+        self.host_quarantine = kwargs.get("host_quarantine", 10)
         self.connection_attempts = kwargs.get("connection_attempts", 3)
         self.retry_delay = kwargs.get("retry_delay", 5)
         self.error_callback = kwargs.get("error_callback")
         self.infinite_retry = kwargs.get("infinite_retry", False)
+        self.retry_policy = kwargs.get("retry_policy") or RetryPolicy(
+            attempts=self.connection_attempts,
+            delay=self.retry_delay,
+            backoff=kwargs.get("retry_backoff", 1),
+            max_delay=kwargs.get("retry_max_delay"),
+            jitter=kwargs.get("retry_jitter", False),
+            deadline=kwargs.get("retry_deadline"),
+            infinite=self.infinite_retry,
+        )
         self.exchange_args = kwargs.get("exchange_args")
         self.queue_args = kwargs.get("queue_args", {})
+        self.pool_size = kwargs.get("pool_size")
+        self.pool_checkout_timeout = kwargs.get("pool_checkout_timeout")
+        self.pool_max_idle = kwargs.get("pool_max_idle", 60)
+        self.confirm_window = kwargs.get("confirm_window")
+        self.exchange_verify_ttl = kwargs.get("exchange_verify_ttl")
+        self.serializer = get_serializer(kwargs.get("serializer", "json"))
+        self.compression = get_codec(kwargs.get("compression"))
+        self.compression_threshold = kwargs.get("compression_threshold", 1024)
+        self.claim_check_store = kwargs.get("claim_check_store")
+        self.claim_check_threshold = kwargs.get("claim_check_threshold", 1048576)
+        self.outbox_path = kwargs.get("outbox_path")
+        self.background_queue_size = kwargs.get("background_queue_size")
+        self.background_batch_size = kwargs.get("background_batch_size", 100)
+        self.background_linger = kwargs.get("background_linger", 0.005)
+        self.background_full_policy = kwargs.get("background_full_policy", BLOCK)
+        self.blocked_connection_timeout = kwargs.get("blocked_connection_timeout")
+        self.blocked_policy = kwargs.get("blocked_policy", WAIT)
+        self.rate_limiter = kwargs.get("rate_limiter")
+        self.rate_limit_block = kwargs.get("rate_limit_block", True)
+        self.rate_limit_timeout = kwargs.get("rate_limit_timeout")
+
+        if self.blocked_policy not in (WAIT, SPOOL, RAISE):
+            raise ValueError(
+                f"Unknown blocked_policy {self.blocked_policy!r}. Choose from {[WAIT, SPOOL, RAISE]}."
+            )
+
+        if self.blocked_policy == SPOOL and not self.outbox_path:
+            raise ValueError("blocked_policy 'spool' requires an outbox_path.")
 
         self.connection_parameters = ConnectionParameters(
             host=self.host,
             port=self.port,
             credentials=PlainCredentials(self.username, self.password),
-            connection_attempts=self.connection_attempts,
+            # With an outbox, publishing must not wait out pika's own attempts during an outage.
+            # The outbox retries in the background instead.
+            connection_attempts=1 if self.outbox_path else self.connection_attempts,
             retry_delay=self.retry_delay,
+            blocked_connection_timeout=self.blocked_connection_timeout,
         )
+        self.cluster = None
+
+        if self.hosts:
+            self.cluster = Cluster(
+                self.hosts,
+                self.connection_parameters,
+                strategy=self.host_strategy,
+                quarantine=self.host_quarantine,
+            )
 
         if "x-queue-type" not in self.queue_args:
             self.queue_args["x-queue-type"] = "quorum"
 
-        self.connections = {}
+        self.connection = None
+        self.channel = None
+        self.pool = None
+        self.__verified_exchanges = WeakKeyDictionary()
+        self.__blocked_lock = Lock()
+        self.__blocked_connections = set()
+        self.__blocked_since = None
+        self.__total_blocked_duration = 0.0
+
+        if self.pool_size:
+            self.pool = ChannelPool(
+                self.__open_channel,
+                size=self.pool_size,
+                checkout_timeout=self.pool_checkout_timeout,
+                max_idle=self.pool_max_idle,
+            )
+
+        self.window = None
+
+        if self.confirm_window:
+            self.window = ConfirmWindow(
+                lambda: self.__open_channel(confirm_delivery=False),
+                max_in_flight=self.confirm_window,
+                verify_exchange=self.__verify_exchange_aside,
+            )
+
+        self.outbox = None
+
+        if self.outbox_path:
+            self.outbox = Outbox(
+                self.outbox_path,
+                lambda: self.__open_channel(confirm_delivery=False),
+                retry_delay=self.retry_delay,
+            )
+
+        self.background = None
+
+        if self.background_queue_size:
+            self.background = PublishQueue(
+                lambda: self.__open_channel(confirm_delivery=False),
+                max_size=self.background_queue_size,
+                batch_size=self.background_batch_size,
+                linger=self.background_linger,
+                full_policy=self.background_full_policy,
+                retry_delay=self.retry_delay,
+                verify_exchange=self.__verify_exchange_aside,
+            )
 
     def __send_reconnection_error_message(self, error, retry_count) -> None:
         """
@@ -136,21 +315,158 @@ class Publisher(object):
 
     def __create_connection(self) -> BlockingConnection:
         """
-        Create pika's ``BlockingConnection`` from the given connection parameters.
+        Create pika's ``BlockingConnection`` from the given connection parameters,
+        or to a node of the cluster, and track whether the broker blocks it.
+        """
+        if self.cluster:
+            connection = self.cluster.connect()
+
+        else:
+            connection = BlockingConnection(self.connection_parameters)
+
+        connection.add_on_connection_blocked_callback(self.__on_blocked)
+        connection.add_on_connection_unblocked_callback(self.__on_unblocked)
+        # A connection closed while blocked, e.g. by blocked_connection_timeout, is never unblocked.
+        connection._impl.add_on_close_callback(
+            lambda impl, error: self.__on_unblocked(connection)
+        )
+
+        return connection
+
+    def __on_blocked(self, connection: BlockingConnection, frame=None) -> None:
+        """
+        Record that the broker blocked one of the Publisher's connections because of a resource alarm.
+        """
+        with self.__blocked_lock:
+            if not self.__blocked_connections:
+                self.__blocked_since = time.monotonic()
+                logger.warning(
+                    f"RabbitMQ blocked publishing: {frame.method.reason if frame else 'unknown reason'}"
+                )
+
+            self.__blocked_connections.add(connection)
+
+    def __on_unblocked(self, connection: BlockingConnection, frame=None) -> None:
+        """
+        Record that the broker unblocked one of the Publisher's connections or that it was closed.
+        """
+        with self.__blocked_lock:
+            if connection not in self.__blocked_connections:
+                return
+
+            self.__blocked_connections.discard(connection)
+
+            if not self.__blocked_connections:
+                blocked_for = time.monotonic() - self.__blocked_since
+                self.__total_blocked_duration += blocked_for
+                self.__blocked_since = None
+                logger.info(
+                    f"RabbitMQ unblocked publishing after {blocked_for:.3f} seconds."
+                )
+
+    @property
+    def is_blocked(self) -> bool:
+        """
+        Whether the broker currently blocks any of the Publisher's connections because of a memory or disk alarm.
+        """
+        return bool(self.__blocked_connections)
+
+    @property
+    def blocked_duration(self) -> float:
+        """
+        Seconds the broker has been blocking the Publisher's connections for. ``0.0`` when it is not blocking them.
+        """
+        blocked_since = self.__blocked_since
+
+        return time.monotonic() - blocked_since if blocked_since is not None else 0.0
+
+    @property
+    def total_blocked_duration(self) -> float:
+        """
+        Seconds the broker blocked the Publisher's connections for in total, including an ongoing block.
+        """
+        return self.__total_blocked_duration + self.blocked_duration
+
+    def __is_connected(self) -> bool:
+        """
+        Check whether the long-lived connection and channel can still be used.
         """
-        return BlockingConnection(self.connection_parameters)
+        if not (self.channel and self.channel.is_open and self.connection.is_open):
+            return False
+
+        try:
+            # Service heartbeats and surface a dropped connection before publishing on it.
+            self.connection.process_data_events(time_limit=0)
 
-    def verify_exchange(self, channel) -> None:
+        except CONNECTION_ERRORS:
+            return False
+
+        return self.channel.is_open
+
+    @staticmethod
+    def __close_connection(connection: Optional[BlockingConnection]) -> None:
+        """
+        Close a connection if it is still open, ignoring errors from connections that are already gone.
+        """
+        if connection and connection.is_open:
+            with suppress(*CONNECTION_ERRORS):
+                connection.close()
+
+    def __reset_connection(self) -> None:
+        """
+        Drop the long-lived connection and channel, closing the connection if it is still open.
+        """
+        connection = self.connection
+        self.connection = None
+        self.channel = None
+
+        self.__close_connection(connection)
+
+    def close(self, timeout: Optional[float] = 30) -> None:
+        """
+        Close the Publisher's connections to RabbitMQ. The next publish opens new ones.
+        Messages queued for the background thread or the confirm window are published first.
+        :param timeout: Seconds to wait for each of them to be published. Should the broker still be unreachable
+            by then, the background thread gives up on the messages it could not publish.
+            Waits indefinitely when ``None``. Default: ``30``
+        """
+        if self.background is not None:
+            self.background.close(timeout)
+
+        self.__reset_connection()
+
+        if self.pool:
+            self.pool.close()
+
+        if self.window:
+            self.window.close(timeout)
+
+        if self.outbox:
+            self.outbox.close()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every message queued for the background thread was published and confirmed.
+        :param timeout: Seconds to wait. Waits indefinitely when ``None``.
+        :return: Whether every message was confirmed before the timeout. Always ``True`` without ``background_queue_size``.
+        """
+        if self.background is None:
+            return True
+
+        return self.background.flush(timeout)
+
+    def verify_exchange(self, channel, exchange: Optional[str] = None) -> None:
         """
         Verifies that an exchange exists using passive mode.
         This will raise an exception if the exchange doesn't exist.
 
         :param channel: pika Channel
+        :param exchange: Exchange to verify. Defaults to the Publisher's ``exchange_name``.
         :raises: ChannelClosedByBroker if the exchange doesn't exist
         """
         # Always use passive mode to only check if exchange exists
         channel.exchange_declare(
-            exchange=self.exchange_name,
+            exchange=exchange or self.exchange_name,
             durable=True,
             exchange_type=self.exchange_type,
             arguments=self.exchange_args,
@@ -159,31 +475,213 @@ class Publisher(object):
 
     def connect(self, retry_count=1) -> BlockingChannel:
         """
-        Create pika's ``BlockingConnection`` and verify the exchange exists.
+        Return the Publisher's long-lived channel. Create pika's ``BlockingConnection``
+        and verify the exchange exists if there is no open channel yet.
         :param retry_count: Amount retries the Publisher tried before sending an error message.
         :raises: ChannelClosedByBroker if the exchange doesn't exist
         """
-        try:
-            connection = self.__create_connection()
-            channel = connection.channel()
-            channel.confirm_delivery()
+        if self.__is_connected():
+            return self.channel
 
-            self.verify_exchange(channel)
+        self.__reset_connection()
 
-            return channel
+        self.channel = self.__open_channel(retry_count=retry_count)
+        self.connection = self.channel.connection
 
-        except CONNECTION_ERRORS as error:
-            if not (retry_count % self.connection_attempts):
-                self.__send_reconnection_error_message(
-                    error, self.connection_attempts * retry_count
-                )
+        return self.channel
+
+    def __open_channel(
+        self, retry_count=1, confirm_delivery: bool = True
+    ) -> BlockingChannel:
+        """
+        Create a new pika ``BlockingConnection`` and return its channel once the exchange
+        is verified to exist.
+        :param retry_count: Amount retries the Publisher tried before sending an error message.
+        :param confirm_delivery: Whether to put the channel in pika's blocking confirm mode.
+        :raises: ChannelClosedByBroker if the exchange doesn't exist
+        """
+        deadline = self.retry_policy.deadline_at()
+
+        while True:
+            connection = None
+
+            try:
+                connection = self.__create_connection()
+                channel = connection.channel()
+
+                if confirm_delivery:
+                    channel.confirm_delivery()
+
+                self.__verify_exchange_once(channel)
+
+                return channel
+
+            except CONNECTION_ERRORS as error:
+                self.__close_connection(connection)
 
-                if not self.infinite_retry:
+                if self.outbox and isinstance(error, OUTAGE_ERRORS):
+                    # The outbox retries in the background instead.
                     raise error
 
-            time.sleep(self.retry_delay)
+                self.retry_policy.wait(
+                    error,
+                    retry_count,
+                    deadline,
+                    # pika itself made connection_attempts attempts per retry.
+                    lambda error, attempt: self.__send_reconnection_error_message(
+                        error, self.retry_policy.attempts * attempt
+                    ),
+                )
+                retry_count += 1
+
+    def __verify_exchange_once(
+        self, channel: BlockingChannel, exchange: Optional[str] = None
+    ) -> None:
+        """
+        Verify the exchange exists unless the channel's connection already did so
+        within ``exchange_verify_ttl``.
+        :param channel: pika Channel
+        :param exchange: Exchange to verify. Defaults to the Publisher's ``exchange_name``.
+        :raises: ChannelClosedByBroker if the exchange doesn't exist
+        """
+        exchange = exchange or self.exchange_name
+
+        if self.__is_verified(channel, exchange):
+            return
+
+        self.verify_exchange(channel, exchange)
+        self.__verified_exchanges.setdefault(channel.connection, {})[
+            exchange
+        ] = time.monotonic()
+
+    def __is_verified(self, channel: BlockingChannel, exchange: str) -> bool:
+        """
+        Whether the channel's connection verified the exchange within ``exchange_verify_ttl``.
+        """
+        verified_at = self.__verified_exchanges.get(channel.connection, {}).get(
+            exchange
+        )
+
+        return verified_at is not None and (
+            self.exchange_verify_ttl is None
+            or time.monotonic() - verified_at < self.exchange_verify_ttl
+        )
+
+    def __verify_exchange_aside(self, channel: BlockingChannel, exchange: str) -> None:
+        """
+        Verify an exchange for the background threads, which share one channel between destinations.
+        Unless that is cached, it is verified on a channel of its own on the same connection,
+        so a missing exchange only closes that one.
+        :raises: ChannelClosedByBroker if the exchange doesn't exist
+        """
+        if self.__is_verified(channel, exchange):
+            return
+
+        verification_channel = channel.connection.channel()
+
+        try:
+            self.__verify_exchange_once(verification_channel, exchange)
+
+        finally:
+            if verification_channel.is_open:
+                verification_channel.close()
+
+    def __invalidate_verified_exchanges(self, error: Exception) -> None:
+        """
+        Forget every verified exchange once the broker reports an exchange missing,
+        e.g. because it was deleted after being verified.
+        :param error: Error raised while publishing.
+        """
+        if isinstance(error, ChannelClosedByBroker) and error.reply_code == 404:
+            self.__verified_exchanges.clear()
+
+    def verify(self, exchange: Optional[str] = None) -> None:
+        """
+        Verify the exchange exists right away instead of on the first publish,
+        e.g. to fail fast at startup. The result is cached like any other verification.
+        :param exchange: Exchange to verify. Defaults to the Publisher's ``exchange_name``.
+        :raises: ChannelClosedByBroker if the exchange doesn't exist
+        """
+        channel = self.__checkout_channel(exchange)
+        self.__checkin_channel(channel)
+
+    def __checkout_channel(self, exchange: Optional[str] = None) -> BlockingChannel:
+        """
+        Get a channel to publish on: a pooled one when ``pool_size`` is set,
+        otherwise the Publisher's long-lived channel. The exchange is verified
+        on it unless that is cached.
+        :param exchange: Exchange to publish to. Defaults to the Publisher's ``exchange_name``.
+        """
+        channel = self.pool.checkout() if self.pool else self.connect()
+
+        try:
+            self.__verify_exchange_once(channel, exchange)
+
+        except CONNECTION_ERRORS:
+            self.__checkin_channel(channel)
+            raise
 
-            return self.connect(retry_count=(retry_count + 1))
+        return channel
+
+    def __checkin_channel(self, channel: BlockingChannel) -> None:
+        """
+        Give a channel from ``__checkout_channel`` back once publishing on it is done.
+        """
+        if self.pool:
+            self.pool.checkin(channel)
+
+    @staticmethod
+    def __build_properties(
+        message_properties: Optional[dict], is_priority: bool
+    ) -> BasicProperties:
+        """
+        Build the ``BasicProperties`` of a message.
+        :param message_properties: Message properties. Default: ``{"delivery_mode": 2}``.
+        :param is_priority: For quorum queues, marks the message as high priority when True.
+        """
+        message_properties = message_properties or {}
+
+        # Handle priorities for quorum queues
+        if is_priority:
+            # For quorum queues, high priority is 5-255 (we use 5)
+            # Messages with priority 0-4 are normal priority (0 is default)
+            message_properties["priority"] = 5
+
+        return BasicProperties(
+            **{
+                "delivery_mode": PERSISTENT_DELIVERY_MODE,
+                **message_properties,
+            }
+        )
+
+    def __serializer_for(self, properties: BasicProperties) -> Serializer:
+        """
+        Pick the serializer of a message. A ``content_type`` given in its properties selects the serializer
+        registered for it, otherwise the Publisher's serializer is used and its content type is set.
+        :param properties: The message's properties.
+        """
+        if properties.content_type:
+            return negotiate_serializer(properties.content_type, self.serializer)
+
+        properties.content_type = self.serializer.content_type
+
+        return self.serializer
+
+    def __encode(
+        self, body: bytes, properties: BasicProperties
+    ) -> Tuple[bytes, BasicProperties]:
+        """
+        Compress a serialized body if it reaches ``compression_threshold``, then check it in
+        to the ``claim_check_store`` if it still reaches ``claim_check_threshold``.
+        :return: The body and properties to publish.
+        """
+        body, properties = compress(
+            body, properties, self.compression, self.compression_threshold
+        )
+
+        return check_in(
+            body, properties, self.claim_check_store, self.claim_check_threshold
+        )
 
     def publish(
         self,
@@ -192,7 +690,9 @@ class Publisher(object):
         is_priority: bool = False,
         attempt: int = 0,
         retry_count: int = 1,
-    ) -> None:
+        exchange: Optional[str] = None,
+        routing_key: Optional[str] = None,
+    ) -> Optional[Future]:
         """
         Publish data to RabbitMQ.
         :param data: Data to be published.
@@ -201,49 +701,344 @@ class Publisher(object):
         :param is_priority: For quorum queues, marks the message as high priority when True.
         :param attempt: Number of attempts made.
         :param retry_count: Amount retries the Publisher tried before sending an error message.
+        :param exchange: Exchange to publish this message to instead of the Publisher's ``exchange_name``.
+        :param routing_key: Routing key to publish this message with instead of the Publisher's.
+        :return: With ``confirm_window`` set, a ``Future`` resolved with ``CONFIRMED``, ``NACKED``
+            or ``UNROUTABLE`` once the broker confirms the message. Otherwise ``None``.
+        """
+        properties = self.__build_properties(message_properties, is_priority)
+        body, properties = self.__encode(
+            self.__serializer_for(properties).dumps(data), properties
+        )
+
+        return self._publish_body(
+            body,
+            properties,
+            # Fall back to queue_name if routing_key is empty
+            routing_key or self.routing_key or self.queue_name,
+            retry_count=retry_count,
+            exchange=exchange,
+        )
+
+    def profile(
+        self,
+        routing_key: Optional[str] = None,
+        message_properties: Optional[dict] = None,
+        is_priority: bool = False,
+        serializer: Union[str, Serializer, None] = None,
+        exchange: Optional[str] = None,
+    ) -> PublishProfile:
+        """
+        Resolve a destination and the properties shared by its messages once, for publishing
+        many messages without rebuilding them on every call.
+        :param routing_key: Routing key of every message. Defaults to the Publisher's routing key or queue name.
+        :param message_properties: Default message properties. Default: ``{"delivery_mode": 2}``.
+        :param is_priority: For quorum queues, marks every message as high priority when True.
+        :param serializer: Name of a registered serializer or a ``Serializer`` instance.
+            Defaults to the one selected by the ``content_type`` in ``message_properties`` or the Publisher's.
+        :param exchange: Exchange of every message. Defaults to the Publisher's ``exchange_name``.
+        :return: A :class:`~pyrmq.profile.PublishProfile` whose ``publish`` takes the data and per-message properties.
+        """
+        properties = self.__build_properties(
+            dict(message_properties or {}), is_priority
+        )
+
+        if serializer is None:
+            serializer = self.__serializer_for(properties)
+
+        else:
+            serializer = get_serializer(serializer)
+            properties.content_type = properties.content_type or serializer.content_type
+
+        return PublishProfile(
+            self,
+            routing_key or self.routing_key or self.queue_name,
+            properties,
+            serializer,
+            exchange=exchange or self.exchange_name,
+        )
+
+    def __raise_if_blocked(self) -> None:
+        """
+        Fail right away while the broker blocks publishing and ``blocked_policy`` is ``"raise"``.
+        :raises: ConnectionBlockedTimeout
+        """
+        if self.is_blocked and self.blocked_policy == RAISE:
+            raise ConnectionBlockedTimeout(
+                f"RabbitMQ has been blocking publishing for {self.blocked_duration:.3f} seconds."
+            )
+
+    def __acquire_rate(self, routing_key: str, count: int, size: int) -> None:
+        """
+        Wait for the rate limiter to let messages through, if there is one.
+        :raises: RateLimitExceeded if it does not within ``rate_limit_timeout``, or right away without ``rate_limit_block``
+        """
+        if self.rate_limiter and not self.rate_limiter.acquire(
+            routing_key,
+            count=count,
+            size=size,
+            block=self.rate_limit_block,
+            timeout=self.rate_limit_timeout,
+        ):
+            raise RateLimitExceeded(
+                f"Rate limit reached for {count} message(s) with routing key {routing_key!r}."
+            )
+
+    def _publish_body(
+        self,
+        body: bytes,
+        properties: BasicProperties,
+        routing_key: str,
+        retry_count: int = 1,
+        exchange: Optional[str] = None,
+    ) -> Optional[Future]:
+        """
+        Publish an already serialized message. Retries publish the same body and properties.
+        :param body: Serialized message.
+        :param properties: Message properties.
+        :param routing_key: Routing key to publish with.
+        :param retry_count: Amount retries the Publisher tried before sending an error message.
+        :param exchange: Exchange to publish to. Defaults to the Publisher's ``exchange_name``.
+        :return: With ``confirm_window`` set, a ``Future`` resolved once the broker confirms the message.
         """
-        channel = self.connect()
+        exchange = exchange or self.exchange_name
+        self.__raise_if_blocked()
+
+        if self.is_blocked and self.blocked_policy == SPOOL:
+            self.outbox.append(exchange, routing_key, body, properties)
+            return None
+
+        self.__acquire_rate(routing_key, 1, len(body))
+
+        if self.background is not None:
+            self.background.put(exchange, routing_key, body, properties)
+            return None
+
+        if self.window:
+            return self.window.publish(exchange, routing_key, body, properties)
+
+        if not self.outbox:
+            return self.__publish(body, properties, exchange, routing_key, retry_count)
+
+        if self.outbox.pending:
+            # Queue up behind the messages still waiting in the outbox to keep them in order.
+            self.outbox.append(exchange, routing_key, body, properties)
+            return None
 
         try:
-            message_properties = message_properties or {}
+            return self.__publish(body, properties, exchange, routing_key, retry_count)
 
-            # Handle priorities for quorum queues
-            if is_priority:
-                # For quorum queues, high priority is 5-255 (we use 5)
-                # Messages with priority 0-4 are normal priority (0 is default)
-                message_properties["priority"] = 5
+        except OUTAGE_ERRORS as error:
+            logger.warning(
+                f"RabbitMQ is unreachable, message written to the outbox {self.outbox_path}: {error!r}"
+            )
+            self.outbox.append(exchange, routing_key, body, properties)
 
-            basic_properties_kwargs = {
-                "delivery_mode": PERSISTENT_DELIVERY_MODE,
-                **message_properties,
-            }
+    def __publish(
+        self,
+        body: bytes,
+        properties: BasicProperties,
+        exchange: str,
+        routing_key: str,
+        retry_count: int = 1,
+    ) -> None:
+        """
+        Publish a message on a checked out channel and wait for its confirm, retrying on connection errors.
+        Errors from an unreachable broker are raised right away when there is an outbox to take the message.
+        """
+        deadline = self.retry_policy.deadline_at()
+
+        while True:
+            channel = self.__checkout_channel(exchange)
 
             try:
-                channel.basic_publish(
-                    exchange=self.exchange_name,
-                    routing_key=self.routing_key
-                    or self.queue_name,  # Fall back to queue_name if routing_key is empty
-                    body=json.dumps(data),
-                    properties=BasicProperties(**basic_properties_kwargs),
-                    mandatory=True,
-                )
-            except UnroutableError:
-                # When a message is published with mandatory=True but can't be routed
-                # This might happen if the queue doesn't exist or isn't bound to the exchange
-                logger.warning(
-                    f"Message could not be routed to any queue. Exchange: {self.exchange_name}, "
-                    f"Routing key: {self.routing_key or self.queue_name}"
+                try:
+                    channel.basic_publish(
+                        exchange=exchange,
+                        routing_key=routing_key,
+                        body=body,
+                        properties=properties,
+                        mandatory=True,
+                    )
+                    return None
+
+                except UnroutableError:
+                    # When a message is published with mandatory=True but can't be routed
+                    # This might happen if the queue doesn't exist or isn't bound to the exchange
+                    logger.warning(
+                        f"Message could not be routed to any queue. Exchange: {exchange}, "
+                        f"Routing key: {routing_key}"
+                    )
+                    # Re-raise to maintain backward compatibility
+                    raise
+
+                finally:
+                    self.__checkin_channel(channel)
+
+            except CONNECTION_ERRORS as error:
+                self.__invalidate_verified_exchanges(error)
+
+                if isinstance(error, ConnectionBlockedTimeout) or (
+                    self.outbox and isinstance(error, OUTAGE_ERRORS)
+                ):
+                    # Retrying would only wait out another blocked_connection_timeout.
+                    raise error
+
+                self.retry_policy.wait(
+                    error,
+                    retry_count,
+                    deadline,
+                    self.__send_reconnection_error_message,
                 )
-                # Re-raise to maintain backward compatibility
-                raise
+                retry_count += 1
 
-        except CONNECTION_ERRORS as error:
-            if not (retry_count % self.connection_attempts):
-                self.__send_reconnection_error_message(error, retry_count)
+    def publish_many(
+        self,
+        messages: Iterable[dict],
+        message_properties: Optional[dict] = None,
+        is_priority: bool = False,
+        exchange: Optional[str] = None,
+        routing_key: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Publish a batch of messages on one channel and wait for all of their publisher confirms
+        together instead of one confirm round trip per message. ``blocked_policy`` applies like in ``publish``.
+        :param messages: Data of the messages to be published.
+        :param message_properties: Message properties shared by every message. Default: ``{"delivery_mode": 2}``.
+        :param is_priority: For quorum queues, marks every message as high priority when True.
+        :param exchange: Exchange to publish the batch to instead of the Publisher's ``exchange_name``.
+        :param routing_key: Routing key to publish the batch with instead of the Publisher's.
+        :return: The result of each message in the order they were given:
+            ``CONFIRMED``, ``NACKED`` or ``UNROUTABLE``. Only the latter two need to be retried.
+            ``SPOOLED`` for every message when they were written to the outbox because the broker blocks publishing.
+        :raises: ConnectionBlockedTimeout while the broker blocks publishing and ``blocked_policy`` is ``"raise"``
+        """
+        properties = self.__build_properties(message_properties, is_priority)
+        serializer = self.__serializer_for(properties)
+        encoded = [
+            self.__encode(serializer.dumps(data), properties) for data in messages
+        ]
+        results = [None] * len(encoded)
+        exchange = exchange or self.exchange_name
+        routing_key = routing_key or self.routing_key or self.queue_name
+        self.__raise_if_blocked()
 
-                if not self.infinite_retry:
+        if self.is_blocked and self.blocked_policy == SPOOL:
+            for body, encoded_properties in encoded:
+                self.outbox.append(exchange, routing_key, body, encoded_properties)
+
+            return [SPOOLED] * len(encoded)
+
+        if encoded:
+            self.__acquire_rate(
+                routing_key, len(encoded), sum(len(body) for body, _ in encoded)
+            )
+            self.__publish_batch(encoded, results, exchange, routing_key)
+
+        unroutable_count = results.count(UNROUTABLE)
+
+        if unroutable_count:
+            logger.warning(
+                f"{unroutable_count} message(s) could not be routed to any queue. "
+                f"Exchange: {exchange}, Routing key: {routing_key}"
+            )
+
+        return results
+
+    def __publish_batch(
+        self,
+        encoded: List[Tuple[bytes, BasicProperties]],
+        results: List[Optional[str]],
+        exchange: str,
+        routing_key: str,
+        retry_count: int = 1,
+    ) -> None:
+        """
+        Publish every message of a batch that has no result yet and fill in the results as
+        their confirms arrive. Retries only those messages if the connection fails midway.
+        :param encoded: Body and properties of each message of the batch.
+        :param results: Result of each message, ``None`` while it is not confirmed yet.
+        :param exchange: Exchange to publish to.
+        :param routing_key: Routing key to publish with.
+        :param retry_count: Amount retries the Publisher tried before sending an error message.
+        """
+        deadline = self.retry_policy.deadline_at()
+
+        while True:
+            channel = self.__checkout_channel(exchange)
+
+            try:
+                try:
+                    self.__confirm_batch(
+                        channel.connection, encoded, results, exchange, routing_key
+                    )
+                    return
+
+                finally:
+                    self.__checkin_channel(channel)
+
+            except CONNECTION_ERRORS as error:
+                self.__invalidate_verified_exchanges(error)
+
+                if isinstance(error, ConnectionBlockedTimeout):
                     raise error
 
-            time.sleep(self.retry_delay)
+                self.retry_policy.wait(
+                    error,
+                    retry_count,
+                    deadline,
+                    self.__send_reconnection_error_message,
+                )
+                retry_count += 1
+
+    def __confirm_batch(
+        self,
+        connection: BlockingConnection,
+        encoded: List[Tuple[bytes, BasicProperties]],
+        results: List[Optional[str]],
+        exchange: str,
+        routing_key: str,
+    ) -> None:
+        """
+        Publish the unresolved messages of a batch on a new channel of the given connection
+        and block until the broker confirmed all of them.
+        """
+
+        def on_resolve(index: int, result: str) -> None:
+            results[index] = result
+
+            if not tracker.pending:
+                # Wake up process_data_events() as soon as the last confirm is in.
+                connection.add_callback_threadsafe(lambda: None)
+
+        tracker = ConfirmTracker(on_resolve=on_resolve)
+        channel = connection.channel()
+
+        try:
+            tracker.attach(channel)
+
+            for index, (body, properties) in enumerate(encoded):
+                if results[index] is not None:
+                    continue
+
+                tracker.track(index, routing_key, body)
+                channel.basic_publish(
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    body=body,
+                    properties=properties,
+                    mandatory=True,
+                )
+
+            while tracker.pending:
+                if not channel.is_open:
+                    raise ChannelWrongStateError(
+                        "Channel closed before every message was confirmed."
+                    )
+
+                connection.process_data_events(time_limit=1)
 
-            self.publish(data, attempt=attempt, retry_count=(retry_count + 1))
+        finally:
+            if channel.is_open:
+                with suppress(*CONNECTION_ERRORS):
+                    channel.close()
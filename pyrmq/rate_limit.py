@@ -0,0 +1,181 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ RateLimiter class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised by a non-blocking publish that the rate limiter does not let through right now.
+    """
+
+
+class TokenBucket(object):
+    """
+    Tokens refill at ``rate`` per second up to ``capacity``. Taking more tokens than are left
+    is allowed once the bucket holds at least ``capacity`` of them, so amounts larger than the
+    capacity get through after a full refill and are paid back before anything else.
+    Not thread-safe on its own; :class:`RateLimiter` serializes access to its buckets.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens, i.e. the burst size. Default: ``rate``
+        """
+        if rate <= 0:
+            raise ValueError(f"A token bucket needs a positive rate, got {rate!r}.")
+
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """
+        Add the tokens that accumulated since the last refill.
+        """
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until ``amount`` tokens can be taken. Zero if they can be taken right away.
+        """
+        needed = min(amount, self.capacity) - self.tokens
+
+        # Refills after sleeping exactly the wait time may fall short by a rounding error.
+        return needed / self.rate if needed > 1e-9 else 0.0
+
+
+class RateLimiter(object):
+    """
+    Limits how many messages and bytes are published per second with token buckets,
+    optionally with a separate message rate per routing key.
+
+    One limiter can be shared by every thread and every :class:`~pyrmq.Publisher` of a process.
+    A message is let through only once every bucket it counts against has room for it.
+    """
+
+    def __init__(
+        self,
+        messages_per_second: Optional[float] = None,
+        bytes_per_second: Optional[float] = None,
+        message_burst: Optional[float] = None,
+        byte_burst: Optional[float] = None,
+        routing_key_limits: Optional[Dict[str, float]] = None,
+    ):
+        """
+        :param messages_per_second: Maximum sustained messages per second. Unlimited when ``None``. Default: ``None``
+        :param bytes_per_second: Maximum sustained body bytes per second. Unlimited when ``None``. Default: ``None``
+        :param message_burst: Messages that may be published at once after an idle period.
+            Default: ``messages_per_second``
+        :param byte_burst: Body bytes that may be published at once after an idle period. Default: ``bytes_per_second``
+        :param routing_key_limits: Maximum messages per second of single routing keys, on top of the overall limits,
+            e.g. ``{"backfill": 500}``. Default: ``None``
+        """
+        self.messages = (
+            TokenBucket(messages_per_second, message_burst)
+            if messages_per_second
+            else None
+        )
+        self.bytes = (
+            TokenBucket(bytes_per_second, byte_burst) if bytes_per_second else None
+        )
+        self.routing_keys = {
+            routing_key: TokenBucket(rate)
+            for routing_key, rate in (routing_key_limits or {}).items()
+        }
+
+        self.__lock = Lock()
+
+    def __buckets(
+        self, routing_key: Optional[str], count: int, size: int
+    ) -> List[Tuple[TokenBucket, float]]:
+        """
+        The buckets a publish counts against, with the tokens it takes from each.
+        """
+        buckets = []
+
+        if self.messages:
+            buckets.append((self.messages, count))
+
+        if self.bytes:
+            buckets.append((self.bytes, size))
+
+        if routing_key in self.routing_keys:
+            buckets.append((self.routing_keys[routing_key], count))
+
+        return buckets
+
+    def try_acquire(
+        self, routing_key: Optional[str] = None, count: int = 1, size: int = 0
+    ) -> float:
+        """
+        Take the tokens for a publish if every bucket has room for it.
+        :param routing_key: Routing key the messages are published with.
+        :param count: Number of messages.
+        :param size: Total body size of the messages in bytes.
+        :return: ``0`` once the tokens are taken, otherwise the seconds to wait before trying again.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            buckets = self.__buckets(routing_key, count, size)
+
+            for bucket, _ in buckets:
+                bucket.refill(now)
+
+            wait_time = max(
+                (bucket.wait_time(amount) for bucket, amount in buckets), default=0.0
+            )
+
+            if wait_time:
+                return wait_time
+
+            for bucket, amount in buckets:
+                bucket.tokens -= amount
+
+            return 0.0
+
+    def acquire(
+        self,
+        routing_key: Optional[str] = None,
+        count: int = 1,
+        size: int = 0,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Wait until a publish may go through and take its tokens.
+        :param routing_key: Routing key the messages are published with.
+        :param count: Number of messages.
+        :param size: Total body size of the messages in bytes.
+        :param block: Whether to wait for the tokens. Default: ``True``
+        :param timeout: Maximum seconds to wait. Waits as long as needed when ``None``. Default: ``None``
+        :return: Whether the tokens were taken.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait_time = self.try_acquire(routing_key, count, size)
+
+            if not wait_time:
+                return True
+
+            if not block or (
+                deadline is not None and time.monotonic() + wait_time > deadline
+            ):
+                return False
+
+            time.sleep(wait_time)
@@ -0,0 +1,112 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ RetryPolicy class
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import math
+import random
+import time
+from typing import Callable, Optional
+
+
+class RetryPolicy(object):
+    """
+    Decides whether and how long to wait before retrying a failed attempt: exponential backoff,
+    optional full jitter and an overall deadline per call.
+
+    The delay before retry ``n`` is ``delay * backoff ** (n - 1)``, capped at ``max_delay``. With ``jitter``,
+    a random delay between zero and that value is slept instead, so clients that failed together do not
+    retry together. Every ``attempts`` failures, ``on_exhausted`` is called and the error is raised
+    unless ``infinite`` is set.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        delay: float = 5,
+        backoff: float = 1,
+        max_delay: Optional[float] = None,
+        jitter: bool = False,
+        deadline: Optional[float] = None,
+        infinite: bool = False,
+    ):
+        """
+        :param attempts: Number of attempts before giving up or, when ``infinite``, before reporting the error again. Default: ``3``
+        :param delay: Seconds to wait before the first retry. Default: ``5``
+        :param backoff: Factor the delay grows by after every retry. Default: ``1``
+        :param max_delay: Upper bound of the delay in seconds. Unbounded when ``None``. Default: ``None``
+        :param jitter: Sleep a random delay between zero and the computed one. Default: ``False``
+        :param deadline: Seconds after the first attempt past which no retry starts, even when ``infinite``.
+            Unbounded when ``None``. Default: ``None``
+        :param infinite: Keep retrying after ``attempts`` failures. Default: ``False``
+        """
+        self.attempts = attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.infinite = infinite
+
+    def delay_for(self, attempt: int) -> float:
+        """
+        Seconds to wait after the given failed attempt.
+        :param attempt: Number of the failed attempt, starting at ``1``.
+        """
+        try:
+            delay = self.delay * self.backoff ** (attempt - 1)
+
+        except OverflowError:
+            # Long outages under ``infinite`` grow the delay past what a float holds.
+            delay = math.inf
+
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        return delay
+
+    def deadline_at(self) -> Optional[float]:
+        """
+        The ``time.monotonic()`` value past which a call that starts now may not retry, if it has a deadline.
+        """
+        if self.deadline is None:
+            return None
+
+        return time.monotonic() + self.deadline
+
+    def wait(
+        self,
+        error: Exception,
+        attempt: int,
+        deadline: Optional[float] = None,
+        on_exhausted: Optional[Callable[[Exception, int], None]] = None,
+    ) -> None:
+        """
+        Sleep before retrying a failed attempt, or raise its error if the policy gives up.
+        :param error: Error of the failed attempt.
+        :param attempt: Number of the failed attempt, starting at ``1``.
+        :param deadline: Result of ``deadline_at`` when the call started.
+        :param on_exhausted: Called with the error and attempt number every ``attempts`` failures.
+        :raises: The error once the attempts are exhausted or the deadline leaves no room for another retry.
+        """
+        if not (attempt % self.attempts):
+            if on_exhausted:
+                on_exhausted(error, attempt)
+
+            if not self.infinite:
+                raise error
+
+        delay = self.delay_for(attempt)
+
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            raise error
+
+        time.sleep(delay)
@@ -0,0 +1,197 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+    This module implements PyRMQ serializers and their registry
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import json
+from typing import Any, Dict, Optional, Type, Union
+
+
+class Serializer(object):
+    """
+    Turns message data into a body and back. Subclasses set the ``content_type``
+    that is published with their messages.
+    """
+
+    content_type = None
+
+    def dumps(self, data: Any) -> bytes:
+        """
+        Serialize data into a message body.
+        :param data: Data to be published.
+        """
+        raise NotImplementedError
+
+    def loads(self, body: bytes) -> Any:
+        """
+        Deserialize a message body into data.
+        :param body: Body of a consumed message.
+        """
+        raise NotImplementedError
+
+
+class JSONSerializer(Serializer):
+    """
+    Serializes with the standard library's ``json``. This is the default.
+    """
+
+    content_type = "application/json"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data).encode()
+
+    def loads(self, body: Union[bytes, str]) -> Any:
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+
+        return json.loads(body)
+
+
+class OrjsonSerializer(Serializer):
+    """
+    Serializes JSON with ``orjson``, a faster drop-in for ``json``. Requires ``pip install pyrmq[orjson]``.
+    """
+
+    content_type = "application/json"
+
+    def __init__(self):
+        try:
+            import orjson
+
+        except ImportError as error:
+            raise ImportError(
+                "The orjson serializer requires orjson. Install it with `pip install pyrmq[orjson]`."
+            ) from error
+
+        self.orjson = orjson
+
+    def dumps(self, data: Any) -> bytes:
+        return self.orjson.dumps(data)
+
+    def loads(self, body: Union[bytes, str]) -> Any:
+        return self.orjson.loads(body)
+
+
+class MsgpackSerializer(Serializer):
+    """
+    Serializes with ``msgpack``, a compact binary format. Requires ``pip install pyrmq[msgpack]``.
+    """
+
+    content_type = "application/msgpack"
+
+    def __init__(self):
+        try:
+            import msgpack
+
+        except ImportError as error:
+            raise ImportError(
+                "The msgpack serializer requires msgpack. Install it with `pip install pyrmq[msgpack]`."
+            ) from error
+
+        self.msgpack = msgpack
+
+    def dumps(self, data: Any) -> bytes:
+        return self.msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, body: bytes) -> Any:
+        return self.msgpack.unpackb(body, raw=False)
+
+
+class RawSerializer(Serializer):
+    """
+    Passes bytes through untouched. Strings are encoded as UTF-8.
+    """
+
+    content_type = "application/octet-stream"
+
+    def dumps(self, data: Union[bytes, bytearray, str]) -> bytes:
+        if isinstance(data, str):
+            return data.encode()
+
+        if isinstance(data, (bytes, bytearray)):
+            return bytes(data)
+
+        raise TypeError(
+            f"The raw serializer only publishes bytes or str, not {type(data).__name__}."
+        )
+
+    def loads(self, body: bytes) -> bytes:
+        return body
+
+
+SERIALIZERS: Dict[str, Type[Serializer]] = {
+    "json": JSONSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+    "raw": RawSerializer,
+}
+CONTENT_TYPES: Dict[str, str] = {
+    JSONSerializer.content_type: "json",
+    MsgpackSerializer.content_type: "msgpack",
+    RawSerializer.content_type: "raw",
+}
+
+_instances: Dict[str, Serializer] = {}
+
+
+def register_serializer(
+    name: str, serializer: Type[Serializer], default_for_content_type: bool = True
+) -> None:
+    """
+    Make a serializer available by name to Publishers and Consumers.
+    :param name: Name to pass as the ``serializer`` keyword.
+    :param serializer: ``Serializer`` subclass.
+    :param default_for_content_type: Also use it to decode consumed messages of its ``content_type``. Default: ``True``
+    """
+    SERIALIZERS[name] = serializer
+    _instances.pop(name, None)
+
+    if default_for_content_type and serializer.content_type:
+        CONTENT_TYPES[serializer.content_type] = name
+
+
+def get_serializer(serializer: Union[str, Serializer]) -> Serializer:
+    """
+    Get a serializer by its registered name.
+    :param serializer: Registered name, or a ``Serializer`` instance which is returned as is.
+    :raises: ValueError if no serializer is registered under the name
+    """
+    if isinstance(serializer, Serializer):
+        return serializer
+
+    instance = _instances.get(serializer)
+
+    if instance is None:
+        if serializer not in SERIALIZERS:
+            raise ValueError(
+                f"Unknown serializer {serializer!r}. Choose from {sorted(SERIALIZERS)}."
+            )
+
+        instance = _instances[serializer] = SERIALIZERS[serializer]()
+
+    return instance
+
+
+def negotiate_serializer(
+    content_type: Optional[str], default: Serializer
+) -> Serializer:
+    """
+    Pick the serializer for a message's content type.
+    Messages without a content type, or with one no serializer is registered for, use ``default``.
+    :param content_type: The message's ``content_type`` property.
+    :param default: Serializer to fall back to, also preferred whenever it handles the content type.
+    """
+    if not content_type or content_type == default.content_type:
+        return default
+
+    name = CONTENT_TYPES.get(content_type)
+
+    if name is None:
+        return default
+
+    return get_serializer(name)
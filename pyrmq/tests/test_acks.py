@@ -0,0 +1,79 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import Mock, call
+
+from pyrmq.acks import AckCoalescer
+
+
+def fire_timer(channel):
+    channel.connection.call_later.call_args.args[1]()
+
+
+def should_ack_up_to_the_lowest_contiguous_settled_message():
+    channel = Mock()
+    coalescer = AckCoalescer(channel, max_pending=3, timeout=0.1)
+
+    for delivery_tag in (2, 3, 4):
+        coalescer.ack(delivery_tag)
+
+    channel.basic_ack.assert_not_called()
+    assert coalescer.pending == 3
+
+    coalescer.ack(1)
+
+    channel.basic_ack.assert_called_once_with(delivery_tag=4, multiple=True)
+    assert (coalescer.pending, coalescer.settled_up_to) == (0, 4)
+
+
+def should_nack_right_away_and_leave_nacked_messages_out_of_cumulative_acks():
+    channel = Mock()
+    coalescer = AckCoalescer(channel, max_pending=10, timeout=0.1)
+
+    coalescer.ack(1)
+    coalescer.nack(2)
+    coalescer.nack(3)
+
+    channel.basic_nack.assert_has_calls([call(delivery_tag=2), call(delivery_tag=3)])
+
+    fire_timer(channel)
+
+    channel.basic_ack.assert_called_once_with(delivery_tag=1, multiple=True)
+    assert coalescer.settled_up_to == 3
+
+
+def should_flush_on_timeout_and_wait_again_for_messages_still_being_consumed():
+    channel = Mock()
+    coalescer = AckCoalescer(channel, max_pending=10, timeout=0.1)
+
+    coalescer.ack(1)
+    coalescer.ack(3)
+    channel.connection.call_later.assert_called_once()
+
+    fire_timer(channel)
+
+    channel.basic_ack.assert_called_once_with(delivery_tag=1, multiple=True)
+    assert channel.connection.call_later.call_count == 2
+
+    coalescer.ack(2)
+    fire_timer(channel)
+
+    channel.basic_ack.assert_called_with(delivery_tag=3, multiple=True)
+    assert coalescer.pending == 0
+
+
+def should_not_flush_on_timeout_once_the_channel_closed():
+    channel = Mock()
+    coalescer = AckCoalescer(channel, max_pending=10, timeout=0.1)
+
+    coalescer.ack(1)
+    channel.is_open = False
+    fire_timer(channel)
+
+    channel.basic_ack.assert_not_called()
@@ -0,0 +1,74 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from pyrmq.adaptive import AdaptivePrefetch
+
+
+@pytest.fixture
+def clock():
+    """
+    A clock that only moves when a test moves it.
+    """
+    now = {"now": 0.0}
+
+    with patch("time.monotonic", side_effect=lambda: now["now"]):
+        yield now
+
+
+def consume(controller, clock, delivered_at, service_time):
+    started_at = controller.started(delivered_at)
+    clock["now"] += service_time
+    controller.finished(started_at)
+
+    return controller.settled()
+
+
+def should_reject_invalid_limits_and_clamp_the_initial_prefetch():
+    with pytest.raises(ValueError):
+        AdaptivePrefetch(1, min_prefetch=5, max_prefetch=2)
+
+    assert AdaptivePrefetch(500, max_prefetch=50).prefetch == 50
+
+
+def should_raise_the_prefetch_while_callbacks_wait_for_round_trips(clock):
+    controller = AdaptivePrefetch(1, max_prefetch=2, interval=1)
+
+    for _ in range(2):
+        assert controller.delivered() is None
+        consume(controller, clock, clock["now"], 0.1)
+        clock["now"] += 0.5  # The round trip until the next delivery
+
+    assert controller.delivered() == 2
+    assert controller.round_trip == pytest.approx(0.5)
+    assert controller.service_time == pytest.approx(0.1)
+
+    consume(controller, clock, clock["now"], 0.1)
+
+    for _ in range(3):
+        clock["now"] += 0.5
+        assert controller.delivered() is None
+        assert consume(controller, clock, clock["now"], 0.1) is None
+
+    assert controller.prefetch == 2
+
+
+def should_cut_the_prefetch_once_messages_wait_longer_than_callbacks_take(clock):
+    controller = AdaptivePrefetch(8, interval=1)
+
+    for _ in range(8):
+        controller.delivered()
+
+    results = [consume(controller, clock, 0, 0.5) for _ in range(8)]
+
+    assert results[:4] == [None, None, None, 4]
+    assert controller.wait_time > controller.service_time
@@ -0,0 +1,138 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from pika import BasicProperties
+from pika.exceptions import AMQPConnectionError
+
+from pyrmq import AsyncConsumer, Publisher
+from pyrmq.consumer import CONNECT_ERROR, CONSUME_ERROR
+from pyrmq.tests.conftest import TEST_EXCHANGE_NAME, TEST_QUEUE_NAME, TEST_ROUTING_KEY
+
+PROPERTIES = BasicProperties(content_type="application/json")
+
+
+def create_consumer(callback, **kwargs):
+    return AsyncConsumer(
+        exchange_name=TEST_EXCHANGE_NAME,
+        queue_name=TEST_QUEUE_NAME,
+        routing_key=TEST_ROUTING_KEY,
+        callback=callback,
+        **kwargs,
+    )
+
+
+def should_consume_concurrently_over_one_connection(publisher_session: Publisher):
+    for i in range(20):
+        publisher_session.publish({"test": i})
+
+    consumed = set()
+
+    async def callback(data, **kwargs):
+        await asyncio.sleep(0.05)
+        consumed.add(data["test"])
+
+    async def consume():
+        consumer = create_consumer(callback, max_concurrency=10)
+        await consumer.start()
+
+        for _ in range(100):
+            if len(consumed) == 20:
+                break
+
+            await asyncio.sleep(0.05)
+
+        await consumer.close()
+
+    asyncio.run(consume())
+
+    assert consumed == set(range(20))
+
+
+def should_run_at_most_max_concurrency_callbacks_at_once():
+    running = {"now": 0, "most": 0}
+
+    async def callback(data, **kwargs):
+        running["now"] += 1
+        running["most"] = max(running["most"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+
+    consumer = create_consumer(callback, max_concurrency=2)
+    channel = Mock()
+
+    async def consume():
+        await asyncio.gather(
+            *(
+                consumer._consume_message(
+                    channel, Mock(delivery_tag=delivery_tag), PROPERTIES, b"{}"
+                )
+                for delivery_tag in range(5)
+            )
+        )
+
+    asyncio.run(consume())
+
+    assert consumer.prefetch_count == 2
+    assert running["most"] == 2
+    assert channel.basic_ack.call_count == 5
+
+
+def should_publish_failed_messages_to_the_retry_queue_asynchronously():
+    error_callback = Mock()
+
+    async def callback(data, **kwargs):
+        raise ValueError(data)
+
+    consumer = create_consumer(
+        callback, is_dlk_retry_enabled=True, error_callback=error_callback
+    )
+    consumer.retry_publisher.publish = AsyncMock()
+    channel = Mock()
+
+    asyncio.run(consumer._consume_message(channel, Mock(), PROPERTIES, b'{"a": 1}'))
+
+    data = consumer.retry_publisher.publish.call_args.args[0]
+    headers = consumer.retry_publisher.publish.call_args.kwargs["message_properties"][
+        "headers"
+    ]
+    assert data == {"a": 1}
+    assert headers["x-attempt"] == 1
+    assert error_callback.call_args.kwargs["error_type"] == CONSUME_ERROR
+    channel.basic_ack.assert_called_once()
+
+
+def should_nack_messages_that_cannot_be_decoded():
+    error_callback = Mock()
+    consumer = create_consumer(AsyncMock(), error_callback=error_callback)
+    channel = Mock()
+
+    asyncio.run(consumer._consume_message(channel, Mock(), PROPERTIES, b"not json"))
+
+    consumer.message_received_callback.assert_not_called()
+    channel.basic_nack.assert_called_once()
+    assert error_callback.call_args.kwargs["error_type"] == CONSUME_ERROR
+
+
+def should_call_error_callback_without_blocking_when_connecting_fails():
+    error_callback = Mock()
+    consumer = create_consumer(AsyncMock(), error_callback=error_callback)
+
+    with patch(
+        "pyrmq.async_consumer.AsyncioConnection", side_effect=AMQPConnectionError
+    ):
+        with patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            with pytest.raises(AMQPConnectionError):
+                asyncio.run(consumer.start())
+
+    assert error_callback.call_args.kwargs["error_type"] == CONNECT_ERROR
+    assert sleep.call_count == consumer.connection_attempts - 1
@@ -0,0 +1,140 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from pika.exceptions import AMQPConnectionError, ChannelClosedByBroker, UnroutableError
+
+from pyrmq import AsyncPublisher, Consumer, Publisher
+from pyrmq.publisher import CONNECT_ERROR
+from pyrmq.tests.test_consumer import assert_consumed_message
+
+
+def should_publish_concurrently_over_one_connection(publisher_session: Publisher):
+    publisher = AsyncPublisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+    )
+
+    async def publish():
+        await asyncio.gather(*(publisher.publish({"test": i}) for i in range(50)))
+        connection = publisher.connection
+        await publisher.close()
+        return connection
+
+    connection = asyncio.run(publish())
+
+    assert not connection.is_open
+
+    response = {"count": 0}
+
+    def callback(data, **kwargs):
+        response["count"] += 1
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+        prefetch_count=50,
+    )
+    consumer.start()
+    assert_consumed_message(response, {"count": 50})
+    consumer.close()
+
+
+def should_throw_error_on_non_existing_exchange_asynchronously():
+    publisher = AsyncPublisher(
+        exchange_name="non_existing_exchange",
+        routing_key="non_existing_routing_key",
+        retry_delay=0,
+    )
+
+    with pytest.raises(ChannelClosedByBroker):
+        asyncio.run(publisher.publish({}))
+
+
+def should_raise_unroutable_error_asynchronously():
+    exchange_name = "isolated_exchange"
+    consumer = Consumer(
+        exchange_name=exchange_name,
+        queue_name="temp_queue",
+        routing_key="temp_key",
+        callback=lambda x: x,
+    )
+    consumer.connect()
+    consumer.channel.exchange_declare(
+        exchange=exchange_name, durable=True, exchange_type="direct"
+    )
+
+    publisher = AsyncPublisher(
+        exchange_name=exchange_name,
+        routing_key="non_existent_queue",
+        retry_delay=0,
+    )
+
+    with pytest.raises(UnroutableError):
+        asyncio.run(publisher.publish({"test": "unroutable"}))
+
+    consumer.channel.exchange_delete(exchange_name)
+
+
+def should_call_error_callback_without_blocking_when_connecting_fails():
+    errors = []
+
+    def error_callback(*args, **kwargs):
+        errors.append(kwargs["error_type"])
+
+    publisher = AsyncPublisher(
+        exchange_name="incorrect_exchange_name",
+        error_callback=error_callback,
+    )
+
+    with patch(
+        "pyrmq.async_publisher.AsyncioConnection", side_effect=AMQPConnectionError
+    ):
+        with patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            with pytest.raises(AMQPConnectionError):
+                asyncio.run(publisher.publish({}))
+
+    assert errors == [CONNECT_ERROR]
+    assert sleep.call_count == publisher.connection_attempts - 1
+
+
+def should_fail_over_to_the_next_node_asynchronously():
+    publisher = AsyncPublisher(exchange_name="exchange", hosts=["first", "second"])
+    hosts = []
+
+    def create_connection(
+        parameters, on_open_callback, on_open_error_callback, **kwargs
+    ):
+        hosts.append((parameters.host, parameters.connection_attempts))
+        connection = Mock(is_open=False)
+        connection.channel.side_effect = RuntimeError("opened")
+        loop = asyncio.get_running_loop()
+
+        if parameters.host == "first":
+            loop.call_soon(on_open_error_callback, connection, AMQPConnectionError())
+
+        else:
+            loop.call_soon(on_open_callback, connection)
+
+        return connection
+
+    with patch(
+        "pyrmq.async_publisher.AsyncioConnection", side_effect=create_connection
+    ):
+        with pytest.raises(RuntimeError):
+            asyncio.run(publisher.connect())
+
+    assert hosts == [("first", 1), ("second", 1)]
+    assert publisher.cluster.health[("first", 5672)].failures == 1
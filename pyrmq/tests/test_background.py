@@ -0,0 +1,201 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from queue import Full
+from threading import Event
+from unittest.mock import Mock
+
+import pytest
+from pika import BasicProperties
+from pika.exceptions import AMQPConnectionError, ChannelClosedByBroker
+
+from pyrmq import Consumer, Publisher
+from pyrmq.background import DROP_OLDEST, RAISE, PublishQueue
+from pyrmq.tests.test_consumer import assert_consumed_message
+from pyrmq.tests.test_outbox import mock_channel
+
+
+def should_publish_queued_messages_in_batches():
+    channel = mock_channel()
+    queue = PublishQueue(Mock(return_value=channel), batch_size=3, linger=0.1)
+
+    for index in range(7):
+        queue.put("exchange", "routing_key", str(index).encode(), BasicProperties())
+
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert [call.kwargs["body"] for call in channel.basic_publish.call_args_list] == [
+        str(index).encode() for index in range(7)
+    ]
+    # One confirm round trip per batch instead of one per message.
+    assert channel.connection.process_data_events.call_count == 3
+
+
+def should_publish_a_batch_again_when_the_connection_fails():
+    channel = mock_channel()
+    open_channel = Mock(side_effect=[AMQPConnectionError, channel])
+    queue = PublishQueue(open_channel, linger=0, retry_delay=0)
+
+    queue.put("exchange", "routing_key", b"first", BasicProperties())
+
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert open_channel.call_count == 2
+    assert channel.basic_publish.call_count == 1
+
+
+def should_drop_only_the_messages_the_broker_rejects():
+    published = []
+
+    def open_channel():
+        channel = mock_channel()
+        publish = channel.basic_publish.side_effect
+
+        def basic_publish(exchange, routing_key, body, properties, mandatory):
+            if exchange == "missing":
+                raise ChannelClosedByBroker(404, "NOT_FOUND")
+
+            publish(exchange, routing_key, body, properties, mandatory)
+            published.append(body)
+
+        channel.basic_publish.side_effect = basic_publish
+
+        return channel
+
+    queue = PublishQueue(open_channel, batch_size=3, linger=0.1, retry_delay=0)
+
+    queue.put("exchange", "routing_key", b"first", BasicProperties())
+    queue.put("missing", "routing_key", b"second", BasicProperties())
+    queue.put("exchange", "routing_key", b"third", BasicProperties())
+
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert published == [b"first", b"first", b"third"]
+    assert queue.failed == 1
+
+
+def should_drop_messages_to_missing_exchanges_without_publishing_them():
+    channel = mock_channel()
+
+    def verify_exchange(channel, exchange):
+        if exchange == "missing":
+            raise ChannelClosedByBroker(404, "NOT_FOUND")
+
+    queue = PublishQueue(
+        Mock(return_value=channel),
+        batch_size=3,
+        linger=0.1,
+        verify_exchange=verify_exchange,
+    )
+
+    queue.put("exchange", "routing_key", b"first", BasicProperties())
+    queue.put("missing", "routing_key", b"second", BasicProperties())
+    queue.put("exchange", "routing_key", b"third", BasicProperties())
+
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert [call.kwargs["body"] for call in channel.basic_publish.call_args_list] == [
+        b"first",
+        b"third",
+    ]
+    assert queue.failed == 1
+
+
+def should_give_up_when_closing_times_out_while_the_broker_is_unreachable():
+    queue = PublishQueue(
+        Mock(side_effect=AMQPConnectionError), linger=0, retry_delay=60
+    )
+
+    queue.put("exchange", "routing_key", b"first", BasicProperties())
+    queue.put("exchange", "routing_key", b"second", BasicProperties())
+    queue.close(timeout=0.1)
+
+    assert queue.flush(timeout=5)
+    assert queue.failed == 2
+
+
+def should_drop_the_oldest_message_when_full():
+    opened = Event()
+    queue = PublishQueue(
+        Mock(side_effect=lambda: opened.wait() and mock_channel()),
+        max_size=2,
+        batch_size=1,
+        linger=0,
+        full_policy=DROP_OLDEST,
+    )
+
+    queue.put("exchange", "routing_key", b"first", BasicProperties())
+    queue.put("exchange", "routing_key", b"second", BasicProperties())
+    queue.put("exchange", "routing_key", b"third", BasicProperties())
+    queue.put("exchange", "routing_key", b"fourth", BasicProperties())
+
+    assert len(queue) == 2
+    assert queue.dropped >= 1
+    opened.set()
+    queue.close()
+
+
+def should_raise_when_full():
+    opened = Event()
+    queue = PublishQueue(
+        Mock(side_effect=lambda: opened.wait() and mock_channel()),
+        max_size=1,
+        batch_size=1,
+        linger=0,
+        full_policy=RAISE,
+    )
+
+    with pytest.raises(Full):
+        for _ in range(3):
+            queue.put("exchange", "routing_key", b"message", BasicProperties())
+
+    opened.set()
+    queue.close()
+
+
+def should_reject_unknown_full_policies():
+    with pytest.raises(ValueError):
+        PublishQueue(Mock(), full_policy="ignore")
+
+
+def should_publish_in_the_background(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        background_queue_size=100,
+    )
+
+    for index in range(10):
+        assert publisher.publish({"test": index}) is None
+
+    assert publisher.flush(timeout=10)
+    # Published by the background thread on its own connection.
+    assert publisher.connection is None
+    publisher.close()
+
+    response = {"messages": []}
+
+    def callback(data, **kwargs):
+        response["messages"].append(data["test"])
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+        prefetch_count=10,
+    )
+    consumer.start()
+    assert_consumed_message(response, {"messages": list(range(10))})
+    consumer.close()
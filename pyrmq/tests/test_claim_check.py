@@ -0,0 +1,200 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import Mock
+
+import pytest
+from pika import BasicProperties
+
+from pyrmq import Consumer, Publisher
+from pyrmq.claim_check import (
+    CLAIM_CHECK_HEADER,
+    BlobStore,
+    ClaimCheck,
+    FileSystemBlobStore,
+    check_in,
+    claim_check_key,
+)
+from pyrmq.consumer import CONSUME_ERROR
+from pyrmq.tests.test_consumer import assert_consumed_message
+
+
+def should_store_bodies_on_the_file_system(tmp_path):
+    store = FileSystemBlobStore(str(tmp_path / "blobs"))
+
+    key = store.put(b"body")
+
+    assert store.get(key) == b"body"
+
+    store.delete(key)
+    store.delete(key)
+
+    with pytest.raises(FileNotFoundError):
+        store.get(key)
+
+    with pytest.raises(ValueError):
+        store.get("../outside")
+
+
+def should_not_implement_the_base_blob_store():
+    with pytest.raises(NotImplementedError):
+        BlobStore().put(b"")
+
+
+def should_only_check_in_bodies_above_the_threshold(tmp_path):
+    store = FileSystemBlobStore(str(tmp_path))
+    properties = BasicProperties(content_type="application/json", headers={"a": 1})
+
+    assert check_in(b"small", properties, store, 1024) == (b"small", properties)
+    assert check_in(b"x" * 2048, properties, None, 1024) == (b"x" * 2048, properties)
+
+    body, checked_in_properties = check_in(b"x" * 2048, properties, store, 1024)
+    key = claim_check_key(checked_in_properties)
+
+    assert body == b""
+    assert store.get(key) == b"x" * 2048
+    assert checked_in_properties.headers == {"a": 1, CLAIM_CHECK_HEADER: key}
+    assert checked_in_properties.content_type == "application/json"
+    assert claim_check_key(properties) is None
+
+
+def should_fetch_checked_in_bodies_before_the_callback(tmp_path):
+    store = FileSystemBlobStore(str(tmp_path))
+    key = store.put(b'{"key": "value"}')
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(),
+        claim_check_store=store,
+        claim_check_cleanup=True,
+    )
+    properties = BasicProperties(
+        content_type="application/json", headers={CLAIM_CHECK_HEADER: key}
+    )
+
+    consumer._consume_message(Mock(), Mock(), properties, b"")
+
+    assert consumer.message_received_callback.call_args.args[0] == {"key": "value"}
+
+    with pytest.raises(FileNotFoundError):
+        store.get(key)
+
+
+def should_report_bodies_that_cannot_be_fetched(tmp_path):
+    errors = []
+    store = FileSystemBlobStore(str(tmp_path))
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(),
+        claim_check_store=store,
+        claim_check_cleanup=True,
+        error_callback=lambda *args, **kwargs: errors.append(kwargs),
+    )
+    channel = Mock()
+    properties = BasicProperties(headers={CLAIM_CHECK_HEADER: "deleted"})
+
+    consumer._consume_message(channel, Mock(), properties, b"")
+
+    assert consumer.message_received_callback.call_count == 0
+    assert channel.basic_ack.call_count == 1
+    assert isinstance(errors[0]["error"], FileNotFoundError)
+    assert errors[0]["error_type"] == CONSUME_ERROR
+
+    consumer.auto_ack = False
+    consumer.claim_check_store = Mock(get=Mock(side_effect=ConnectionError))
+    consumer._consume_message(channel, Mock(), properties, b"")
+
+    assert channel.basic_nack.call_count == 1
+    assert consumer.claim_check_store.delete.call_count == 0
+    assert isinstance(errors[1]["error"], ConnectionError)
+
+
+def should_report_lazy_bodies_that_cannot_be_fetched_for_a_retry():
+    errors = []
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(side_effect=Exception),
+        claim_check_store=Mock(get=Mock(side_effect=FileNotFoundError)),
+        claim_check_lazy=True,
+        error_callback=lambda *args, **kwargs: errors.append(kwargs["error"]),
+    )
+    consumer.is_dlk_retry_enabled = True
+    consumer.retry_publisher = Mock()
+    channel = Mock()
+
+    consumer._consume_message(
+        channel, Mock(), BasicProperties(headers={CLAIM_CHECK_HEADER: "key"}), b""
+    )
+
+    assert consumer.retry_publisher.publish.call_count == 0
+    assert channel.basic_ack.call_count == 1
+    assert [type(error) for error in errors] == [FileNotFoundError]
+
+
+def should_fetch_checked_in_bodies_lazily(tmp_path):
+    store = Mock(get=Mock(return_value=b'{"key": "value"}'))
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(),
+        claim_check_store=store,
+        claim_check_lazy=True,
+    )
+    properties = BasicProperties(headers={CLAIM_CHECK_HEADER: "key"})
+
+    consumer._consume_message(Mock(), Mock(), properties, b"")
+    claim_check = consumer.message_received_callback.call_args.args[0]
+
+    assert isinstance(claim_check, ClaimCheck)
+    assert store.get.call_count == 0
+    assert claim_check.load() == {"key": "value"}
+    assert claim_check.load() == {"key": "value"}
+    assert store.get.call_count == 1
+    assert store.delete.call_count == 0
+
+
+def should_publish_and_consume_checked_in_messages(
+    publisher_session: Publisher, tmp_path
+):
+    store = FileSystemBlobStore(str(tmp_path))
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        claim_check_store=store,
+        claim_check_threshold=100,
+    )
+    large = {"test": "x" * 1000}
+    publisher.publish({"test": "small"})
+    publisher.publish(large)
+    publisher.close()
+
+    response = {"messages": []}
+
+    def callback(data, properties, **kwargs):
+        response["messages"].append((claim_check_key(properties) is not None, data))
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+        claim_check_store=store,
+    )
+    consumer.start()
+    assert_consumed_message(
+        response, {"messages": [(False, {"test": "small"}), (True, large)]}
+    )
+    consumer.close()
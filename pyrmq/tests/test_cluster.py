@@ -0,0 +1,131 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from pika import ConnectionParameters
+from pika.exceptions import AMQPConnectionError
+
+from pyrmq import Consumer, Publisher
+from pyrmq.cluster import HEALTH, RANDOM, Cluster
+
+
+def should_parse_nodes_with_the_default_port():
+    cluster = Cluster(
+        ["first", "second:5673", ("third", "5674"), "[::1]:5675", "::1"],
+        ConnectionParameters(port=5672),
+    )
+
+    assert cluster.nodes == [
+        ("first", 5672),
+        ("second", 5673),
+        ("third", 5674),
+        ("::1", 5675),
+        ("::1", 5672),
+    ]
+
+
+def should_reject_unknown_strategies_and_empty_clusters():
+    with pytest.raises(ValueError):
+        Cluster(["first"], ConnectionParameters(), strategy="closest")
+
+    with pytest.raises(ValueError):
+        Cluster([], ConnectionParameters())
+
+
+def should_rotate_nodes_round_robin():
+    cluster = Cluster(["first", "second", "third"], ConnectionParameters())
+
+    assert [cluster.ordered()[0][0] for _ in range(4)] == [
+        "first",
+        "second",
+        "third",
+        "first",
+    ]
+
+
+def should_shuffle_nodes_randomly():
+    cluster = Cluster(["first", "second"], ConnectionParameters(), strategy=RANDOM)
+
+    assert sorted(cluster.ordered()) == cluster.nodes
+
+
+def should_try_quarantined_nodes_last():
+    cluster = Cluster(["first", "second", "third"], ConnectionParameters())
+    cluster.record_failure(("first", 5672))
+
+    assert [node[0] for node in cluster.ordered()] == ["second", "third", "first"]
+
+    cluster.quarantine = 0
+
+    assert [node[0] for node in cluster.ordered()] == ["second", "third", "first"]
+    assert [node[0] for node in cluster.ordered()] == ["third", "first", "second"]
+
+
+def should_prefer_healthy_nodes():
+    cluster = Cluster(
+        ["slow", "fast", "failing"], ConnectionParameters(), strategy=HEALTH
+    )
+    cluster.quarantine = 0
+    cluster.record_success(("slow", 5672), 0.5)
+    cluster.record_success(("fast", 5672), 0.01)
+    cluster.record_success(("failing", 5672), 0.01)
+    cluster.record_failure(("failing", 5672))
+
+    assert [node[0] for node in cluster.ordered()] == ["fast", "slow", "failing"]
+
+
+def should_fail_over_to_the_next_node():
+    cluster = Cluster(["first", "second"], ConnectionParameters(connection_attempts=3))
+    connection = Mock()
+
+    with patch(
+        "pyrmq.cluster.BlockingConnection",
+        side_effect=[AMQPConnectionError, connection],
+    ) as blocking_connection:
+        assert cluster.connect() is connection
+
+    parameters = blocking_connection.call_args.args[0]
+
+    assert (parameters.host, parameters.connection_attempts) == ("second", 1)
+    assert cluster.health[("first", 5672)].failures == 1
+    assert cluster.health[("second", 5672)].failed_at is None
+
+
+def should_raise_the_last_error_when_every_node_fails():
+    cluster = Cluster(["first", "second"], ConnectionParameters())
+
+    with patch(
+        "pyrmq.cluster.BlockingConnection", side_effect=AMQPConnectionError("down")
+    ):
+        with pytest.raises(AMQPConnectionError):
+            cluster.connect()
+
+
+def should_connect_publishers_and_consumers_to_a_cluster():
+    publisher = Publisher(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        hosts=["first", "second:5673"],
+        host_strategy=HEALTH,
+    )
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(),
+        hosts=["first"],
+    )
+
+    assert publisher.cluster.nodes == [("first", 5672), ("second", 5673)]
+    assert publisher.cluster.strategy == HEALTH
+    assert consumer.cluster.nodes == [("first", 5672)]
+    assert Publisher(exchange_name="exchange").cluster is None
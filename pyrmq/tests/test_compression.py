@@ -0,0 +1,164 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import Mock
+
+import pytest
+from pika import BasicProperties
+
+from pyrmq import Consumer, Publisher
+from pyrmq.compression import (
+    Codec,
+    GzipCodec,
+    ZlibCodec,
+    compress,
+    decompress,
+    get_codec,
+    register_codec,
+)
+from pyrmq.tests.test_consumer import assert_consumed_message
+
+
+class ReversedCodec(Codec):
+    content_encoding = "x-reversed"
+
+    def compress(self, body):
+        return body[::-1]
+
+    def decompress(self, body):
+        return body[::-1]
+
+
+@pytest.mark.parametrize("codec", [GzipCodec(), ZlibCodec(level=9)])
+def should_round_trip_bodies_with_each_codec(codec: Codec):
+    body = b'{"event": "audit"}' * 100
+
+    compressed = codec.compress(body)
+
+    assert len(compressed) < len(body)
+    assert codec.decompress(compressed) == body
+
+
+def should_not_implement_the_base_codec():
+    with pytest.raises(NotImplementedError):
+        Codec().compress(b"")
+
+    with pytest.raises(NotImplementedError):
+        Codec().decompress(b"")
+
+
+def should_reject_unknown_codecs():
+    with pytest.raises(ValueError):
+        get_codec("unknown")
+
+    codec = ZlibCodec()
+
+    assert get_codec(None) is None
+    assert get_codec(codec) is codec
+    assert get_codec("gzip") is get_codec("gzip")
+
+
+def should_only_compress_bodies_above_the_threshold():
+    properties = BasicProperties(content_type="application/json")
+    codec = get_codec("gzip")
+
+    assert compress(b"small", properties, codec, 1024) == (b"small", properties)
+    assert compress(b"x" * 2048, properties, None, 1024) == (b"x" * 2048, properties)
+
+    body, compressed_properties = compress(b"x" * 2048, properties, codec, 1024)
+
+    assert codec.decompress(body) == b"x" * 2048
+    assert compressed_properties.content_encoding == "gzip"
+    assert compressed_properties.content_type == "application/json"
+    assert properties.content_encoding is None
+
+
+def should_pass_bodies_encoded_by_the_caller_through():
+    codec = get_codec("gzip")
+    body = codec.compress(b"x" * 2048)
+    properties = BasicProperties(content_encoding="gzip")
+
+    assert compress(body, properties, codec, 1024) == (body, properties)
+    assert compress(body, properties, None, 1024) == (body, properties)
+
+
+def should_decompress_by_the_content_encoding():
+    register_codec("reversed", ReversedCodec)
+
+    assert decompress(b"cba", "x-reversed") == b"abc"
+    assert decompress(b"abc", None) == b"abc"
+    assert decompress(b"abc", "identity") == b"abc"
+
+
+def should_decompress_consumed_messages():
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(),
+    )
+    properties = Mock(content_type="application/json", content_encoding="gzip")
+
+    consumer._consume_message(
+        Mock(), Mock(), properties, GzipCodec().compress(b'{"key": "value"}')
+    )
+
+    consumer.message_received_callback.assert_called_once()
+    assert consumer.message_received_callback.call_args.args[0] == {"key": "value"}
+
+
+def should_encode_retried_messages_anew():
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(),
+    )
+    consumer.retry_publisher = Mock()
+    properties = BasicProperties(content_encoding="gzip", headers={})
+
+    consumer._publish_to_retry_queue({"key": "value"}, properties, Exception())
+
+    message_properties = consumer.retry_publisher.publish.call_args.kwargs[
+        "message_properties"
+    ]
+
+    assert message_properties["content_encoding"] is None
+    assert message_properties["headers"]["x-attempt"] == 1
+
+
+def should_publish_and_consume_compressed_messages(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        compression="gzip",
+        compression_threshold=100,
+    )
+    large = {"test": "x" * 1000}
+    publisher.publish({"test": "small"})
+    publisher.publish(large)
+    publisher.close()
+
+    response = {"messages": []}
+
+    def callback(data, properties, **kwargs):
+        response["messages"].append((properties.content_encoding, data))
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+    )
+    consumer.start()
+    assert_consumed_message(
+        response, {"messages": [(None, {"test": "small"}), ("gzip", large)]}
+    )
+    consumer.close()
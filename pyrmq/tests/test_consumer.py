@@ -8,12 +8,16 @@ Full documentation is available at https://pyrmq.readthedocs.io
 """
 
 import logging
+import os
 from random import randint
+from threading import Barrier, Event, current_thread
 from time import sleep
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 import pytest
-from pika.exceptions import AMQPConnectionError
+from pika import BasicProperties
+from pika.exceptions import AMQPConnectionError, ConnectionWrongStateError
+from pika.spec import Basic
 
 from pyrmq import Consumer, Publisher
 from pyrmq.consumer import CONNECT_ERROR, CONSUME_ERROR
@@ -616,3 +620,350 @@ def should_respect_priority_ratio_in_quorum_queue():
         channel = publisher.connect()
         channel.queue_purge(queue_name)
         channel.queue_delete(queue_name)
+
+
+def start_consumer(callback, **kwargs):
+    """
+    Start consuming on mocked channels and return the function pika would call on every delivery.
+    """
+    consumer = Consumer(
+        exchange_name=TEST_EXCHANGE_NAME,
+        queue_name=TEST_QUEUE_NAME,
+        routing_key=TEST_ROUTING_KEY,
+        callback=callback,
+        **kwargs,
+    )
+    consumer.channel = Mock()
+    consumer.consume()
+
+    return consumer, consumer.channel.basic_consume.call_args.args[1]
+
+
+def should_run_callbacks_on_workers_and_settle_on_the_io_thread():
+    barrier = Barrier(2, timeout=5)
+    threads = set()
+
+    def callback(data, **kwargs):
+        threads.add(current_thread().name)
+        barrier.wait()  # Only passes once both messages are consumed at the same time
+        return data["ack"]
+
+    consumer, on_message = start_consumer(callback, workers=2)
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json")
+
+    on_message(channel, Mock(delivery_tag=1), properties, b'{"ack": true}')
+    on_message(channel, Mock(delivery_tag=2), properties, b'{"ack": false}')
+    consumer.executor.shutdown(wait=True)
+
+    assert consumer.prefetch_count == 2
+    assert all(name.startswith("pyrmq-consumer") for name in threads)
+    channel.basic_ack.assert_not_called()
+    channel.basic_nack.assert_not_called()
+
+    for call in channel.connection.add_callback_threadsafe.call_args_list:
+        call.args[0]()
+
+    channel.basic_ack.assert_called_once_with(delivery_tag=1)
+    channel.basic_nack.assert_called_once_with(delivery_tag=2)
+
+
+def should_publish_retries_from_workers_on_channels_of_their_own():
+    barrier = Barrier(4, timeout=5)
+    in_use, shared = set(), []
+
+    def callback(data, **kwargs):
+        barrier.wait()  # Only passes once every message failed at the same time
+        raise ValueError(data)
+
+    def blocking_connection(parameters):
+        connection = Mock()
+        channel = connection.channel.return_value
+        channel.connection = connection
+
+        def basic_publish(**kwargs):
+            if channel in in_use:
+                shared.append(channel)
+
+            in_use.add(channel)
+            sleep(0.05)
+            in_use.discard(channel)
+
+        channel.basic_publish.side_effect = basic_publish
+
+        return connection
+
+    with patch("pyrmq.consumer.BlockingConnection"):
+        with patch(
+            "pyrmq.publisher.BlockingConnection", side_effect=blocking_connection
+        ) as publisher_connection:
+            consumer, on_message = start_consumer(
+                callback, workers=4, is_dlk_retry_enabled=True
+            )
+            properties = BasicProperties(content_type="application/json")
+
+            for delivery_tag in range(1, 5):
+                on_message(Mock(), Mock(delivery_tag=delivery_tag), properties, b"{}")
+
+            consumer.executor.shutdown(wait=True)
+
+    assert consumer.retry_publisher.pool_size == 4
+    assert publisher_connection.call_count == 4
+    assert not shared
+
+
+def should_not_settle_from_workers_once_the_connection_closed():
+    consumer, on_message = start_consumer(Mock(return_value=None), workers=1)
+    closed_connection, closed_channel = Mock(), Mock(is_open=False)
+    closed_connection.connection.add_callback_threadsafe.side_effect = (
+        ConnectionWrongStateError
+    )
+    properties = BasicProperties(content_type="application/json")
+
+    on_message(closed_connection, Mock(), properties, b"{}")
+    on_message(closed_channel, Mock(), properties, b"{}")
+    consumer.executor.shutdown(wait=True)
+
+    closed_channel.connection.add_callback_threadsafe.call_args.args[0]()
+
+    closed_connection.basic_ack.assert_not_called()
+    closed_channel.basic_ack.assert_not_called()
+
+
+def should_not_nack_on_workers_once_the_message_was_acked():
+    error_callback = Mock()
+    dedupe_store = Mock()
+    dedupe_store.is_duplicate.return_value = False
+    dedupe_store.add.side_effect = OSError("disk full")
+    consumer, on_message = start_consumer(
+        Mock(return_value=True),
+        workers=1,
+        dedupe_store=dedupe_store,
+        error_callback=error_callback,
+    )
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json", message_id="1")
+
+    on_message(channel, Mock(delivery_tag=1), properties, b"{}")
+    consumer.executor.shutdown(wait=True)
+
+    for call in channel.connection.add_callback_threadsafe.call_args_list:
+        call.args[0]()
+
+    channel.basic_ack.assert_called_once_with(delivery_tag=1)
+    channel.basic_nack.assert_not_called()
+    error_callback.assert_called_once()
+
+
+def ack_in_another_process(data, channel, **kwargs):
+    if data.get("exit"):
+        os._exit(1)
+
+    if data.get("fail"):
+        raise ValueError(data)
+
+    return channel is None and data["parent"] != os.getpid()
+
+
+def should_run_callbacks_in_worker_processes():
+    error_callback = Mock()
+    consumer, on_message = start_consumer(
+        ack_in_another_process,
+        worker_processes=2,
+        max_tasks_per_child=1,
+        auto_ack=False,
+        error_callback=error_callback,
+    )
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json")
+
+    on_message(
+        channel,
+        Basic.Deliver(delivery_tag=1),
+        properties,
+        b'{"parent": %d}' % os.getpid(),
+    )
+    on_message(channel, Basic.Deliver(delivery_tag=2), properties, b'{"fail": true}')
+    consumer.executor.shutdown(wait=True)
+    consumer.process_pool.shutdown(wait=True)
+
+    for call in channel.connection.add_callback_threadsafe.call_args_list:
+        call.args[0]()
+
+    assert consumer.prefetch_count == 2
+    channel.basic_ack.assert_called_once_with(delivery_tag=1)
+    channel.basic_nack.assert_called_once_with(delivery_tag=2)
+    assert isinstance(error_callback.call_args.kwargs["error"], ValueError)
+
+
+def should_replace_the_process_pool_once_a_worker_process_dies():
+    consumer, on_message = start_consumer(ack_in_another_process, worker_processes=1)
+    process_pool = consumer.process_pool
+    properties = BasicProperties(content_type="application/json")
+
+    on_message(Mock(), Basic.Deliver(delivery_tag=1), properties, b'{"exit": true}')
+    consumer.executor.shutdown(wait=True)
+
+    assert consumer.process_pool is not process_pool
+    consumer.process_pool.shutdown(wait=True)
+
+
+def should_not_send_lazy_claim_checks_to_worker_processes():
+    with pytest.raises(ValueError):
+        Consumer(
+            exchange_name=TEST_EXCHANGE_NAME,
+            queue_name=TEST_QUEUE_NAME,
+            routing_key=TEST_ROUTING_KEY,
+            callback=ack_in_another_process,
+            worker_processes=2,
+            claim_check_store=Mock(),
+            claim_check_lazy=True,
+        )
+
+
+def should_consume_batches_and_ack_them_at_once():
+    batches = []
+    consumer, on_message = start_consumer(
+        lambda data, **kwargs: batches.append(data), batch_size=3, batch_timeout=0.5
+    )
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json")
+
+    for delivery_tag in range(1, 6):
+        on_message(channel, Mock(delivery_tag=delivery_tag), properties, b"{}")
+
+    assert consumer.prefetch_count == 3
+    assert batches == [[{}, {}, {}]]
+    channel.basic_ack.assert_called_once_with(delivery_tag=3, multiple=True)
+    channel.connection.call_later.assert_called_with(0.5, ANY)
+
+    channel.connection.call_later.call_args.args[1]()
+
+    assert batches == [[{}, {}, {}], [{}, {}]]
+    channel.basic_ack.assert_called_with(delivery_tag=5, multiple=True)
+
+
+def should_only_nack_the_failed_messages_of_a_batch():
+    error_callback = Mock()
+
+    def callback(data, methods, properties, **kwargs):
+        if len(data) < 3:
+            raise ValueError
+
+        return {1: ValueError(data[1])}
+
+    consumer, on_message = start_consumer(
+        callback, batch_size=3, auto_ack=False, error_callback=error_callback
+    )
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json")
+
+    for delivery_tag in range(1, 4):
+        on_message(channel, Mock(delivery_tag=delivery_tag), properties, b"{}")
+
+    channel.basic_nack.assert_called_once_with(delivery_tag=2)
+    channel.basic_ack.assert_called_once_with(delivery_tag=3, multiple=True)
+
+    on_message(channel, Mock(delivery_tag=4), properties, b"{}")
+    channel.connection.call_later.call_args.args[1]()
+
+    channel.basic_nack.assert_called_with(delivery_tag=4)
+    assert channel.basic_ack.call_count == 1
+    assert error_callback.call_count == 2
+
+
+def should_coalesce_acks_of_workers_per_channel():
+    consumer, on_message = start_consumer(
+        Mock(return_value=None), workers=1, coalesce_acks=2
+    )
+    channel, new_channel = Mock(), Mock()
+    properties = BasicProperties(content_type="application/json")
+
+    for delivery_tag in (1, 2, 3):
+        on_message(channel, Mock(delivery_tag=delivery_tag), properties, b"{}")
+
+    on_message(new_channel, Mock(delivery_tag=1), properties, b"{}")
+    consumer.executor.shutdown(wait=True)
+
+    for settle in (channel, new_channel):
+        for call in settle.connection.add_callback_threadsafe.call_args_list:
+            call.args[0]()
+
+    channel.basic_ack.assert_called_once_with(delivery_tag=2, multiple=True)
+    new_channel.basic_ack.assert_not_called()
+    assert consumer.ack_coalescer.channel is new_channel
+    assert consumer.ack_coalescer.pending == 1
+
+
+def settle_from_worker(consumer: Consumer, channel: Mock) -> None:
+    """
+    Wait for a consumer's only worker to finish, then settle on the "I/O thread" what it consumed.
+    """
+    consumer.executor.submit(lambda: None).result(timeout=5)
+
+    for call in channel.connection.add_callback_threadsafe.call_args_list:
+        call.args[0]()
+
+    channel.connection.add_callback_threadsafe.reset_mock()
+
+
+def should_only_adjust_the_prefetch_count_of_workers():
+    with pytest.raises(ValueError):
+        Consumer(
+            exchange_name=TEST_EXCHANGE_NAME,
+            queue_name=TEST_QUEUE_NAME,
+            routing_key=TEST_ROUTING_KEY,
+            callback=Mock(),
+            adaptive_prefetch=True,
+        )
+
+
+def should_raise_the_prefetch_count_while_workers_wait_for_deliveries():
+    now = {"now": 0.0}
+
+    def callback(data, **kwargs):
+        now["now"] += 0.6
+
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json")
+
+    with patch("time.monotonic", side_effect=lambda: now["now"]):
+        consumer, on_message = start_consumer(
+            callback, workers=1, adaptive_prefetch=True
+        )
+
+        for delivery_tag in (1, 2):
+            on_message(channel, Mock(delivery_tag=delivery_tag), properties, b"{}")
+            settle_from_worker(consumer, channel)
+
+    channel.basic_qos.assert_called_once_with(prefetch_count=2)
+    assert consumer.prefetch_count == consumer.adaptive_prefetch.prefetch == 2
+    assert consumer.adaptive_prefetch.service_time == pytest.approx(0.6)
+
+
+def should_cut_the_prefetch_count_once_messages_wait_for_workers():
+    now = {"now": 0.0}
+    delivered = Event()
+
+    def callback(data, **kwargs):
+        delivered.wait(5)
+        now["now"] += 0.5
+
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json")
+
+    with patch("time.monotonic", side_effect=lambda: now["now"]):
+        consumer, on_message = start_consumer(
+            callback, workers=1, prefetch_count=8, adaptive_prefetch=True
+        )
+
+        for delivery_tag in range(1, 9):
+            on_message(channel, Mock(delivery_tag=delivery_tag), properties, b"{}")
+
+        delivered.set()
+        settle_from_worker(consumer, channel)
+
+    channel.basic_qos.assert_called_once_with(prefetch_count=4)
+    assert (
+        consumer.adaptive_prefetch.wait_time > consumer.adaptive_prefetch.service_time
+    )
@@ -0,0 +1,132 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import ANY, Mock, patch
+
+from pika import BasicProperties
+
+from pyrmq import ConsumerGroup, Publisher
+from pyrmq.tests.conftest import TEST_EXCHANGE_NAME, TEST_QUEUE_NAME, TEST_ROUTING_KEY
+from pyrmq.tests.test_consumer import assert_consumed_message
+
+
+def should_consume_many_queues_over_one_connection(publisher_session: Publisher):
+    other_queue_name = "consumer_group_test_queue"
+    other_routing_key = "consumer_group_test_routing_key"
+    responses = {}
+
+    def callback(data, method, **kwargs):
+        responses[method.routing_key] = data
+
+    group = ConsumerGroup()
+    group.add(TEST_EXCHANGE_NAME, TEST_QUEUE_NAME, TEST_ROUTING_KEY, callback)
+    group.add(
+        TEST_EXCHANGE_NAME,
+        other_queue_name,
+        other_routing_key,
+        callback,
+        prefetch_count=10,
+        is_dlk_retry_enabled=True,
+    )
+    group.start()
+
+    publisher_session.publish({"queue": "first"})
+    publisher_session.publish({"queue": "second"}, routing_key=other_routing_key)
+
+    assert_consumed_message(
+        responses,
+        {TEST_ROUTING_KEY: {"queue": "first"}, other_routing_key: {"queue": "second"}},
+    )
+    assert group.consumers[0].connection is group.consumers[1].connection
+    group.close()
+
+    channel = publisher_session.connect()
+    channel.queue_delete(other_queue_name)
+    channel.queue_delete(f"{other_queue_name}.retry")
+    channel.exchange_delete(f"{other_queue_name}.retry")
+
+
+def should_share_one_connection_and_open_a_channel_per_queue():
+    connection = Mock()
+    connection.channel.side_effect = lambda: Mock(is_closed=False)
+    group = ConsumerGroup(retry_delay=0)
+
+    with patch("pyrmq.consumer.BlockingConnection") as consumer_connection:
+        first = group.add("exchange", "first", "first", Mock(), prefetch_count=5)
+        second = group.add(
+            "exchange", "second", "second", Mock(), is_dlk_retry_enabled=True
+        )
+
+    consumer_connection.assert_not_called()
+
+    with patch("pyrmq.consumer_group.BlockingConnection", return_value=connection):
+        group.connect()
+
+    assert first.connection is second.connection is connection
+    assert first.channel is not second.channel
+    first.channel.basic_qos.assert_called_once_with(prefetch_count=5)
+    second.channel.queue_declare.assert_any_call(
+        queue="second.retry", arguments=second.retry_queue_args, durable=True
+    )
+
+    def process_data_events(time_limit):
+        second.channel.is_closed = True
+        group.close()
+
+    connection.process_data_events.side_effect = process_data_events
+    closed_channel = second.channel
+    group.consume()
+
+    first.channel.basic_consume.assert_called_once_with("first", ANY)
+    closed_channel.basic_consume.assert_called_once()
+    second.channel.basic_consume.assert_called_once_with("second", ANY)
+    assert second.channel is not closed_channel
+    connection.close.assert_called_once()
+
+
+def should_share_one_retry_publisher_between_queues():
+    group = ConsumerGroup()
+
+    with patch("pyrmq.consumer.BlockingConnection"):
+        first = group.add(
+            "exchange", "first", "first", Mock(), is_dlk_retry_enabled=True
+        )
+        second = group.add(
+            "exchange", "second", "second", Mock(), is_dlk_retry_enabled=True, workers=4
+        )
+        compressed = group.add(
+            "exchange",
+            "compressed",
+            "compressed",
+            Mock(),
+            is_dlk_retry_enabled=True,
+            compression="gzip",
+        )
+
+    assert first.retry_publisher is None
+
+    with patch("pyrmq.consumer_group.BlockingConnection"):
+        group.connect()
+
+    assert first.retry_publisher is second.retry_publisher
+    assert compressed.retry_publisher is not first.retry_publisher
+    assert first.retry_publisher.pool_size == 4
+
+    with patch.object(first.retry_publisher, "publish") as publish:
+        first._publish_to_retry_queue({}, BasicProperties(), ValueError())
+        second._publish_to_retry_queue({}, BasicProperties(), ValueError())
+
+    assert [call.kwargs["exchange"] for call in publish.call_args_list] == [
+        "first.retry",
+        "second.retry",
+    ]
+    assert [call.kwargs["routing_key"] for call in publish.call_args_list] == [
+        "first.retry",
+        "second.retry",
+    ]
@@ -0,0 +1,130 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from time import sleep
+from unittest.mock import Mock
+
+import pytest
+from pika import BasicProperties
+
+from pyrmq import Consumer
+from pyrmq.dedupe import (
+    BloomDedupeStore,
+    DedupeStore,
+    MemoryDedupeStore,
+    SQLiteDedupeStore,
+)
+
+
+def should_count_hits_and_misses():
+    store = MemoryDedupeStore()
+
+    assert not store.is_duplicate("first")
+
+    store.add("first")
+
+    assert store.is_duplicate("first")
+    assert not store.is_duplicate("second")
+    assert (store.hits, store.misses) == (1, 2)
+
+
+def should_not_implement_the_base_dedupe_store():
+    with pytest.raises(NotImplementedError):
+        DedupeStore().contains("key")
+
+    with pytest.raises(NotImplementedError):
+        DedupeStore().add("key")
+
+
+def should_evict_the_least_recently_used_and_expired_keys():
+    store = MemoryDedupeStore(max_size=2, ttl=0.1)
+
+    store.add("first")
+    store.add("second")
+    assert store.contains("first")
+    store.add("third")
+
+    assert store.contains("first")
+    assert not store.contains("second")
+    assert len(store) == 2
+
+    sleep(0.2)
+
+    assert not store.contains("first")
+    assert len(store) == 1
+
+
+def should_only_ask_the_backing_store_about_keys_the_filter_may_have_seen():
+    backing_store = MemoryDedupeStore()
+    backing_store.contains = Mock(wraps=backing_store.contains)
+    store = BloomDedupeStore(backing_store, capacity=1000, error_rate=0.01)
+
+    for index in range(500):
+        store.add(f"seen-{index}")
+
+    assert all(store.contains(f"seen-{index}") for index in range(500))
+    assert backing_store.contains.call_count == 500
+
+    backing_store.contains.reset_mock()
+    new_keys = sum(store.contains(f"new-{index}") for index in range(1000))
+
+    assert new_keys == 0
+    assert backing_store.contains.call_count < 50
+
+
+def should_remember_keys_across_sqlite_stores(tmp_path):
+    path = str(tmp_path / "dedupe.db")
+    store = SQLiteDedupeStore(path, ttl=None)
+    store.add("first")
+    store.close()
+
+    reopened = SQLiteDedupeStore(path, ttl=0)
+    reopened.add("second")
+
+    assert reopened.contains("first")
+    assert not reopened.contains("second")
+    reopened.close()
+
+
+def should_ack_duplicates_without_calling_the_callback():
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(return_value=None),
+        dedupe_store=MemoryDedupeStore(),
+    )
+    channel = Mock()
+    properties = BasicProperties(content_type="application/json", message_id="id")
+
+    consumer._consume_message(channel, Mock(), properties, b"{}")
+    consumer._consume_message(channel, Mock(), properties, b"{}")
+    consumer._consume_message(channel, Mock(), BasicProperties(), b"{}")
+
+    assert consumer.message_received_callback.call_count == 2
+    assert channel.basic_ack.call_count == 3
+    assert (consumer.dedupe_store.hits, consumer.dedupe_store.misses) == (1, 1)
+
+
+def should_dedupe_by_a_header_and_only_after_success():
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(side_effect=[Exception, None, None]),
+        dedupe_store=MemoryDedupeStore(),
+        dedupe_header="x-event-id",
+    )
+    properties = BasicProperties(message_id="id", headers={"x-event-id": 42})
+
+    for _ in range(3):
+        consumer._consume_message(Mock(), Mock(), properties, b"{}")
+
+    assert consumer.message_received_callback.call_count == 2
+    assert consumer.dedupe_store.contains("42")
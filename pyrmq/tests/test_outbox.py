@@ -0,0 +1,261 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from time import sleep
+from unittest.mock import Mock, patch
+
+import pytest
+from pika import BasicProperties
+from pika.exceptions import AMQPConnectionError, ChannelClosedByBroker
+from pika.spec import Basic
+
+from pyrmq import Consumer, Publisher
+from pyrmq.outbox import Outbox
+from pyrmq.tests.test_consumer import assert_consumed_message
+
+
+def wait_until_drained(outbox: Outbox, tries: int = 50) -> None:
+    while outbox.pending and tries:
+        sleep(0.1)
+        tries -= 1
+
+
+def should_keep_messages_across_outboxes(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    open_channel = Mock(side_effect=AMQPConnectionError)
+
+    outbox = Outbox(path, open_channel, retry_delay=0.1)
+    outbox.append("exchange", "routing_key", b"first", BasicProperties(priority=5))
+    outbox.append("exchange", "routing_key", b"second", BasicProperties())
+    sleep(0.2)
+    outbox.close()
+
+    assert outbox.pending == 2
+    assert open_channel.call_count >= 2
+
+    reopened = Outbox(path, open_channel, retry_delay=0.1)
+
+    assert reopened.pending == 2
+    reopened.close()
+
+
+def mock_channel() -> Mock:
+    """
+    A channel that acks every published message and returns those published with the routing key "unroutable".
+    """
+    channel = Mock(delivery_tag=0)
+    callbacks = {}
+    channel._impl.confirm_delivery.side_effect = (
+        lambda ack_nack_callback, callback: callbacks.update(ack=ack_nack_callback)
+    )
+    channel._impl.add_on_return_callback.side_effect = (
+        lambda callback: callbacks.update(returned=callback)
+    )
+
+    def basic_publish(exchange, routing_key, body, properties, mandatory):
+        channel.delivery_tag += 1
+
+        if routing_key == "unroutable":
+            callbacks["returned"](
+                channel, Mock(routing_key=routing_key), properties, body
+            )
+
+    def process_data_events(time_limit):
+        method = Basic.Ack(delivery_tag=channel.delivery_tag, multiple=True)
+        callbacks["ack"](Mock(method=method))
+
+    channel.basic_publish.side_effect = basic_publish
+    channel.connection.process_data_events.side_effect = process_data_events
+
+    return channel
+
+
+def should_replay_the_journal_in_order(tmp_path):
+    channel = mock_channel()
+    outbox = Outbox(str(tmp_path / "outbox.db"), Mock(return_value=channel))
+
+    outbox.append("exchange", "routing_key", b"first", BasicProperties(priority=5))
+    outbox.append("exchange", "unroutable", b"second", BasicProperties())
+    wait_until_drained(outbox)
+    outbox.close()
+
+    assert outbox.pending == 0
+    assert [call.kwargs["body"] for call in channel.basic_publish.call_args_list] == [
+        b"first",
+        b"second",
+    ]
+    assert channel.basic_publish.call_args_list[0].kwargs["properties"].priority == 5
+
+
+def should_replay_again_when_the_channel_closes(tmp_path):
+    channel = mock_channel()
+    channel.is_open = False
+    open_channel = Mock(return_value=channel)
+    outbox = Outbox(str(tmp_path / "outbox.db"), open_channel, retry_delay=0.1)
+
+    outbox.append("exchange", "routing_key", b"first", BasicProperties())
+    sleep(0.2)
+    outbox.close()
+
+    assert outbox.pending == 1
+    assert open_channel.call_count >= 2
+
+
+def should_drop_spooled_messages_the_broker_rejects(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = Outbox(path, Mock(side_effect=AMQPConnectionError), retry_delay=0.1)
+    outbox.append("exchange", "routing_key", b"first", BasicProperties())
+    outbox.append("typo", "routing_key", b"second", BasicProperties())
+    outbox.append("exchange", "routing_key", b"third", BasicProperties())
+    outbox.close()
+
+    published = []
+
+    def open_channel():
+        channel = mock_channel()
+        publish = channel.basic_publish.side_effect
+
+        def basic_publish(exchange, routing_key, body, properties, mandatory):
+            if exchange == "typo":
+                raise ChannelClosedByBroker(404, "NOT_FOUND")
+
+            publish(exchange, routing_key, body, properties, mandatory)
+            published.append(body)
+
+        channel.basic_publish.side_effect = basic_publish
+
+        return channel
+
+    reopened = Outbox(path, open_channel, retry_delay=0.1)
+    wait_until_drained(reopened)
+    reopened.close()
+
+    assert reopened.pending == 0
+    assert reopened.failed == 1
+    assert published == [b"first", b"first", b"third"]
+
+
+def should_spool_messages_while_the_broker_is_unreachable(
+    publisher_session: Publisher, tmp_path
+):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        outbox_path=str(tmp_path / "outbox.db"),
+        retry_delay=0.1,
+    )
+
+    with patch(
+        "pika.adapters.blocking_connection.BlockingConnection.__init__",
+        side_effect=AMQPConnectionError,
+    ):
+        with patch("time.sleep") as time_sleep:
+            for index in range(3):
+                publisher.publish({"test": index}, message_properties={"priority": 5})
+
+        assert time_sleep.call_count == 0
+        assert publisher.outbox.pending == 3
+
+    wait_until_drained(publisher.outbox)
+    publisher.publish({"test": 3})
+
+    assert publisher.outbox.pending == 0
+
+    response = {"messages": []}
+
+    def callback(data, properties, **kwargs):
+        response["messages"].append((data["test"], properties.priority))
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+        prefetch_count=4,
+    )
+    consumer.start()
+    assert_consumed_message(response, {"messages": [(0, 5), (1, 5), (2, 5), (3, None)]})
+    consumer.close()
+    publisher.close()
+
+
+def should_connect_once_before_spooling(tmp_path):
+    publisher = Publisher(
+        exchange_name="exchange",
+        outbox_path=str(tmp_path / "outbox.db"),
+        connection_attempts=3,
+        retry_delay=5,
+    )
+
+    with patch(
+        "pyrmq.publisher.BlockingConnection", side_effect=AMQPConnectionError
+    ) as blocking_connection:
+        publisher.publish({"test": "test"})
+
+        assert publisher.outbox.pending == 1
+        assert blocking_connection.call_args.args[0].connection_attempts == 1
+        assert publisher.retry_policy.attempts == 3
+
+        publisher.outbox.close()
+
+
+def should_keep_spooling_while_the_outbox_drains(
+    publisher_session: Publisher, tmp_path
+):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        outbox_path=str(tmp_path / "outbox.db"),
+    )
+    publisher.outbox.close()
+
+    with patch.object(publisher.outbox, "append") as append:
+        with patch.object(Outbox, "pending", 1):
+            publisher.publish({"test": "test"})
+
+    append.assert_called_once()
+    publisher.close()
+
+
+def should_spool_messages_when_the_connection_drops_while_publishing(
+    publisher_session: Publisher, tmp_path
+):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        outbox_path=str(tmp_path / "outbox.db"),
+    )
+    publisher.outbox.close()
+
+    with patch(
+        "pika.adapters.blocking_connection.BlockingChannel.basic_publish",
+        side_effect=AMQPConnectionError,
+    ):
+        with patch.object(publisher.outbox, "append") as append:
+            publisher.publish({"test": "test"})
+
+    append.assert_called_once()
+    publisher.close()
+
+
+def should_not_spool_messages_for_a_missing_exchange(tmp_path):
+    publisher = Publisher(
+        exchange_name="non_existing_exchange",
+        outbox_path=str(tmp_path / "outbox.db"),
+        retry_delay=0,
+    )
+
+    with pytest.raises(ChannelClosedByBroker):
+        publisher.publish({})
+
+    assert publisher.outbox.pending == 0
+    publisher.close()
@@ -7,21 +7,28 @@
     Full documentation is available at https://pyrmq.readthedocs.io
 """
 
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Event
+from time import sleep
 from typing import Dict
-from unittest.mock import PropertyMock, patch
+from unittest.mock import Mock, PropertyMock, patch
 
 import pytest
 from pika.exceptions import (
     AMQPChannelError,
     AMQPConnectionError,
     ChannelClosedByBroker,
+    ConnectionBlockedTimeout,
     UnroutableError,
 )
 
 from pyrmq import Consumer, Publisher
-from pyrmq.publisher import CONNECT_ERROR
+from pyrmq.confirms import CONFIRMED, UNROUTABLE, ConfirmWindow
+from pyrmq.publisher import CONNECT_ERROR, SPOOLED
+from pyrmq.retry import RetryPolicy
 from pyrmq.tests.conftest import TEST_EXCHANGE_NAME, TEST_QUEUE_NAME, TEST_ROUTING_KEY
 from pyrmq.tests.test_consumer import assert_consumed_message
+from pyrmq.tests.test_outbox import mock_channel
 
 
 def should_handle_connection_error_when_connecting():
@@ -371,3 +378,564 @@ def should_raise_exception_if_exchange_exists_but_queue_does_not():
     # Clean up
     channel = publisher.connect()
     channel.exchange_delete(exchange_name)
+
+
+def should_reuse_connection_across_publishes(publisher_session: Publisher):
+    channel = publisher_session.connect()
+
+    with patch(
+        "pika.adapters.blocking_connection.BlockingConnection.__init__"
+    ) as connection_init:
+        publisher_session.publish({"test": "first"})
+        publisher_session.publish({"test": "second"})
+
+    assert connection_init.call_count == 0
+    assert publisher_session.connect() is channel
+
+
+def should_reconnect_when_connection_is_closed(publisher_session: Publisher):
+    channel = publisher_session.connect()
+    publisher_session.connection.close()
+
+    publisher_session.publish({"test": "test"})
+
+    assert publisher_session.channel is not channel
+    assert publisher_session.channel.is_open
+
+
+def should_open_a_new_connection_after_close(publisher_session: Publisher):
+    connection = publisher_session.connect().connection
+    publisher_session.close()
+
+    assert not connection.is_open
+    assert publisher_session.connection is None
+
+    publisher_session.publish({"test": "test"})
+
+    assert publisher_session.connection.is_open
+
+
+def should_publish_from_many_threads_with_a_channel_pool(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        pool_size=4,
+    )
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        list(executor.map(lambda i: publisher.publish({"test": i}), range(64)))
+
+    response = {"count": 0}
+
+    def callback(data, **kwargs):
+        response["count"] += 1
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+        prefetch_count=64,
+    )
+    consumer.start()
+    assert_consumed_message(response, {"count": 64})
+    consumer.close()
+    publisher.close()
+
+
+def should_time_out_when_no_pooled_channel_is_available(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        pool_size=1,
+        pool_checkout_timeout=0.1,
+    )
+    channel = publisher.pool.checkout()
+
+    with pytest.raises(TimeoutError):
+        publisher.publish({"test": "test"})
+
+    publisher.pool.checkin(channel)
+    publisher.publish({"test": "test"})
+    publisher.close()
+
+
+def should_replace_pooled_channels_idle_for_too_long(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        pool_size=1,
+        pool_max_idle=0.1,
+    )
+    channel = publisher.pool.checkout()
+    publisher.pool.checkin(channel)
+    sleep(0.2)
+
+    new_channel = publisher.pool.checkout()
+
+    assert new_channel is not channel
+    assert not channel.connection.is_open
+    publisher.pool.checkin(new_channel)
+    publisher.close()
+
+
+def should_publish_many_and_confirm_every_message(publisher_session: Publisher):
+    results = publisher_session.publish_many({"test": i} for i in range(100))
+
+    assert results == [CONFIRMED] * 100
+
+    response = {"count": 0}
+
+    def callback(data, **kwargs):
+        response["count"] += 1
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+        prefetch_count=100,
+    )
+    consumer.start()
+    assert_consumed_message(response, {"count": 100})
+    consumer.close()
+
+
+def should_report_unroutable_messages_of_a_batch():
+    exchange_name = "isolated_exchange"
+    consumer = Consumer(
+        exchange_name=exchange_name,
+        queue_name="temp_queue",
+        routing_key="temp_key",
+        callback=lambda x: x,
+    )
+    consumer.connect()
+    consumer.channel.exchange_declare(
+        exchange=exchange_name, durable=True, exchange_type="direct"
+    )
+
+    publisher = Publisher(
+        exchange_name=exchange_name,
+        routing_key="non_existent_queue",
+    )
+
+    assert publisher.publish_many([{"test": 1}, {"test": 2}]) == [UNROUTABLE] * 2
+
+    channel = publisher.connect()
+    channel.exchange_delete(exchange_name)
+
+
+def should_resolve_futures_once_messages_are_confirmed(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        confirm_window=10,
+    )
+
+    futures = [publisher.publish({"test": i}) for i in range(50)]
+    wait(futures, timeout=10)
+
+    assert [future.result() for future in futures] == [CONFIRMED] * 50
+    assert publisher.window.in_flight == 0
+    assert publisher.window.latency_stats()["count"] == 50
+    publisher.close()
+
+
+def should_fail_futures_when_the_connection_cannot_be_opened():
+    publisher = Publisher(
+        exchange_name="incorrect_exchange_name",
+        confirm_window=10,
+    )
+
+    with patch(
+        "pika.adapters.blocking_connection.BlockingConnection.__init__",
+        side_effect=AMQPConnectionError,
+    ):
+        with patch("time.sleep"):
+            future = publisher.publish({"test": "test"})
+
+            with pytest.raises(AMQPConnectionError):
+                future.result(timeout=10)
+
+    publisher.close()
+
+
+def should_skip_cancelled_futures_and_restart_after_a_failed_connect():
+    connecting = Event()
+
+    def open_channel():
+        connecting.wait()
+        raise AMQPConnectionError
+
+    window = ConfirmWindow(open_channel)
+    cancelled = window.publish("exchange", "routing_key", b"{}", None)
+    failed = window.publish("exchange", "routing_key", b"{}", None)
+    cancelled.cancel()
+    connecting.set()
+
+    with pytest.raises(AMQPConnectionError):
+        failed.result(timeout=10)
+
+    with pytest.raises(AMQPConnectionError):
+        window.publish("exchange", "routing_key", b"{}", None).result(timeout=10)
+
+    assert cancelled.cancelled()
+    assert window.in_flight == 0
+
+
+def should_verify_the_exchange_once_per_connection(publisher_session: Publisher):
+    publisher_session.verify()
+
+    with patch(
+        "pika.adapters.blocking_connection.BlockingChannel.exchange_declare"
+    ) as exchange_declare:
+        publisher_session.publish({"test": "first"})
+        publisher_session.publish({"test": "second"})
+
+    assert exchange_declare.call_count == 0
+
+
+def should_verify_the_exchange_again_once_the_ttl_expires(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        exchange_verify_ttl=0.1,
+    )
+    publisher.verify()
+    sleep(0.2)
+
+    with patch(
+        "pika.adapters.blocking_connection.BlockingChannel.exchange_declare"
+    ) as exchange_declare:
+        publisher.publish({"test": "test"})
+
+    assert exchange_declare.call_count == 1
+    publisher.close()
+
+
+def should_fail_fast_when_verifying_a_non_existing_exchange():
+    publisher = Publisher(exchange_name="non_existing_exchange", retry_delay=0)
+
+    with pytest.raises(ChannelClosedByBroker):
+        publisher.verify()
+
+
+def should_publish_through_a_profile(publisher_session: Publisher):
+    profile = publisher_session.profile(
+        message_properties={"headers": {"x-origin": "profile"}}, is_priority=True
+    )
+    profile.publish({"test": "first"})
+    profile.publish({"test": "second"}, message_id="id", headers={"x-index": 2})
+
+    response = {"messages": []}
+
+    def callback(data, properties, **kwargs):
+        response["messages"].append(
+            (data, properties.priority, properties.message_id, properties.headers)
+        )
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+    )
+    consumer.start()
+    assert_consumed_message(
+        response,
+        {
+            "messages": [
+                ({"test": "first"}, 5, None, {"x-origin": "profile"}),
+                (
+                    {"test": "second"},
+                    5,
+                    "id",
+                    {"x-origin": "profile", "x-index": 2},
+                ),
+            ]
+        },
+    )
+    consumer.close()
+
+
+def should_fill_in_per_message_properties_of_a_profile():
+    publisher = Publisher(
+        exchange_name=TEST_EXCHANGE_NAME,
+        queue_name=TEST_QUEUE_NAME,
+        compression="gzip",
+        compression_threshold=0,
+    )
+    profile = publisher.profile(routing_key="profile_key", serializer="raw")
+
+    with patch.object(Publisher, "_publish_body") as publish_body:
+        profile.publish(b"first")
+        profile.publish(b"second", timestamp=1, headers={"x-index": 2})
+
+    (first_body, first_properties, routing_key), _ = publish_body.call_args_list[0]
+    (_, second_properties, _), _ = publish_body.call_args_list[1]
+
+    assert routing_key == "profile_key"
+    assert publisher.compression.decompress(first_body) == b"first"
+    assert first_properties.content_type == "application/octet-stream"
+    assert first_properties.content_encoding == "gzip"
+    assert second_properties.timestamp == 1
+    assert second_properties.headers == {"x-index": 2}
+    assert profile.properties.headers is None
+
+
+def should_publish_to_other_destinations_over_one_connection():
+    def dummy_callback(data, **kwargs):
+        pass  # pragma: no cover
+
+    for exchange_name, queue_name in (
+        ("first_exchange", "first_queue"),
+        ("second_exchange", "second_queue"),
+    ):
+        consumer = Consumer(
+            exchange_name=exchange_name,
+            queue_name=queue_name,
+            routing_key=queue_name,
+            callback=dummy_callback,
+        )
+        consumer.connect()
+        consumer.declare_queue()
+        consumer.close()
+
+    publisher = Publisher(exchange_name="first_exchange", routing_key="first_queue")
+    publisher.verify()
+
+    with patch(
+        "pika.adapters.blocking_connection.BlockingChannel.exchange_declare",
+        wraps=publisher.connect().exchange_declare,
+    ) as exchange_declare:
+        publisher.publish({"test": 1})
+        publisher.publish(
+            {"test": 2}, exchange="second_exchange", routing_key="second_queue"
+        )
+        results = publisher.publish_many(
+            [{"test": 3}], exchange="second_exchange", routing_key="second_queue"
+        )
+
+    assert results == [CONFIRMED]
+    # Only the second exchange is verified, once, on the shared connection.
+    assert exchange_declare.call_count == 1
+
+    channel = publisher.connect()
+
+    assert channel.queue_declare("first_queue", passive=True).method.message_count == 1
+    assert channel.queue_declare("second_queue", passive=True).method.message_count == 2
+    publisher.close()
+
+
+def should_publish_through_a_profile_to_another_exchange():
+    publisher = Publisher(exchange_name=TEST_EXCHANGE_NAME)
+    profile = publisher.profile(exchange="first_exchange", routing_key="first_queue")
+
+    with patch.object(Publisher, "_publish_body") as publish_body:
+        profile.publish({"test": "test"})
+
+    (_, _, routing_key), kwargs = publish_body.call_args
+
+    assert routing_key == "first_queue"
+    assert kwargs["exchange"] == "first_exchange"
+
+
+def should_verify_other_exchanges_on_the_background_threads():
+    publisher = Publisher(
+        exchange_name=TEST_EXCHANGE_NAME,
+        background_queue_size=10,
+        confirm_window=10,
+    )
+
+    with patch.object(Publisher, "verify") as verify:
+        with patch.object(publisher.background, "put") as put:
+            publisher.publish({"test": "test"}, exchange="other_exchange")
+
+    verify.assert_not_called()
+    put.assert_called_once()
+    assert publisher.background.verify_exchange == publisher.window.verify_exchange
+
+    channel = Mock()
+    channel.connection.channel.return_value.connection = channel.connection
+
+    with patch.object(
+        publisher,
+        "verify_exchange",
+        side_effect=ChannelClosedByBroker(404, "NOT_FOUND"),
+    ) as verify_exchange:
+        with pytest.raises(ChannelClosedByBroker):
+            publisher.window.verify_exchange(channel, "missing_exchange")
+
+    # A missing exchange only closes a channel of its own.
+    verify_exchange.assert_called_once_with(
+        channel.connection.channel.return_value, "missing_exchange"
+    )
+
+    publisher.window.verify_exchange(channel, "other_exchange")
+    publisher.window.verify_exchange(channel, "other_exchange")
+
+    assert channel.connection.channel.call_count == 2
+    channel.exchange_declare.assert_not_called()
+
+
+def should_fail_only_the_future_of_a_missing_exchange():
+    def verify_exchange(channel, exchange):
+        if exchange == "missing_exchange":
+            raise ChannelClosedByBroker(404, "NOT_FOUND")
+
+    window = ConfirmWindow(
+        Mock(return_value=mock_channel()), verify_exchange=verify_exchange
+    )
+    confirmed = window.publish("exchange", "routing_key", b"{}", None)
+    failed = window.publish("missing_exchange", "routing_key", b"{}", None)
+
+    assert confirmed.result(timeout=10) == CONFIRMED
+
+    with pytest.raises(ChannelClosedByBroker):
+        failed.result(timeout=10)
+
+    window.close()
+
+
+def should_fail_fast_while_the_broker_blocks_publishing():
+    publisher = Publisher(exchange_name=TEST_EXCHANGE_NAME, blocked_policy="raise")
+
+    with patch("pyrmq.publisher.BlockingConnection") as blocking_connection:
+        connection = blocking_connection.return_value
+        publisher.verify()
+
+        (on_blocked,), _ = connection.add_on_connection_blocked_callback.call_args
+        (on_unblocked,), _ = connection.add_on_connection_unblocked_callback.call_args
+        on_blocked(connection, Mock(method=Mock(reason="low on memory")))
+
+        assert publisher.is_blocked
+
+        with pytest.raises(ConnectionBlockedTimeout):
+            publisher.publish({"test": "test"})
+
+        assert connection.channel.return_value.basic_publish.call_count == 0
+
+        on_unblocked(connection, Mock())
+        publisher.publish({"test": "test"})
+
+    assert not publisher.is_blocked
+    assert publisher.blocked_duration == 0
+    assert publisher.total_blocked_duration > 0
+    assert connection.channel.return_value.basic_publish.call_count == 1
+
+
+def should_spool_messages_while_the_broker_blocks_publishing(tmp_path):
+    publisher = Publisher(
+        exchange_name=TEST_EXCHANGE_NAME,
+        blocked_policy="spool",
+        outbox_path=str(tmp_path / "outbox.db"),
+    )
+
+    with patch("pyrmq.publisher.BlockingConnection") as blocking_connection:
+        connection = blocking_connection.return_value
+        publisher.verify()
+
+        (on_blocked,), _ = connection.add_on_connection_blocked_callback.call_args
+        on_blocked(connection, Mock(method=Mock(reason="low on disk")))
+
+        with patch.object(publisher.outbox, "append") as append:
+            assert publisher.publish({"test": 1}) is None
+            assert publisher.publish_many([{"test": 2}, {"test": 3}]) == [SPOOLED] * 2
+            assert publisher.publish_many([]) == []
+
+    assert append.call_count == 3
+    assert [call.args[0] for call in append.call_args_list] == [TEST_EXCHANGE_NAME] * 3
+    assert connection.channel.return_value.basic_publish.call_count == 0
+    publisher.outbox.close()
+
+
+def should_fail_fast_in_batches_while_the_broker_blocks_publishing():
+    publisher = Publisher(exchange_name=TEST_EXCHANGE_NAME, blocked_policy="raise")
+
+    with patch("pyrmq.publisher.BlockingConnection") as blocking_connection:
+        connection = blocking_connection.return_value
+        publisher.verify()
+
+        (on_blocked,), _ = connection.add_on_connection_blocked_callback.call_args
+        on_blocked(connection, Mock(method=Mock(reason="low on memory")))
+
+        with pytest.raises(ConnectionBlockedTimeout):
+            publisher.publish_many([{"test": "test"}])
+
+    assert connection.channel.return_value.basic_publish.call_count == 0
+
+
+def should_not_retry_publishes_that_stayed_blocked_too_long():
+    publisher = Publisher(
+        exchange_name=TEST_EXCHANGE_NAME, blocked_connection_timeout=1
+    )
+
+    with patch("pyrmq.publisher.BlockingConnection") as blocking_connection:
+        channel = blocking_connection.return_value.channel.return_value
+        channel.basic_publish.side_effect = ConnectionBlockedTimeout
+
+        with patch("time.sleep") as time_sleep:
+            with pytest.raises(ConnectionBlockedTimeout):
+                publisher.publish({"test": "test"})
+
+    assert time_sleep.call_count == 0
+    assert publisher.connection_parameters.blocked_connection_timeout == 1
+
+
+def should_reject_spooling_without_an_outbox():
+    with pytest.raises(ValueError):
+        Publisher(exchange_name=TEST_EXCHANGE_NAME, blocked_policy="spool")
+
+
+def should_back_off_exponentially_up_to_the_max_delay():
+    policy = RetryPolicy(attempts=10, delay=1, backoff=2, max_delay=5)
+
+    assert [policy.delay_for(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+
+    policy.jitter = True
+
+    assert all(0 <= policy.delay_for(3) <= 4 for _ in range(100))
+
+
+def should_cap_the_delay_of_very_late_retries():
+    assert RetryPolicy(delay=1, backoff=1.5, max_delay=30).delay_for(2000) == 30
+    assert RetryPolicy(delay=0.5, backoff=2, max_delay=30).delay_for(1100) == 30
+
+
+def should_stop_retrying_once_the_deadline_passes():
+    publisher = Publisher(
+        exchange_name=TEST_EXCHANGE_NAME,
+        infinite_retry=True,
+        retry_delay=1,
+        retry_backoff=2,
+        retry_deadline=10,
+    )
+
+    with patch("pyrmq.publisher.BlockingConnection") as blocking_connection:
+        channel = blocking_connection.return_value.channel.return_value
+        channel.basic_publish.side_effect = AMQPConnectionError
+
+        clock = {"now": 0}
+
+        def sleep(seconds):
+            clock["now"] += seconds
+
+        with patch("time.monotonic", side_effect=lambda: clock["now"]):
+            with patch("time.sleep", side_effect=sleep) as time_sleep:
+                with pytest.raises(AMQPConnectionError):
+                    publisher.publish(
+                        {"test": "test"}, message_properties={"priority": 3}
+                    )
+
+    # 1 + 2 + 4 seconds fit in the deadline, the next 8 seconds do not.
+    assert [call.args[0] for call in time_sleep.call_args_list] == [1, 2, 4]
+    assert channel.basic_publish.call_count == 4
+    assert all(
+        call.kwargs["properties"].priority == 3
+        for call in channel.basic_publish.call_args_list
+    )
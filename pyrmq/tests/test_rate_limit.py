@@ -0,0 +1,90 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from pyrmq import Publisher
+from pyrmq.rate_limit import RateLimiter, RateLimitExceeded, TokenBucket
+from pyrmq.tests.conftest import TEST_EXCHANGE_NAME
+
+
+@pytest.fixture
+def clock():
+    """
+    A clock that only moves when something sleeps.
+    """
+    now = {"now": 0.0}
+
+    def sleep(seconds):
+        now["now"] += seconds
+
+    with patch("time.monotonic", side_effect=lambda: now["now"]):
+        with patch("time.sleep", side_effect=sleep) as time_sleep:
+            yield time_sleep
+
+
+def should_reject_non_positive_rates():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def should_allow_bursts_then_the_sustained_rate(clock):
+    limiter = RateLimiter(messages_per_second=10, message_burst=5)
+
+    for _ in range(5):
+        assert limiter.acquire()
+
+    assert clock.call_count == 0
+
+    for _ in range(10):
+        assert limiter.acquire()
+
+    # 10 more messages at 10 per second take a second.
+    assert sum(call.args[0] for call in clock.call_args_list) == pytest.approx(1)
+
+
+def should_limit_bytes_and_let_large_messages_through_after_a_full_refill(clock):
+    limiter = RateLimiter(bytes_per_second=1000)
+
+    assert limiter.acquire(size=600)
+    assert limiter.acquire(size=5000)
+    assert limiter.try_acquire(size=1) == pytest.approx(4.001)
+
+
+def should_limit_routing_keys_separately(clock):
+    limiter = RateLimiter(messages_per_second=100, routing_key_limits={"backfill": 1})
+
+    assert limiter.acquire("backfill")
+    assert not limiter.acquire("backfill", block=False)
+    assert not limiter.acquire("backfill", timeout=0.5)
+    assert limiter.acquire("realtime", block=False)
+    assert limiter.acquire("backfill", timeout=1)
+
+
+def should_raise_when_the_rate_limit_is_reached_without_blocking():
+    limiter = RateLimiter(messages_per_second=1)
+    publisher = Publisher(
+        exchange_name=TEST_EXCHANGE_NAME,
+        rate_limiter=limiter,
+        rate_limit_block=False,
+        background_queue_size=10,
+    )
+
+    with patch.object(publisher.background, "put") as put:
+        publisher.publish({"test": "first"})
+
+        with pytest.raises(RateLimitExceeded):
+            publisher.publish({"test": "second"})
+
+        with pytest.raises(RateLimitExceeded):
+            publisher.publish_many([{"test": "third"}])
+
+    assert put.call_count == 1
@@ -0,0 +1,171 @@
+"""
+    Python with RabbitMQ—simplified so you won't have to.
+
+    :copyright: 2020-Present by Alexandre Gerona.
+    :license: MIT, see LICENSE for more details.
+
+    Full documentation is available at https://pyrmq.readthedocs.io
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from pyrmq import Consumer, Publisher
+from pyrmq.serializers import (
+    JSONSerializer,
+    MsgpackSerializer,
+    OrjsonSerializer,
+    RawSerializer,
+    Serializer,
+    get_serializer,
+    negotiate_serializer,
+    register_serializer,
+)
+from pyrmq.tests.test_consumer import assert_consumed_message
+
+
+class UpperSerializer(Serializer):
+    content_type = "text/x-upper"
+
+    def dumps(self, data):
+        return data.upper().encode()
+
+    def loads(self, body):
+        return body.decode().lower()
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgpack"])
+def should_round_trip_data_with_each_serializer(name: str):
+    serializer = get_serializer(name)
+    data = {"key": "value", "items": [1, 2.5, None, True]}
+
+    body = serializer.dumps(data)
+
+    assert isinstance(body, bytes)
+    assert serializer.loads(body) == data
+
+
+def should_replace_invalid_utf8_when_loading_json():
+    assert JSONSerializer().loads(b'{"key": "value\xff"}') == {"key": "value�"}
+    assert JSONSerializer().loads('{"key": "value"}') == {"key": "value"}
+
+
+def should_pass_raw_bodies_through():
+    serializer = RawSerializer()
+
+    assert serializer.dumps(b"\x00\x01") == b"\x00\x01"
+    assert serializer.dumps(bytearray(b"\x00")) == b"\x00"
+    assert serializer.dumps("text") == b"text"
+    assert serializer.loads(b"\x00\x01") == b"\x00\x01"
+
+    with pytest.raises(TypeError):
+        serializer.dumps({"key": "value"})
+
+
+@pytest.mark.parametrize(
+    "serializer_class, module",
+    [(OrjsonSerializer, "orjson"), (MsgpackSerializer, "msgpack")],
+)
+def should_explain_how_to_install_optional_serializers(serializer_class, module):
+    with patch.dict("sys.modules", {module: None}):
+        with pytest.raises(ImportError, match=f"pyrmq\\[{module}\\]"):
+            serializer_class()
+
+
+def should_not_implement_the_base_serializer():
+    with pytest.raises(NotImplementedError):
+        Serializer().dumps({})
+
+    with pytest.raises(NotImplementedError):
+        Serializer().loads(b"{}")
+
+
+def should_reject_unknown_serializers():
+    with pytest.raises(ValueError):
+        get_serializer("unknown")
+
+    serializer = RawSerializer()
+
+    assert get_serializer(serializer) is serializer
+    assert get_serializer("json") is get_serializer("json")
+
+
+def should_negotiate_the_serializer_from_the_content_type():
+    default = get_serializer("orjson")
+
+    assert negotiate_serializer(None, default) is default
+    assert negotiate_serializer("application/json", default) is default
+    assert negotiate_serializer("text/unknown", default) is default
+    assert isinstance(
+        negotiate_serializer("application/msgpack", default), MsgpackSerializer
+    )
+    assert isinstance(
+        negotiate_serializer("application/octet-stream", default), RawSerializer
+    )
+
+
+def should_register_custom_serializers():
+    register_serializer("upper", UpperSerializer)
+
+    assert isinstance(get_serializer("upper"), UpperSerializer)
+    assert isinstance(
+        negotiate_serializer("text/x-upper", JSONSerializer()), UpperSerializer
+    )
+
+
+def should_decode_messages_by_their_content_type():
+    consumer = Consumer(
+        exchange_name="exchange",
+        queue_name="queue",
+        routing_key="routing_key",
+        callback=Mock(),
+    )
+    properties = Mock(content_type="application/msgpack")
+
+    consumer._consume_message(
+        Mock(), Mock(), properties, get_serializer("msgpack").dumps({"key": "value"})
+    )
+    consumer._consume_message(Mock(), Mock(), Mock(content_type=None), b'{"key": 1}')
+
+    assert [call.args[0] for call in consumer.message_received_callback.mock_calls] == [
+        {"key": "value"},
+        {"key": 1},
+    ]
+
+
+def should_publish_and_consume_msgpack_messages(publisher_session: Publisher):
+    publisher = Publisher(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        serializer="msgpack",
+    )
+    publisher.publish({"test": "msgpack"})
+    publisher.publish(
+        b"raw", message_properties={"content_type": "application/octet-stream"}
+    )
+    publisher.close()
+
+    response = {"messages": []}
+
+    def callback(data, properties, **kwargs):
+        response["messages"].append((properties.content_type, data))
+
+    consumer = Consumer(
+        exchange_name=publisher_session.exchange_name,
+        queue_name=publisher_session.queue_name,
+        routing_key=publisher_session.routing_key,
+        callback=callback,
+    )
+    consumer.start()
+    assert_consumed_message(
+        response,
+        {
+            "messages": [
+                ("application/msgpack", {"test": "msgpack"}),
+                ("application/octet-stream", b"raw"),
+            ]
+        },
+    )
+    consumer.close()